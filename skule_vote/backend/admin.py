@@ -1,14 +1,26 @@
+import csv
 import json
+import logging
 
 from django.conf import settings
-from django.contrib import admin
-from django.http import HttpResponse
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 
 from import_export import resources
-from import_export.admin import ExportMixin
 
-from backend.ballot import calculate_results
-from backend.forms import ElectionSessionAdminForm
+from backend.ballot_sets import (
+    calculate_election_session_results,
+    load_election_session_ballot_sets,
+)
+from backend.forms import (
+    ElectionRecountForm,
+    ElectionSessionAdminForm,
+    ElectionSessionCloneForm,
+)
 from backend.models import (
     ElectionSession,
     Election,
@@ -18,81 +30,37 @@ from backend.models import (
     Eligibility,
     Message,
 )
-from backend.serializers import (
-    BallotResultsCalculationSerializer as BallotSerializer,
-    CandidateSerializer,
-)
+from backend.memory_report import generate_results_with_memory_report
+from backend.recount import recount
+from backend.results import load_election_session_results
 
+logger = logging.getLogger(__name__)
+
+
+def generate_results(queryset, load_ballot_sets=None, include_condorcet=False):
+    """
+    Returns the results of every Election in each ElectionSession. By default stored
+    results are reused for Elections whose ballots haven't changed since they were
+    last counted (see backend.results). Passing load_ballot_sets always recounts from
+    the ballot sets it returns, as does include_condorcet, which adds the pairwise
+    cross-check from backend.condorcet to each Election's results.
+    """
+    if include_condorcet and load_ballot_sets is None:
+        load_ballot_sets = load_election_session_ballot_sets
 
-def generate_results(queryset):
     election_session_results = {}
     for election_session in queryset:
-        elections = Election.objects.filter(election_session=election_session)
-        election_results = {}
-        for election in elections:
-            election_ballots = Ballot.objects.filter(election=election)
-            election_candidates = Candidate.objects.filter(election=election)
-
-            # ***** Format the data for all Ballots and Candidates, including DQ'ed *****
-            # Ballot dict contains Candidate objects, we need indicies from the Candidates list.
-            ballot_serializer = BallotSerializer(election_ballots)
-            election_ballots_formatted = (
-                ballot_serializer.map_candidates_in_ballots_to_choices(
-                    ballots=ballot_serializer.data, choices=election_candidates
-                )
-            )
-            # The choice array is a queryset, we need a dictionary
-            choices_dict = CandidateSerializer(election_candidates, many=True).data
-            for i in range(len(choices_dict)):
-                choices_dict[i] = dict(choices_dict[i])
-
-            # ***** Format the data for only non-DQ'ed Ballots and Candidates *****
-            election_ballots_no_dqed = election_ballots.exclude(
-                candidate__disqualified_status=True
-            )
-            election_candidates_no_dqed = election_candidates.exclude(
-                disqualified_status=True
-            )
-            # Ballot dict contains Candidate objects, we need indicies from the Candidates list.
-            ballot_serializer_no_dqed = BallotSerializer(election_ballots_no_dqed)
-            election_ballots_no_dqed_formatted = (
-                ballot_serializer_no_dqed.map_candidates_in_ballots_to_choices(
-                    ballots=ballot_serializer_no_dqed.data,
-                    choices=election_candidates_no_dqed,
-                )
-            )
-            choices_dict_no_dqed = CandidateSerializer(
-                election_candidates_no_dqed, many=True
-            ).data
-            for i in range(len(choices_dict_no_dqed)):
-                choices_dict_no_dqed[i] = dict(choices_dict_no_dqed[i])
-
-            # Initialize the election results for with and without DQ
-            election_results[f"{election.election_name}"] = {
-                "results_with_dq": {},
-                "results_without_dq": {},
-            }
-
-            # Calculate the results with DQ'ed Candidates included
-            election_results[f"{election.election_name}"][
-                "results_without_dq"
-            ] = calculate_results(
-                ballots=election_ballots_formatted,
-                choices=choices_dict,
-                numSeats=election.seats_available,
+        if load_ballot_sets is None:
+            results = load_election_session_results(election_session)
+        else:
+            # All ballots for the session are read in a single pass and packed per Election
+            results = calculate_election_session_results(
+                load_ballot_sets(election_session), include_condorcet
             )
 
-            # Calculate the results with DQ'ed Candidates NOT included
-            election_results[f"{election.election_name}"][
-                "results_with_dq"
-            ] = calculate_results(
-                ballots=election_ballots_no_dqed_formatted,
-                choices=choices_dict_no_dqed,
-                numSeats=election.seats_available,
-            )
         election_session_results[
             f"{election_session.election_session_name} ElectionSession"
-        ] = election_results
+        ] = results
     return election_session_results
 
 
@@ -136,11 +104,86 @@ class ElectionSessionAdmin(admin.ModelAdmin):
 
     change_list_template = "election-session/change_list.html"
 
-    actions = ["generate_results_action"]
+    actions = [
+        "generate_results_action",
+        "generate_results_with_memory_report_action",
+        "clone_election_session_action",
+    ]
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                "<path:object_id>/clone/",
+                self.admin_site.admin_view(self.clone_view),
+                name="%s_%s_clone" % info,
+            )
+        ] + super().get_urls()
+
+    def clone_view(self, request, object_id):
+        """
+        Creates a new ElectionSession with the same Elections and Eligibilities (and
+        optionally Candidates) as an existing one, see ElectionSessionCloneForm.
+        """
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        source = get_object_or_404(ElectionSession, id=object_id)
+        form = ElectionSessionCloneForm(request.POST or None, source=source)
+        if request.method == "POST" and form.is_valid():
+            election_session = form.save()
+            self.message_user(
+                request,
+                f"Created {election_session} from {source}.",
+                messages.SUCCESS,
+            )
+            return HttpResponseRedirect(
+                reverse("admin:backend_electionsession_changelist")
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Clone {source}",
+            "opts": self.model._meta,
+            "source": source,
+            "form": form,
+        }
+        return TemplateResponse(request, "election-session/clone.html", context)
+
+    @admin.action(description="Clone selected ElectionSession")
+    def clone_election_session_action(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(
+                request,
+                "Select exactly one ElectionSession to clone.",
+                messages.ERROR,
+            )
+            return None
+
+        return HttpResponseRedirect(
+            reverse(
+                "admin:backend_electionsession_clone",
+                kwargs={"object_id": queryset.get().id},
+            )
+        )
 
     @admin.action(description="Generate results for selected ElectionSessions")
     def generate_results_action(self, request, queryset):
         results = generate_results(queryset)
+        return self._results_response(results)
+
+    @admin.action(
+        description="Generate results for selected ElectionSessions with a memory report"
+    )
+    def generate_results_with_memory_report_action(self, request, queryset):
+        results, report = generate_results_with_memory_report(
+            queryset,
+            progress=lambda stage: logger.info("Memory report: %s", json.dumps(stage)),
+        )
+        return self._results_response({"memoryReport": report, "results": results})
+
+    @staticmethod
+    def _results_response(results):
         response = HttpResponse(json.dumps(results, indent="\t"))
         response.headers[
             "Content-Disposition"
@@ -167,11 +210,56 @@ class ElectionAdmin(admin.ModelAdmin):
             "Choose the Election Session this falls under.",
             {"fields": ("election_session",)},
         ),
-        ("Define Election parameters.", {"fields": ("seats_available", "category")}),
+        (
+            "Define Election parameters.",
+            {"fields": ("seats_available", "category", "counting_method")},
+        ),
     )
 
     search_fields = ["election_name"]
 
+    change_form_template = "election/change_form.html"
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                "<path:object_id>/recount/",
+                self.admin_site.admin_view(self.recount_view),
+                name="%s_%s_recount" % info,
+            )
+        ] + super().get_urls()
+
+    def recount_view(self, request, object_id):
+        """
+        Recounts the Election as if the selected Candidates had been removed, see
+        backend.recount.
+        """
+        election = get_object_or_404(Election, id=object_id)
+        if not self.has_view_permission(request, election):
+            raise PermissionDenied
+
+        form = ElectionRecountForm(request.GET or None, election=election)
+        results = None
+        if form.is_bound and form.is_valid():
+            results = recount(
+                election,
+                [
+                    candidate.id
+                    for candidate in form.cleaned_data["excluded_candidates"]
+                ],
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Recount {election}",
+            "opts": self.model._meta,
+            "original": election,
+            "form": form,
+            "results": json.dumps(results, indent="\t") if results else None,
+        }
+        return TemplateResponse(request, "election/recount.html", context)
+
 
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
@@ -295,13 +383,64 @@ class BallotResource(resources.ModelResource):
         return export_headers
 
 
+class _Echo:
+    """
+    File-like object for csv.writer that hands each written row straight back,
+    so rows can be streamed to the client instead of buffered.
+    """
+
+    def write(self, value):
+        return value
+
+
 @admin.register(Ballot)
-class BallotAdmin(ExportMixin, admin.ModelAdmin):
+class BallotAdmin(admin.ModelAdmin):
     resource_class = BallotResource
     list_filter = ("election__election_session__election_session_name",)
     if not settings.DEBUG:
         actions = None
 
+    change_list_template = "ballot/change_list.html"
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                "export/",
+                self.admin_site.admin_view(self.export_view),
+                name="%s_%s_export" % info,
+            )
+        ] + super().get_urls()
+
+    def export_view(self, request):
+        """
+        Streams the Ballots matching the current changelist filters as a CSV file with
+        the BallotResource columns. Rows are read through a server-side cursor and
+        written out as they arrive, so memory use doesn't grow with the export size.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        queryset = self.get_changelist_instance(request).get_queryset(request)
+        rows = (
+            queryset.order_by("id")
+            .values_list(*self.resource_class._meta.export_order)
+            .iterator(chunk_size=2000)
+        )
+
+        writer = csv.writer(_Echo())
+        header = self.resource_class().get_export_headers()
+
+        def stream():
+            yield writer.writerow(header)
+            for row in rows:
+                # Spoiled ballots have no candidate or rank
+                yield writer.writerow(["" if value is None else value for value in row])
+
+        response = StreamingHttpResponse(stream(), content_type="text/csv")
+        response.headers["Content-Disposition"] = "attachment; filename=Ballots.csv"
+        return response
+
     # We cannot call super().get_fields(request, obj) because that method calls
     # get_readonly_fields(request, obj), causing infinite recursion. Ditto for
     # super().get_form(request, obj). So we  assume the default ModelForm.
@@ -0,0 +1,220 @@
+"""
+Caching of the API payloads that are the same for every voter: the live or upcoming
+ElectionSession, the live ElectionSession's Messages, and its Elections with their
+Candidates, which ElectionListView then filters down to those the voter can vote in.
+
+Every key includes the API cache version, which is bumped whenever an
+ElectionSession, Election, Candidate, Eligibility or Message is saved or deleted, so
+changes made in the admin show up on the next request. However many rows a
+transaction changes, the version is bumped at its first change, again at the next
+change after a payload was cached on its connection, and once more when it commits,
+so that a payload read from the database while it was still open isn't left cached.
+Payloads that depend on which ElectionSession is live also expire when it
+ends or the next one starts.
+
+Eligibilities and Messages have no post_delete receivers, so Django still deletes
+them in a single query along with their Election or ElectionSession, whose own
+signal covers them. Deleting them directly sends backend.models.rows_deleted.
+
+With several app servers, each has its own cache. On Postgres each committed
+transaction that changed any of them also publishes a single NOTIFY, and every
+worker runs a thread that LISTENs for them and bumps its server's version. The
+thread is started by the first cached payload a worker serves, and bumps the version
+whenever it (re)connects, as changes made while no one was listening are missed.
+"""
+import logging
+import os
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from backend.models import (
+    Candidate,
+    Election,
+    ElectionSession,
+    Eligibility,
+    Message,
+    rows_deleted,
+)
+
+API_CACHE_VERSION_KEY = "api:version"
+
+NOTIFY_CHANNEL = "skule_vote_api_cache"
+# Seconds between checks that the listening connection is still alive, and before
+# reconnecting after it drops
+LISTEN_TIMEOUT = 60
+LISTEN_RETRY_SECONDS = 5
+
+# Changes to these invalidate every cached payload
+INVALIDATING_MODELS = [ElectionSession, Election, Candidate, Eligibility, Message]
+
+logger = logging.getLogger(__name__)
+
+
+def _version():
+    version = cache.get(API_CACHE_VERSION_KEY)
+    if version is None:
+        # The version may have been evicted, so never start again from a version that
+        # payloads could still be cached under
+        version = time.time_ns()
+        cache.add(API_CACHE_VERSION_KEY, version, None)
+        version = cache.get(API_CACHE_VERSION_KEY, version)
+    return version
+
+
+def invalidate_api_cache():
+    try:
+        cache.incr(API_CACHE_VERSION_KEY)
+    except ValueError:
+        # Missing, and the next version will be new anyway
+        pass
+
+
+def _notify(labels):
+    """Tells the listeners on every app server about changes to the models."""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, ",".join(sorted(labels))]
+        )
+
+
+class _Changes:
+    """The labels of the models changed in a transaction, published once it commits."""
+
+    def __init__(self):
+        self.labels = set()
+        # Whether a payload was cached on the connection since the version was bumped
+        self.cached = False
+
+    def __call__(self):
+        invalidate_api_cache()
+        _notify(self.labels)
+
+
+def _pending_changes():
+    """Returns the _Changes of the connection's open transaction, if it has any."""
+    db = transaction.get_connection()
+    changes = getattr(db, "_api_cache_changes", None)
+    # Callbacks are dropped when the transaction commits or a savepoint they were
+    # registered in rolls back
+    if changes is None or all(entry[1] is not changes for entry in db.run_on_commit):
+        return None
+    return changes
+
+
+def _changed(model):
+    if not transaction.get_connection().in_atomic_block:
+        invalidate_api_cache()
+        _notify({model._meta.label})
+        return
+
+    changes = _pending_changes()
+    if changes is None:
+        changes = transaction.get_connection()._api_cache_changes = _Changes()
+        transaction.on_commit(changes)
+        invalidate_api_cache()
+    elif changes.cached:
+        invalidate_api_cache()
+    changes.cached = False
+    changes.labels.add(model._meta.label)
+
+
+def _invalidate_on_change(sender, **kwargs):
+    _changed(sender)
+
+
+def connect_invalidation():
+    for model in INVALIDATING_MODELS:
+        post_save.connect(
+            _invalidate_on_change, sender=model, dispatch_uid="api_cache_save"
+        )
+    for model in [ElectionSession, Election, Candidate]:
+        post_delete.connect(
+            _invalidate_on_change, sender=model, dispatch_uid="api_cache_delete"
+        )
+    rows_deleted.connect(_invalidate_on_change, dispatch_uid="api_cache_rows_deleted")
+
+
+def _listen_once():
+    """Listens on this thread's own connection until it fails."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    invalidate_api_cache()
+
+    pg_connection = connection.connection
+    while True:
+        if select.select([pg_connection], [], [], LISTEN_TIMEOUT) == ([], [], []):
+            # Fails if the connection has dropped
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            continue
+
+        with connection.wrap_database_errors:
+            pg_connection.poll()
+        if pg_connection.notifies:
+            pg_connection.notifies.clear()
+            invalidate_api_cache()
+
+
+def _listen():
+    while True:
+        try:
+            _listen_once()
+        except (DatabaseError, OSError) as e:
+            logger.warning(
+                "API cache listener lost its connection, reconnecting: %s", e
+            )
+        finally:
+            connection.close()
+        time.sleep(LISTEN_RETRY_SECONDS)
+
+
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def start_listener():
+    """Starts this worker process's listener thread, if it isn't running yet."""
+    global _listener_pid
+
+    if (
+        _listener_pid == os.getpid()
+        or not settings.API_CACHE_LISTEN
+        or connection.vendor != "postgresql"
+    ):
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+        threading.Thread(target=_listen, name="api-cache-listener", daemon=True).start()
+
+
+def cached_api_payload(name, compute):
+    """
+    Returns the payload cached under name, or computes and caches it. compute()
+    returns the payload, which mustn't be None, and the datetime it stops being valid
+    at, or None if only changes to the models make it stale.
+    """
+    start_listener()
+    key = f"api:{_version()}:{name}"
+    payload = cache.get(key)
+    if payload is None:
+        payload, valid_until = compute()
+        timeout = settings.API_CACHE_TIMEOUT
+        if valid_until is not None:
+            timeout = min(timeout, (valid_until - timezone.now()).total_seconds())
+        if timeout > 0:
+            cache.set(key, payload, timeout)
+            changes = _pending_changes()
+            if changes is not None:
+                changes.cached = True
+    return payload
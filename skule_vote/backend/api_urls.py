@@ -18,6 +18,9 @@ urlpatterns = [
     ),
     path("votereligible/", views.VoterEligibleView.as_view(), name="voter-eligible"),
     path("messages/", views.MessageView.as_view(), name="messages"),
+    path("turnout/", views.TurnoutView.as_view(), name="turnout"),
+    path("recount/", views.RecountView.as_view(), name="recount"),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
 ]
 
 if not settings.CONNECT_TO_UOFT:
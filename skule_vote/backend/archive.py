@@ -0,0 +1,165 @@
+"""
+Compact binary archive of the ballots cast in an ElectionSession, so results can be
+recounted offline without a database.
+
+Layout (all integers little-endian):
+
+    magic           4 bytes, b"SKVA"
+    version         uint16
+    header length   uint32
+    header          UTF-8 JSON, see below
+    rankings        the packed rankings of every Election, back to back
+
+The header holds the ElectionSession name and, for each Election, its name, seats,
+Candidates (in choice order), counting method (see backend.counting) and where its
+rankings start in the rankings section:
+
+    {
+        "election_session_name": "...",
+        "elections": [
+            {
+                "id": 1, "election_name": "...", "seats_available": 1,
+                "candidates": [{"id": 1, "name": "...", "disqualified_status": false}],
+                "counting_method": "instant_runoff", "offset": 0, "groups": 2,
+            },
+        ],
+    }
+
+An Election's rankings are "groups" records, one per distinct ranking:
+
+    count           uint32, number of ballots with this ranking
+    length          uint8, number of ranked Candidates (0 for a spoiled ballot)
+    ranking         uint8 * length, indices into the Election's candidates
+"""
+import json
+import mmap
+import struct
+
+from backend.ballot_sets import PackedBallotSet
+from backend.counting import DEFAULT_COUNTING_METHOD
+
+MAGIC = b"SKVA"
+VERSION = 1
+
+_PREAMBLE = struct.Struct("<4sHI")
+_GROUP = struct.Struct("<IB")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def write_archive(file, election_session_name, ballot_sets):
+    """
+    Writes the PackedBallotSets (as returned by the ballot_sets loaders) to the
+    binary file object in the archive format.
+    """
+    elections, rankings = [], bytearray()
+    for ballot_set in ballot_sets.values():
+        if len(ballot_set.candidates) > 255:
+            raise ArchiveError(
+                f"{ballot_set.election_name} has more than 255 candidates, which the "
+                "archive format does not support."
+            )
+
+        elections.append(
+            {
+                "id": ballot_set.election_id,
+                "election_name": ballot_set.election_name,
+                "seats_available": ballot_set.seats_available,
+                "candidates": ballot_set.candidates,
+                "counting_method": ballot_set.counting_method,
+                "offset": len(rankings),
+                "groups": len(ballot_set.rankings),
+            }
+        )
+        for ranking, count in ballot_set.rankings.items():
+            # Only as long as the number of Candidates if none is ranked twice, which
+            # BallotSerializer doesn't prevent
+            if len(ranking) > 255:
+                raise ArchiveError(
+                    f"{ballot_set.election_name} has a ballot ranking more than 255 "
+                    "candidates, which the archive format does not support."
+                )
+            rankings += _GROUP.pack(count, len(ranking))
+            rankings += bytes(ranking)
+
+    header = json.dumps(
+        {"election_session_name": election_session_name, "elections": elections}
+    ).encode("utf-8")
+
+    file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+    file.write(header)
+    file.write(rankings)
+
+
+class BallotArchive:
+    """
+    Read access to an archive file. The file is memory-mapped, so only the pages
+    holding the Elections that are actually read get loaded.
+
+    Usage:
+        with BallotArchive(path) as archive:
+            ballot_sets = archive.ballot_sets()
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ArchiveError(f"{path} is empty.")
+
+        if len(self._map) < _PREAMBLE.size:
+            self.close()
+            raise ArchiveError(f"{path} is not a ballot archive.")
+
+        magic, version, header_length = _PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ArchiveError(f"{path} is not a ballot archive.")
+        if version != VERSION:
+            self.close()
+            raise ArchiveError(f"Unsupported ballot archive version: {version}.")
+
+        header_end = _PREAMBLE.size + header_length
+        header = json.loads(self._map[_PREAMBLE.size : header_end].decode("utf-8"))
+        self.election_session_name = header["election_session_name"]
+        self.elections = header["elections"]
+        self._rankings_start = header_end
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def ballot_set(self, election):
+        """Builds the PackedBallotSet of one Election entry from the header."""
+        ballot_set = PackedBallotSet(
+            election["id"],
+            election["election_name"],
+            election["seats_available"],
+            election["candidates"],
+            # Archives written before counting methods existed were all counted with
+            # the default
+            election.get("counting_method", DEFAULT_COUNTING_METHOD),
+        )
+
+        position = self._rankings_start + election["offset"]
+        for _ in range(election["groups"]):
+            count, length = _GROUP.unpack_from(self._map, position)
+            position += _GROUP.size
+            ballot_set.add(self._map[position : position + length], count)
+            position += length
+        return ballot_set
+
+    def ballot_sets(self):
+        return {
+            election["id"]: self.ballot_set(election) for election in self.elections
+        }
@@ -1,4 +1,5 @@
 import math
+import time
 
 #   results: function (ballots, choices, numSeats:
 
@@ -30,23 +31,214 @@ RON = "Reopen Nominations"
 #   quota: Number
 #   totalVotes: Number (total number of ballots cast)
 #   spoiledBallots: Number (total number of spoiled ballots)
+#   diagnostics: {...} (only with diagnostics=True, see CountDiagnostics)
 # }
 # */
 
 
-def calculate_results(ballots, choices, numSeats):
+def calculate_results(ballots, choices, numSeats, diagnostics=False):
+    diagnostics = CountDiagnostics() if diagnostics else None
+
+    # CASE 1: YES/NO election i.e. a referendum or one person running
+    if len(choices) == 2:
+        return _calculate_yes_no_results(ballots, choices, diagnostics)
+
+    # CASE 2: Single seat election
+    # >>> Keep eliminating the bottom choice (you cannot eliminate "Reopen Nominations" aka RON), until
+    #     one person gets >50% of the vote, keeping track of intermediate rounds for audit reasons    */
+    elif numSeats == 1:
+        return _calculate_single_seat_results(ballots, choices, numSeats, diagnostics)
+
+    # CASE 3: Multi-seat election with more than two candidates
+    # >>> Note: Case when RON wins something, stop counting further rounds (remaining seats are unfilled) */
+    else:
+        return _calculate_multi_seat_results(ballots, choices, numSeats, diagnostics)
+
+
+def _results(winners, rounds, quota, totalVotes, spoiledBallots, diagnostics):
+    results = {
+        "winners": winners,
+        "rounds": rounds,
+        "quota": quota,
+        "totalVotes": totalVotes,
+        "spoiledBallots": spoiledBallots,
+    }
+    if diagnostics is not None:
+        results["diagnostics"] = diagnostics.results()
+    return results
+
+
+class CountDiagnostics:
+    """
+    Instrumentation of calculate_results, returned as its "diagnostics" when called
+    with diagnostics=True:
+
+        {
+            "seconds": Number (for the whole count)
+            "rounds": [{
+                ballotPassSeconds: Number (time spent counting the ballots this round)
+                decideSeconds: Number (time spent picking winners or who to eliminate)
+                ballotsVisited: Number
+                positionsAdvanced: Number (ranking positions skipped over because that
+                    choice was eliminated or already won, summed over every ballot)
+                transfers: Number (ballots counted for a choice other than their first)
+                exhausted: Number (ballots with no choices left to count)
+                tieBreak: null, or {
+                    type: "elimination" or "winner"
+                    tied: Number (of choices tied at the start)
+                    roundsRescanned: Number (earlier rounds compared)
+                    rankingPositionsRescanned: Number (later preferences compared)
+                    ballotsVisited: Number (by the rescans of later preferences)
+                    resolved: Boolean (false if the tie was never broken)
+                }
+            }]
+        }
+
+    None of this runs per ballot while counting, so it costs nothing when disabled:
+    the ballot statistics of each round come from a separate pass over the ballots
+    after the round is counted, which is left out of ballotPassSeconds.
+    """
+
+    def __init__(self):
+        self.rounds = []
+        self._start = time.perf_counter()
+        self._round_start = self._decide_start = self._start
+
+    def start_round(self):
+        self._round_start = time.perf_counter()
+
+    def count_round(self, ballots, numChoices, remainingChoices):
+        """Call after a round's pass over the ballots, before anyone wins or is eliminated."""
+        ballotPassSeconds = time.perf_counter() - self._round_start
+
+        positionsAdvanced, transfers, exhausted = 0, 0, 0
+        for ballot in ballots:
+            ranking = ballot["ranking"]
+            if not ranking:
+                continue
+
+            position = 0
+            while (
+                position < len(ranking)
+                and ranking[position] < numChoices
+                and remainingChoices[ranking[position]] in ("Eliminated", "Winner")
+            ):
+                position += 1
+
+            positionsAdvanced += position
+            if position == len(ranking):
+                exhausted += 1
+            elif position > 0:
+                transfers += 1
+
+        self.rounds.append(
+            {
+                "ballotPassSeconds": ballotPassSeconds,
+                "decideSeconds": 0,
+                "ballotsVisited": len(ballots),
+                "positionsAdvanced": positionsAdvanced,
+                "transfers": transfers,
+                "exhausted": exhausted,
+                "tieBreak": None,
+            }
+        )
+        self._decide_start = time.perf_counter()
+
+    def tie_break(
+        self,
+        isElimination,
+        tied,
+        roundsRescanned,
+        positionsRescanned,
+        ballots,
+        remaining,
+    ):
+        self.rounds[-1]["tieBreak"] = {
+            "type": "elimination" if isElimination else "winner",
+            "tied": tied,
+            "roundsRescanned": roundsRescanned,
+            "rankingPositionsRescanned": positionsRescanned,
+            "ballotsVisited": positionsRescanned * len(ballots),
+            "resolved": remaining == 1,
+        }
+
+    def end_round(self):
+        self.rounds[-1]["decideSeconds"] = time.perf_counter() - self._decide_start
+
+    def results(self):
+        return {"seconds": time.perf_counter() - self._start, "rounds": self.rounds}
+
+
+def _calculate_yes_no_results(ballots, choices, diagnostics):
     _winners = []  # Array of winner's names
     _rounds = []  # [{choice1Name: voteCount, ...}] (index in array = round number)
     _quota = 0  # Number
     _totalVotes = -1  # Number (total number of ballots cast)
     _spoiledBallots = 0  # Number (total number of spoiled ballots)
 
-    # CASE 1: YES/NO election i.e. a referendum or one person running
-    if len(choices) == 2:
-        totalVotes, spoiledBallots = 0, 0
-        _rounds.append({c["name"]: 0 for c in choices})  # Adding round 0 choices
+    if diagnostics is not None:
+        diagnostics.start_round()
+
+    totalVotes, spoiledBallots = 0, 0
+    _rounds.append({c["name"]: 0 for c in choices})  # Adding round 0 choices
+
+    # Go through each ballot, which will either be yes, no, or blank (spoil)
+    for ballot in ballots:
+        ranking = ballot["ranking"]
+
+        # If ranking is an empty array, they spoiled the ballot
+        if not ranking:
+            spoiledBallots += 1
+        else:
+            if ranking[0] < len(choices):
+                name = choices[ranking[0]]["name"]
+                _rounds[0][name] += 1
+            else:
+                print(f"ERROR - Ballot contained invalid ranking: {ranking[0]}")
+            totalVotes += 1
+
+    if diagnostics is not None:
+        diagnostics.count_round(ballots, len(choices), [c["name"] for c in choices])
+
+    _totalVotes = totalVotes
+    _spoiledBallots = spoiledBallots
+    # Quota may be unnecessary for this election, but better to have it and not need it
+    _quota = math.floor(totalVotes / 2 + 1)
+
+    ch1 = choices[0]["name"]
+    ch2 = choices[1]["name"]
+    if _rounds[0][ch1] == _rounds[0][ch2]:  # Check for a tie
+        _winners.append("NO (TIE)")
+    else:
+        _winners.append(ch1 if (_rounds[0][ch1] > _rounds[0][ch2]) else ch2)
+
+    if diagnostics is not None:
+        diagnostics.end_round()
+
+    return _results(
+        _winners, _rounds, _quota, _totalVotes, _spoiledBallots, diagnostics
+    )
+
+
+def _calculate_single_seat_results(ballots, choices, numSeats, diagnostics):
+    _winners = []  # Array of winner's names
+    _rounds = []  # [{choice1Name: voteCount, ...}] (index in array = round number)
+    _quota = 0  # Number
+    _totalVotes = -1  # Number (total number of ballots cast)
+    _spoiledBallots = 0  # Number (total number of spoiled ballots)
+
+    # Need to know when to stop looping over ballots
+    stillCounting = True
+    # Start with all choices; once someone is eliminated it sets name to "Eliminated" to maintain indices
+    remainingChoices = [c["name"] for c in choices]
+    currentRound, totalVotes, spoiledBallots = 0, 0, 0
+
+    while stillCounting:
+        if diagnostics is not None:
+            diagnostics.start_round()
+
+        _rounds.append({c["name"]: 0 for c in choices})  # Adding choices per round
 
-        # Go through each ballot, which will either be yes, no, or blank (spoil)
         for ballot in ballots:
             ranking = ballot["ranking"]
 
@@ -54,214 +246,219 @@ def calculate_results(ballots, choices, numSeats):
             if not ranking:
                 spoiledBallots += 1
             else:
-                if ranking[0] < len(choices):
-                    name = choices[ranking[0]]["name"]
-                    _rounds[0][name] += 1
-                else:
-                    print(f"ERROR - Ballot contained invalid ranking: {ranking[0]}")
-                totalVotes += 1
+                currentRanking = 0
+
+                # Keep going down the list if someone's first choice has been eliminated (perform some checks each time)
+                # Check for someone not completing a ballot fully (i.e. spoiling part of it)
+                while currentRanking < len(ranking):
+                    # Check for valid ranking
+                    if ranking[currentRanking] < len(choices):
+                        name = remainingChoices[ranking[currentRanking]]
+                        if name != "Eliminated":
+                            _rounds[currentRound][name] += 1
+                            break
+                    else:
+                        print(
+                            f"ERROR - Ballot contained invalid ranking: {ranking[currentRanking]}"
+                        )
+                        # TODO: Figure out what we're doing in this edge case, below is temp for now
+                        break
+                    currentRanking += 1
 
-        _totalVotes = totalVotes
-        _spoiledBallots = spoiledBallots
-        # Quota may be unnecessary for this election, but better to have it and not need it
-        _quota = math.floor(totalVotes / 2 + 1)
+                totalVotes += 1
 
-        ch1 = choices[0]["name"]
-        ch2 = choices[1]["name"]
-        if _rounds[0][ch1] == _rounds[0][ch2]:  # Check for a tie
-            _winners.append("NO (TIE)")
+        if diagnostics is not None:
+            diagnostics.count_round(ballots, len(choices), remainingChoices)
+
+        # Check the results for this round
+        maxVotes, minVotes = -1, 999999
+        for choice in remainingChoices:
+            if choice != "Eliminated":
+                votes = _rounds[currentRound][choice]
+
+                if votes > maxVotes:
+                    maxVotes = votes
+                if votes < minVotes and choice != RON:
+                    minVotes = votes
+
+        # Assign totalVotes after the first pass through the ballots to use any ballot that has a valid first-preference
+        # Also assign spoiledBallots at this time too
+        if _totalVotes == -1:
+            _totalVotes = totalVotes
+            _spoiledBallots = spoiledBallots
+            _quota = math.floor(totalVotes / (numSeats + 1) + 1)
+
+        # Check for a winner, otherwise keep going and eliminate everyone with the lowest amount of votes total
+        if maxVotes >= _quota:
+            _winners = backwardsEliminationProcess(
+                -1,
+                maxVotes,
+                remainingChoices,
+                _rounds,
+                currentRound,
+                ballots,
+                diagnostics,
+            )
+            stillCounting = False
         else:
-            _winners.append(ch1 if (_rounds[0][ch1] > _rounds[0][ch2]) else ch2)
+            backwardsEliminationProcess(
+                minVotes,
+                -1,
+                remainingChoices,
+                _rounds,
+                currentRound,
+                ballots,
+                diagnostics,
+            )
+            currentRound += 1
 
-    # CASE 2: Single seat election
-    # >>> Keep eliminating the bottom choice (you cannot eliminate "Reopen Nominations" aka RON), until
-    #     one person gets >50% of the vote, keeping track of intermediate rounds for audit reasons    */
-    elif numSeats == 1:
-        # Need to know when to stop looping over ballots
-        stillCounting = True
-        # Start with all choices; once someone is eliminated it sets name to "Eliminated" to maintain indices
-        remainingChoices = [c["name"] for c in choices]
-        currentRound, totalVotes, spoiledBallots = 0, 0, 0
+            # Make sure there are still valid candidates left
+            validCandidates = filter(
+                lambda x: (x != "Eliminated" and x != RON), remainingChoices
+            )
+            if not list(validCandidates):
+                stillCounting = False
 
-        while stillCounting:
-            _rounds.append({c["name"]: 0 for c in choices})  # Adding choices per round
+        if diagnostics is not None:
+            diagnostics.end_round()
 
-            for ballot in ballots:
-                ranking = ballot["ranking"]
+    return _results(
+        _winners, _rounds, _quota, _totalVotes, _spoiledBallots, diagnostics
+    )
 
-                # If ranking is an empty array, they spoiled the ballot
-                if not ranking:
-                    spoiledBallots += 1
-                else:
-                    currentRanking = 0
 
-                    # Keep going down the list if someone's first choice has been eliminated (perform some checks each time)
+def _calculate_multi_seat_results(ballots, choices, numSeats, diagnostics):
+    _winners = []  # Array of winner's names
+    _rounds = []  # [{choice1Name: voteCount, ...}] (index in array = round number)
+    _quota = 0  # Number
+    _totalVotes = -1  # Number (total number of ballots cast)
+    _spoiledBallots = 0  # Number (total number of spoiled ballots)
+
+    stillCounting = True  # Need to know when to stop looping over ballots
+    # Their name will be replaced with "Winner" to indicate a winner of one of the seats
+    remainingChoices = [c["name"] for c in choices]
+    currentRound, totalVotes, spoiledBallots, totalWinners = 0, 0, 0, 0
+    winnerObject = {}  # Keeps track of winning candidates' votes
+
+    while stillCounting:
+        if diagnostics is not None:
+            diagnostics.start_round()
+
+        _rounds.append({c["name"]: 0 for c in choices})  # Adding choices per round
+
+        for i in range(len(ballots)):
+            ranking = ballots[i]["ranking"]
+
+            # If ranking is an empty array, they spoiled the ballot
+            if not ranking:
+                spoiledBallots += 1
+            else:
+                currentRanking = 0
+                keepChecking = True
+                # VoteValue updates as you pass over winners and adjusts accordingly
+                voteValue = 1
+
+                # Keep going down the list if someone's first choice has been eliminated (perform some checks each time)
+                while keepChecking:
                     # Check for someone not completing a ballot fully (i.e. spoiling part of it)
-                    while currentRanking < len(ranking):
+                    if currentRanking < len(ranking):
                         # Check for valid ranking
                         if ranking[currentRanking] < len(choices):
                             name = remainingChoices[ranking[currentRanking]]
-                            if name != "Eliminated":
-                                _rounds[currentRound][name] += 1
-                                break
+                            if name != "Eliminated" and name != "Winner":
+                                _rounds[currentRound][name] += voteValue
+                                keepChecking = False
+                            else:
+                                # This should only be hit after "quota" is set and you're at least on the second round
+                                if name == "Winner":
+                                    name = choices[ranking[currentRanking]]["name"]
+                                    voteValue = (
+                                        voteValue
+                                        * (winnerObject[name] - _quota)
+                                        / (winnerObject[name])
+                                    )
+
+                                currentRanking += 1
                         else:
                             print(
                                 f"ERROR - Ballot contained invalid ranking: {ranking[currentRanking]}"
                             )
                             # TODO: Figure out what we're doing in this edge case, below is temp for now
                             break
-                        currentRanking += 1
-
-                    totalVotes += 1
-
-            # Check the results for this round
-            maxVotes, minVotes = -1, 999999
-            for choice in remainingChoices:
-                if choice != "Eliminated":
-                    votes = _rounds[currentRound][choice]
-
-                    if votes > maxVotes:
-                        maxVotes = votes
-                    if votes < minVotes and choice != RON:
-                        minVotes = votes
-
-            # Assign totalVotes after the first pass through the ballots to use any ballot that has a valid first-preference
-            # Also assign spoiledBallots at this time too
-            if _totalVotes == -1:
-                _totalVotes = totalVotes
-                _spoiledBallots = spoiledBallots
-                _quota = math.floor(totalVotes / (numSeats + 1) + 1)
-
-            # Check for a winner, otherwise keep going and eliminate everyone with the lowest amount of votes total
-            if maxVotes >= _quota:
-                _winners = backwardsEliminationProcess(
-                    -1, maxVotes, remainingChoices, _rounds, currentRound, ballots
-                )
-                stillCounting = False
-            else:
-                backwardsEliminationProcess(
-                    minVotes, -1, remainingChoices, _rounds, currentRound, ballots
-                )
-                currentRound += 1
+                    else:
+                        # This ballot is no longer useful
+                        keepChecking = False
 
-                # Make sure there are still valid candidates left
-                validCandidates = filter(
-                    lambda x: (x != "Eliminated" and x != RON), remainingChoices
-                )
-                if not list(validCandidates):
-                    stillCounting = False
-
-    # CASE 3: Multi-seat election with more than two candidates
-    # >>> Note: Case when RON wins something, stop counting further rounds (remaining seats are unfilled) */
-    else:
-        stillCounting = True  # Need to know when to stop looping over ballots
-        # Their name will be replaced with "Winner" to indicate a winner of one of the seats
-        remainingChoices = [c["name"] for c in choices]
-        currentRound, totalVotes, spoiledBallots, totalWinners = 0, 0, 0, 0
-        winnerObject = {}  # Keeps track of winning candidates' votes
-
-        while stillCounting:
-            _rounds.append({c["name"]: 0 for c in choices})  # Adding choices per round
-
-            for i in range(len(ballots)):
-                ranking = ballots[i]["ranking"]
-
-                # If ranking is an empty array, they spoiled the ballot
-                if not ranking:
-                    spoiledBallots += 1
-                else:
-                    currentRanking = 0
-                    keepChecking = True
-                    # VoteValue updates as you pass over winners and adjusts accordingly
-                    voteValue = 1
-
-                    # Keep going down the list if someone's first choice has been eliminated (perform some checks each time)
-                    while keepChecking:
-                        # Check for someone not completing a ballot fully (i.e. spoiling part of it)
-                        if currentRanking < len(ranking):
-                            # Check for valid ranking
-                            if ranking[currentRanking] < len(choices):
-                                name = remainingChoices[ranking[currentRanking]]
-                                if name != "Eliminated" and name != "Winner":
-                                    _rounds[currentRound][name] += voteValue
-                                    keepChecking = False
-                                else:
-                                    # This should only be hit after "quota" is set and you're at least on the second round
-                                    if name == "Winner":
-                                        name = choices[ranking[currentRanking]]["name"]
-                                        voteValue = (
-                                            voteValue
-                                            * (winnerObject[name] - _quota)
-                                            / (winnerObject[name])
-                                        )
-
-                                    currentRanking += 1
-                            else:
-                                print(
-                                    f"ERROR - Ballot contained invalid ranking: {ranking[currentRanking]}"
-                                )
-                                # TODO: Figure out what we're doing in this edge case, below is temp for now
-                                break
-                        else:
-                            # This ballot is no longer useful
-                            keepChecking = False
-
-                    totalVotes += 1
-
-            # Check the results for this round
-            maxVotes, minVotes = -1, 999999
-            for choice in remainingChoices:
-                if choice != "Eliminated" and choice != "Winner":
-                    votes = _rounds[currentRound][choice]
-
-                    if votes > maxVotes:
-                        maxVotes = votes
-                    if votes < minVotes and choice != RON:
-                        minVotes = votes
-
-            # Assign totalVotes after the first pass through the ballots to use any ballot that has a valid first-preference
-            # Also assign spoiledBallots at this time too
-            if _totalVotes == -1:
-                _totalVotes = totalVotes
-                _spoiledBallots = spoiledBallots
-                _quota = math.floor(totalVotes / (numSeats + 1) + 1)
-
-            # Check for a winner, otherwise keep going and eliminate everyone with the lowest amount of votes total
-            if maxVotes >= _quota:
-                winnerList = backwardsEliminationProcess(
-                    -1, maxVotes, remainingChoices, _rounds, currentRound, ballots
-                )
+                totalVotes += 1
 
-                totalWinners += len(winnerList)
-                _winners.extend(winnerList)
-                for winner in winnerList:
-                    winnerObject[winner] = maxVotes
+        if diagnostics is not None:
+            diagnostics.count_round(ballots, len(choices), remainingChoices)
+
+        # Check the results for this round
+        maxVotes, minVotes = -1, 999999
+        for choice in remainingChoices:
+            if choice != "Eliminated" and choice != "Winner":
+                votes = _rounds[currentRound][choice]
+
+                if votes > maxVotes:
+                    maxVotes = votes
+                if votes < minVotes and choice != RON:
+                    minVotes = votes
+
+        # Assign totalVotes after the first pass through the ballots to use any ballot that has a valid first-preference
+        # Also assign spoiledBallots at this time too
+        if _totalVotes == -1:
+            _totalVotes = totalVotes
+            _spoiledBallots = spoiledBallots
+            _quota = math.floor(totalVotes / (numSeats + 1) + 1)
+
+        # Check for a winner, otherwise keep going and eliminate everyone with the lowest amount of votes total
+        if maxVotes >= _quota:
+            winnerList = backwardsEliminationProcess(
+                -1,
+                maxVotes,
+                remainingChoices,
+                _rounds,
+                currentRound,
+                ballots,
+                diagnostics,
+            )
+
+            totalWinners += len(winnerList)
+            _winners.extend(winnerList)
+            for winner in winnerList:
+                winnerObject[winner] = maxVotes
 
-                if totalWinners >= numSeats or RON in winnerList:
-                    stillCounting = False
+            if totalWinners >= numSeats or RON in winnerList:
+                stillCounting = False
 
-            else:
-                backwardsEliminationProcess(
-                    minVotes, -1, remainingChoices, _rounds, currentRound, ballots
-                )
+        else:
+            backwardsEliminationProcess(
+                minVotes,
+                -1,
+                remainingChoices,
+                _rounds,
+                currentRound,
+                ballots,
+                diagnostics,
+            )
+
+            # Make sure there are still valid candidates left
+            validCandidates = filter(
+                lambda x: (x != "Eliminated" and x != "Winner" and x != RON),
+                remainingChoices,
+            )
+            if not list(validCandidates):
+                stillCounting = False
 
-                # Make sure there are still valid candidates left
-                validCandidates = filter(
-                    lambda x: (x != "Eliminated" and x != "Winner" and x != RON),
-                    remainingChoices,
-                )
-                if not list(validCandidates):
-                    stillCounting = False
+        if diagnostics is not None:
+            diagnostics.end_round()
 
-            currentRound += 1
+        currentRound += 1
 
-    return {
-        "winners": _winners,
-        "rounds": _rounds,
-        "quota": _quota,
-        "totalVotes": _totalVotes,
-        "spoiledBallots": _spoiledBallots,
-    }
+    return _results(
+        _winners, _rounds, _quota, _totalVotes, _spoiledBallots, diagnostics
+    )
 
 
 # /*  Used for deciding which candidate to eliminate or which one to declare as a winner for a round. Use a backwards elimination
@@ -270,7 +467,7 @@ def calculate_results(ballots, choices, numSeats):
 #     should review the ballots carefully in cases of "extreme ties" to make the final call if need be.
 #     Note: either "minVotes" or "maxVotes" will equal -1, so the function decides on the fly which comparison to make.   */
 def backwardsEliminationProcess(
-    minVotes, maxVotes, candidateList, _rounds, currentRound, ballots
+    minVotes, maxVotes, candidateList, _rounds, currentRound, ballots, diagnostics=None
 ):
     # Stores the indices of the names from candidateList
     eliminationList, winnerList = [], []
@@ -297,6 +494,8 @@ def backwardsEliminationProcess(
         candidateList[winnerList[0]] = "Winner"
         return returnList
     else:
+        tied, tiedRound = max(len(eliminationList), len(winnerList)), currentRound
+
         # First look through the rounds backwards until you reach the first round
         while currentRound > 0:
             currentRound -= 1
@@ -368,6 +567,16 @@ def backwardsEliminationProcess(
 
             currentRanking += 1
 
+        if diagnostics is not None:
+            diagnostics.tie_break(
+                isElimination,
+                tied,
+                tiedRound - currentRound,
+                currentRanking - 1,
+                ballots,
+                max(len(eliminationList), len(winnerList)),
+            )
+
         # Always end with going through the list in case you still end up with a tie by the end of the process
         if isElimination:
             for elim in eliminationList:
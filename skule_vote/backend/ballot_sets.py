@@ -0,0 +1,264 @@
+from collections import Counter
+
+from backend.condorcet import calculate_condorcet_results
+from backend.counting import DEFAULT_COUNTING_METHOD, get_counting_method
+from backend.models import (
+    Ballot,
+    BallotSignature,
+    Candidate,
+    Election,
+)
+
+
+class BallotSignatureError(Exception):
+    pass
+
+
+class PackedBallotSet:
+    """
+    A compact, ORM-free view of every ballot cast in a single Election.
+
+    Candidates are kept in a fixed order (by id, which puts Reopen Nominations first)
+    and each ballot is reduced to a tuple of indices into that list. Identical
+    rankings are grouped together with a count, so a set holds at most one entry per
+    distinct ranking rather than one per voter. An empty tuple is a spoiled ballot.
+
+    calculate() counts the set with its counting method, see backend.counting.
+    """
+
+    def __init__(
+        self,
+        election_id,
+        election_name,
+        seats_available,
+        candidates=None,
+        counting_method=DEFAULT_COUNTING_METHOD,
+    ):
+        self.election_id = election_id
+        self.election_name = election_name
+        self.seats_available = seats_available
+        self.counting_method = counting_method
+        # [{"id": ..., "name": ..., "disqualified_status": ...}, ...]
+        self.candidates = candidates if candidates is not None else []
+        # (candidate index, ...) -> number of ballots with exactly that ranking
+        self.rankings = Counter()
+
+    def __len__(self):
+        return sum(self.rankings.values())
+
+    def add(self, ranking, count=1):
+        self.rankings[tuple(ranking)] += count
+
+    def exclude(self, candidate_ids):
+        """
+        Returns a new PackedBallotSet with the given candidates removed, re-indexing
+        the remaining candidates and every ranking to match.
+
+        This mirrors how results have always been computed without disqualified
+        candidates: their entries are dropped from each ranking, and a ballot that
+        only ranked excluded candidates is no longer counted at all. Ballots that
+        were spoiled to begin with stay spoiled.
+        """
+        candidate_ids = set(candidate_ids)
+        remaining, new_indices = [], {}
+        for index, candidate in enumerate(self.candidates):
+            if candidate["id"] not in candidate_ids:
+                new_indices[index] = len(remaining)
+                remaining.append(candidate)
+
+        ballot_set = PackedBallotSet(
+            self.election_id,
+            self.election_name,
+            self.seats_available,
+            remaining,
+            self.counting_method,
+        )
+        for ranking, count in self.rankings.items():
+            new_ranking = tuple(new_indices[i] for i in ranking if i in new_indices)
+            if ranking and not new_ranking:
+                continue
+            ballot_set.add(new_ranking, count)
+        return ballot_set
+
+    def without_disqualified(self):
+        return self.exclude(
+            c["id"] for c in self.candidates if c.get("disqualified_status")
+        )
+
+    def choices(self):
+        return [{"id": c["id"], "name": c["name"]} for c in self.candidates]
+
+    def ballots(self):
+        """
+        Expands the grouped rankings into the ballot list format that calculate_results
+        expects. Ballots with the same ranking share a single dict, which is safe since
+        calculate_results never mutates them.
+        """
+        ballots = []
+        for ranking, count in self.rankings.items():
+            ballots.extend([{"ranking": list(ranking)}] * count)
+        return ballots
+
+    def calculate(self, diagnostics=False):
+        method = get_counting_method(self.counting_method)
+        if diagnostics:
+            return method(self, diagnostics=True)
+        return method(self)
+
+    def election_results(self, include_condorcet=False, diagnostics=False):
+        """
+        Returns the results for this Election both with and without its disqualified
+        Candidates, in the format used by the "Generate results" admin action. With
+        include_condorcet the pairwise cross-check of each is included too, and with
+        diagnostics each count reports its diagnostics.
+        """
+        without_disqualified = self.without_disqualified()
+        results = {
+            # Note: these keys are historical, "results_with_dq" is the count with the
+            # disqualified Candidates removed.
+            "results_with_dq": without_disqualified.calculate(diagnostics),
+            "results_without_dq": self.calculate(diagnostics),
+        }
+        if include_condorcet:
+            results["condorcet_with_dq"] = calculate_condorcet_results(
+                without_disqualified
+            )
+            results["condorcet_without_dq"] = calculate_condorcet_results(self)
+        return results
+
+
+def calculate_election_session_results(
+    ballot_sets, include_condorcet=False, diagnostics=False
+):
+    """
+    Calculates the results of every Election in a dict of PackedBallotSets, keyed by
+    Election name as in the "Generate results" admin download.
+    """
+    return {
+        f"{ballot_set.election_name}": ballot_set.election_results(
+            include_condorcet, diagnostics
+        )
+        for ballot_set in ballot_sets.values()
+    }
+
+
+def _empty_ballot_sets(election_filter):
+    """
+    Builds an empty PackedBallotSet for every Election matching the filter, with its
+    Candidates in place. Also returns a map of Candidate id -> index of that Candidate
+    within its Election's choices.
+    """
+    ballot_sets = {}
+    for election in (
+        Election.objects.filter(**election_filter)
+        .order_by("id")
+        .values("id", "election_name", "seats_available", "counting_method")
+    ):
+        ballot_sets[election["id"]] = PackedBallotSet(
+            election["id"],
+            election["election_name"],
+            election["seats_available"],
+            counting_method=election["counting_method"],
+        )
+
+    candidate_indices = {}
+    for candidate in (
+        Candidate.objects.filter(**_related_filter(election_filter))
+        .order_by("election_id", "id")
+        .values("id", "election_id", "name", "disqualified_status")
+    ):
+        ballot_set = ballot_sets[candidate.pop("election_id")]
+        candidate_indices[candidate["id"]] = len(ballot_set.candidates)
+        ballot_set.candidates.append(candidate)
+
+    return ballot_sets, candidate_indices
+
+
+def _related_filter(election_filter):
+    """Turns a filter on Election into the same filter on a model with an election FK."""
+    return {f"election__{key}": value for key, value in election_filter.items()}
+
+
+def _scan_ballots(election_filter, chunk_size):
+    """
+    Loads the ballots cast in the Elections matching the filter with a single scan
+    over the Ballot table, see load_election_session_ballot_sets.
+    """
+    ballot_sets, candidate_indices = _empty_ballot_sets(election_filter)
+
+    rows = (
+        Ballot.objects.filter(**_related_filter(election_filter))
+        .order_by("election_id", "voter_id", "rank")
+        .values_list("election_id", "voter_id", "candidate_id")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    current_ballot, ranking = None, []
+    for election_id, voter_id, candidate_id in rows:
+        if (election_id, voter_id) != current_ballot:
+            if current_ballot is not None:
+                ballot_sets[current_ballot[0]].add(ranking)
+            current_ballot, ranking = (election_id, voter_id), []
+
+        # Spoiled ballots are a single row without a Candidate
+        if candidate_id is not None:
+            ranking.append(candidate_indices[candidate_id])
+
+    if current_ballot is not None:
+        ballot_sets[current_ballot[0]].add(ranking)
+
+    return ballot_sets
+
+
+def load_election_session_ballot_sets(election_session, chunk_size=2000):
+    """
+    Loads every ballot cast in an ElectionSession and splits them into one
+    PackedBallotSet per Election, keyed by Election id.
+
+    Regardless of the number of Elections this issues exactly three queries: one for
+    the Elections, one for their Candidates, and a single scan over the Ballot table
+    ordered by (election, voter, rank). The scan uses a server-side cursor where the
+    database supports it, so the ballots are grouped as they stream in and only the
+    packed rankings are ever held in memory.
+    """
+    return _scan_ballots({"election_session": election_session}, chunk_size)
+
+
+def load_election_ballot_set(election, chunk_size=2000):
+    """
+    Same as load_election_session_ballot_sets, for a single Election. Returns its
+    PackedBallotSet.
+    """
+    return _scan_ballots({"id": election.id}, chunk_size)[election.id]
+
+
+def load_election_session_signature_sets(election_session):
+    """
+    Same as load_election_session_ballot_sets, but built from the BallotSignature
+    totals maintained when ballots are submitted instead of scanning every Ballot row.
+
+    The totals are advisory, see BallotSignature: only ballots submitted through
+    BallotSerializer are reflected in them, and ballots deleted since are still
+    counted. Raises BallotSignatureError if a ranking includes a Candidate that no
+    longer exists, rather than counting what is left of it.
+    """
+    ballot_sets, candidate_indices = _empty_ballot_sets(
+        {"election_session": election_session}
+    )
+
+    for election_id, signature, count in BallotSignature.objects.filter(
+        election__election_session=election_session, count__gt=0
+    ).values_list("election_id", "signature", "count"):
+        try:
+            ranking = [
+                candidate_indices[candidate_id]
+                for candidate_id in BallotSignature.to_candidate_ids(signature)
+            ]
+        except KeyError as e:
+            raise BallotSignatureError(
+                f"The ranking totals of Election {election_id} include Candidate "
+                f"{e.args[0]}, which no longer exists."
+            ) from e
+        ballot_sets[election_id].add(ranking, count)
+
+    return ballot_sets
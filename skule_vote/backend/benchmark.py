@@ -0,0 +1,235 @@
+"""
+Benchmarks of the ballot counting engine, run with the benchmark_counting management
+command.
+
+Two kinds of case are timed:
+
+    "count"     calculate_results on a PackedBallotSet held in memory, split into the
+                "expand" stage (PackedBallotSet.ballots()) and the "count" stage.
+    "pipeline"  the "Generate results" admin action: the ballots are bulk inserted
+                ("insert", not included in the throughput), then generate_results
+                loads, counts and stores the results of the new ElectionSession
+                ("results"). Everything is written inside a transaction that is
+                rolled back, so the database is left as it was. The memory report
+                admin action breaks the results down further.
+
+Both kinds are run on the dumps in backend/test_data and on synthetic elections.
+Every stage reports its wall time and the peak memory allocated by Python while it
+ran (from tracemalloc, so allocations made by the database driver in C are not
+included, and null for "insert", which isn't traced). If tracemalloc was already
+tracing, it is left running, though the peak it reports is reset by each stage. The
+report is a JSON document:
+
+    {
+        "python": "3.9.7", "database": "postgresql", "startedAt": "...",
+        "cases": [
+            {
+                "name": "synthetic", "kind": "count",
+                "ballots": 1000, "candidates": 5, "seats": 1,
+                "seconds": 0.01, "ballotsPerSecond": 100000.0, "peakMemory": 123456,
+                "stages": {"expand": {"seconds": ..., "peakMemory": ...}, "count": {...}},
+            },
+        ],
+    }
+"""
+from contextlib import contextmanager
+from datetime import timedelta
+import os
+import platform
+import time
+import tracemalloc
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from backend.admin import generate_results
+from backend.ballot import calculate_results
+from backend.legacy_import import (
+    TEST_DATA_DIR,
+    import_dynamodb_election,
+    read_dynamodb_ballot_set,
+)
+from backend.models import ElectionSession
+from backend.synthetic import generate_ballot_set, insert_ballot_set
+
+DEFAULT_BALLOTS = [1000, 10000, 100000, 500000]
+DEFAULT_CANDIDATES = [2, 5, 10, 30]
+
+
+class _Stages:
+    """Times a sequence of named stages, tracking the peak memory of each."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, trace_memory=True):
+        """
+        tracemalloc slows Python down several times over, so stages that are only
+        there to set up the next ones can turn it off.
+        """
+        start_tracing = trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        elif trace_memory:
+            tracemalloc.reset_peak()
+        if trace_memory:
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_memory = None
+            if trace_memory:
+                peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+            if start_tracing:
+                tracemalloc.stop()
+        self.stages[name] = {"seconds": seconds, "peakMemory": peak_memory}
+
+
+def _case(name, kind, ballot_set, run, timed_stages):
+    """
+    Runs run(stages) and returns the report entry for the case. The throughput and
+    peak memory only cover the timed_stages.
+    """
+    stages = _Stages()
+    run(stages)
+
+    seconds = sum(stages.stages[stage]["seconds"] for stage in timed_stages)
+    return {
+        "name": name,
+        "kind": kind,
+        "ballots": len(ballot_set),
+        "candidates": len(ballot_set.candidates),
+        "seats": ballot_set.seats_available,
+        "seconds": seconds,
+        "ballotsPerSecond": len(ballot_set) / seconds if seconds else None,
+        "peakMemory": max(stages.stages[stage]["peakMemory"] for stage in timed_stages),
+        "stages": stages.stages,
+    }
+
+
+def synthetic_ballot_set(num_ballots, num_choices, seats_available=1, seed=0):
+    """
+    The synthetic elections benchmarked: num_choices includes Reopen Nominations, and
+    the rankings are impartial culture cut off at a uniformly random length, with 1%
+    of ballots spoiled. See backend.synthetic.
+    """
+    return generate_ballot_set(
+        num_ballots,
+        num_choices - 1,
+        seats_available,
+        truncation="uniform",
+        spoil_rate=0.01,
+        seed=seed,
+    )
+
+
+def benchmark_count(name, ballot_set):
+    def run(stages):
+        with stages.stage("expand"):
+            ballots = ballot_set.ballots()
+            choices = ballot_set.choices()
+        with stages.stage("count"):
+            calculate_results(ballots, choices, ballot_set.seats_available)
+
+    return _case(name, "count", ballot_set, run, ["expand", "count"])
+
+
+def _rolled_back_election_session(run):
+    """
+    Calls run(election_session) with a new ElectionSession, inside a transaction that
+    is rolled back afterwards.
+    """
+    with transaction.atomic():
+        election_session = ElectionSession.objects.create(
+            election_session_name="Benchmark",
+            start_time=timezone.now() - timedelta(days=1),
+            end_time=timezone.now(),
+        )
+        try:
+            run(election_session)
+        finally:
+            transaction.set_rollback(True)
+
+
+def _benchmark_pipeline(name, ballot_set, insert):
+    def run(stages):
+        def in_election_session(election_session):
+            with stages.stage("insert", trace_memory=False):
+                insert(election_session)
+            with stages.stage("results"):
+                generate_results(ElectionSession.objects.filter(id=election_session.id))
+
+        _rolled_back_election_session(in_election_session)
+
+    return _case(name, "pipeline", ballot_set, run, ["results"])
+
+
+def benchmark_pipeline(name, ballot_set):
+    return _benchmark_pipeline(
+        name,
+        ballot_set,
+        lambda election_session: insert_ballot_set(election_session, ballot_set),
+    )
+
+
+def benchmark_dump_pipeline(name, path, ballot_set):
+    return _benchmark_pipeline(
+        name,
+        ballot_set,
+        lambda election_session: import_dynamodb_election(path, election_session),
+    )
+
+
+def run_benchmarks(
+    ballots=None,
+    candidates=None,
+    seats_available=1,
+    pipeline_max_ballots=100000,
+    seed=0,
+    progress=None,
+):
+    """
+    Runs every case and returns the report described at the top of this module.
+    Synthetic elections are built for every combination of the ballots and
+    candidates counts; the pipeline is only run on those with at most
+    pipeline_max_ballots ballots (None skips the pipeline entirely). progress, if
+    given, is called with each case as it finishes.
+    """
+    ballots = DEFAULT_BALLOTS if ballots is None else ballots
+    candidates = DEFAULT_CANDIDATES if candidates is None else candidates
+    run_pipeline = pipeline_max_ballots is not None
+
+    report = {
+        "python": platform.python_version(),
+        "database": connection.vendor,
+        "startedAt": timezone.now().isoformat(),
+        "cases": [],
+    }
+
+    def add(case):
+        report["cases"].append(case)
+        if progress is not None:
+            progress(case)
+
+    for file_name in sorted(os.listdir(TEST_DATA_DIR)):
+        path = os.path.join(TEST_DATA_DIR, file_name)
+        with open(path, "r", encoding="utf-8") as f:
+            ballot_set = read_dynamodb_ballot_set(f)
+        add(benchmark_count(file_name, ballot_set))
+        if run_pipeline:
+            add(benchmark_dump_pipeline(file_name, path, ballot_set))
+
+    for num_ballots in ballots:
+        for num_candidates in candidates:
+            ballot_set = synthetic_ballot_set(
+                num_ballots, num_candidates, seats_available, seed
+            )
+            add(benchmark_count("synthetic", ballot_set))
+            if run_pipeline and num_ballots <= pipeline_max_ballots:
+                add(benchmark_pipeline("synthetic", ballot_set))
+
+    return report
@@ -0,0 +1,72 @@
+"""
+Pairwise (Condorcet) cross-check of the results from backend/ballot.py.
+
+The pairwise matrix is built in one pass over the grouped rankings of a
+PackedBallotSet, so its cost depends on the number of distinct rankings rather than
+the number of ballots. A Candidate ranked on a ballot is preferred to every Candidate
+ranked below it and to every Candidate left off it; spoiled ballots express no
+preferences.
+"""
+
+
+def pairwise_matrix(ballot_set):
+    """
+    Returns d, where d[i][j] is the number of ballots preferring the Candidate at
+    index i over the one at index j.
+    """
+    num_candidates = len(ballot_set.candidates)
+    d = [[0] * num_candidates for _ in range(num_candidates)]
+
+    for ranking, count in ballot_set.rankings.items():
+        below = set(range(num_candidates))
+        for candidate in ranking:
+            below.discard(candidate)
+            row = d[candidate]
+            for other in below:
+                row[other] += count
+    return d
+
+
+def condorcet_winner(d):
+    """Returns the index of the Candidate who beats every other one head to head."""
+    for i, row in enumerate(d):
+        if all(row[j] > d[j][i] for j in range(len(d)) if j != i):
+            return i
+    return None
+
+
+def schulze_winners(d):
+    """
+    Returns the indices of the Schulze winners: the Candidates whose strongest path
+    to every other Candidate is at least as strong as the path back. There is
+    usually exactly one, more only on ties.
+    """
+    n = len(d)
+    p = [[d[i][j] if d[i][j] > d[j][i] else 0 for j in range(n)] for i in range(n)]
+
+    for k in range(n):
+        for i in range(n):
+            if i == k:
+                continue
+            for j in range(n):
+                if j != i and j != k:
+                    p[i][j] = max(p[i][j], min(p[i][k], p[k][j]))
+
+    return [i for i in range(n) if all(p[i][j] >= p[j][i] for j in range(n) if j != i)]
+
+
+def calculate_condorcet_results(ballot_set):
+    """
+    Returns the pairwise matrix of a PackedBallotSet along with its Condorcet and
+    Schulze winners, by name, to be shown next to the calculate_results results.
+    """
+    names = [c["name"] for c in ballot_set.candidates]
+    d = pairwise_matrix(ballot_set)
+    winner = condorcet_winner(d)
+
+    return {
+        "choices": names,
+        "pairwiseMatrix": d,
+        "condorcetWinner": names[winner] if winner is not None else None,
+        "schulzeWinners": [names[i] for i in schulze_winners(d)],
+    }
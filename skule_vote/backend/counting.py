@@ -0,0 +1,60 @@
+"""
+Registry of the methods an Election's ballots can be counted with.
+
+A counting method takes a PackedBallotSet (see backend.ballot_sets) and returns its
+results in the same format as calculate_results:
+
+    {"winners": [...], "rounds": [...], "quota": ..., "totalVotes": ..., "spoiledBallots": ...}
+
+Methods are registered under a name with register_counting_method, and each Election
+picks one by that name in its counting_method field. Adding a method changes the
+field's choices, so it needs a migration like any other choices change.
+
+Methods that can report diagnostics about the count (see CountDiagnostics in
+backend/ballot.py) accept a diagnostics keyword argument; it is only ever passed when
+diagnostics are wanted.
+"""
+from backend.ballot import calculate_results
+
+DEFAULT_COUNTING_METHOD = "instant_runoff"
+
+# name -> (label, method)
+_counting_methods = {}
+
+
+def register_counting_method(name, label):
+    """Decorator that registers a counting method under the given name."""
+
+    def register(method):
+        if name in _counting_methods:
+            raise ValueError(f"A counting method named {name} already exists.")
+        _counting_methods[name] = (label, method)
+        return method
+
+    return register
+
+
+def get_counting_method(name):
+    try:
+        return _counting_methods[name][1]
+    except KeyError:
+        raise ValueError(f"Unknown counting method: {name}.")
+
+
+def counting_method_choices():
+    return [(name, label) for name, (label, _) in _counting_methods.items()]
+
+
+@register_counting_method(DEFAULT_COUNTING_METHOD, "Instant runoff")
+def instant_runoff(ballot_set, diagnostics=False):
+    """
+    The method results have always been counted with: instant runoff for a single
+    seat, single transferable vote for several, and a straight count when there are
+    only two choices. See backend/ballot.py.
+    """
+    return calculate_results(
+        ballots=ballot_set.ballots(),
+        choices=ballot_set.choices(),
+        numSeats=ballot_set.seats_available,
+        diagnostics=diagnostics,
+    )
@@ -0,0 +1,221 @@
+"""
+Differential testing of counting methods (see backend.counting) against the legacy
+engine in backend/ballot.py, run with the differential_test management command.
+
+Both engines count the same PackedBallotSets, the dumps in backend/test_data and
+small randomized elections from backend.synthetic, which run into ties and
+backwardsEliminationProcess far more often than real ones. The results must be
+identical: winners, every round, quota, totalVotes and spoiledBallots.
+
+Whenever they differ, the ballot set is shrunk to a minimal reproducer: seats,
+Candidates, groups of identical ballots, ballots and choices within a ranking are
+removed one at a time for as long as the engines still disagree.
+"""
+import os
+import random
+
+from backend.ballot import RON
+from backend.ballot_sets import PackedBallotSet
+from backend.counting import DEFAULT_COUNTING_METHOD, get_counting_method
+from backend.legacy_import import TEST_DATA_DIR, read_dynamodb_ballot_set
+from backend.synthetic import MODELS, TRUNCATIONS, generate_ballot_set
+
+
+def _differences(expected, actual, tolerance, path="results"):
+    """
+    Returns a description of every value that differs between the expected and
+    actual results. Numbers may differ by up to tolerance.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in list(expected) + [key for key in actual if key not in expected]:
+            if key not in expected or key not in actual:
+                differences.append(f"{path}[{key!r}] is missing from one engine")
+            else:
+                differences += _differences(
+                    expected[key], actual[key], tolerance, f"{path}[{key!r}]"
+                )
+        return differences
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f"{path} has {len(expected)} entries, not {len(actual)}"]
+        differences = []
+        for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            differences += _differences(
+                expected_item, actual_item, tolerance, f"{path}[{i}]"
+            )
+        return differences
+
+    numbers = (int, float)
+    if (
+        isinstance(expected, numbers)
+        and isinstance(actual, numbers)
+        and not isinstance(expected, bool)
+    ):
+        if abs(expected - actual) <= tolerance:
+            return []
+    elif expected == actual:
+        return []
+    return [f"{path}: expected {expected!r}, got {actual!r}"]
+
+
+def compare(reference, candidate, ballot_set, tolerance=0):
+    """
+    Counts the PackedBallotSet with both engines (functions of a PackedBallotSet, as
+    registered in backend.counting) and returns the list of differences, empty if
+    they agree. An exception raised by the candidate engine is a difference too.
+    """
+    expected = reference(ballot_set)
+    try:
+        actual = candidate(ballot_set)
+    except Exception as e:
+        return [f"{type(e).__name__}: {e}"]
+    return _differences(expected, actual, tolerance)
+
+
+def _with_rankings(ballot_set, rankings, seats_available=None):
+    smaller = PackedBallotSet(
+        ballot_set.election_id,
+        ballot_set.election_name,
+        ballot_set.seats_available if seats_available is None else seats_available,
+        ballot_set.candidates,
+        ballot_set.counting_method,
+    )
+    for ranking, count in rankings:
+        if count > 0:
+            smaller.add(ranking, count)
+    return smaller
+
+
+def _smaller_ballot_sets(ballot_set):
+    """Yields every one-step reduction of the PackedBallotSet, largest steps first."""
+    groups = list(ballot_set.rankings.items())
+
+    if ballot_set.seats_available > 1:
+        yield _with_rankings(ballot_set, groups, ballot_set.seats_available - 1)
+
+    if len(groups) > 1:
+        half = len(groups) // 2
+        yield _with_rankings(ballot_set, groups[half:])
+        yield _with_rankings(ballot_set, groups[:half])
+
+    for candidate in ballot_set.candidates:
+        if candidate["name"] != RON:
+            yield ballot_set.exclude([candidate["id"]])
+
+    for i, (ranking, count) in enumerate(groups):
+        others = groups[:i] + groups[i + 1 :]
+        yield _with_rankings(ballot_set, others)
+        if count > 1:
+            yield _with_rankings(ballot_set, others + [(ranking, count // 2)])
+            yield _with_rankings(ballot_set, others + [(ranking, count - 1)])
+
+    for i, (ranking, count) in enumerate(groups):
+        others = groups[:i] + groups[i + 1 :]
+        for position in range(len(ranking)):
+            shorter = ranking[:position] + ranking[position + 1 :]
+            # A ballot left without choices would become a spoiled ballot instead
+            if shorter:
+                yield _with_rankings(ballot_set, others + [(shorter, count)])
+
+
+def shrink(ballot_set, fails):
+    """
+    Returns the smallest PackedBallotSet found, by repeatedly applying one-step
+    reductions, for which fails(ballot_set) is still true.
+    """
+    while True:
+        for smaller in _smaller_ballot_sets(ballot_set):
+            try:
+                still_fails = fails(smaller)
+            except Exception:
+                # The reference engine can't count it, so it's no reproducer
+                still_fails = False
+            if still_fails:
+                ballot_set = smaller
+                break
+        else:
+            return ballot_set
+
+
+def reproducer(ballot_set):
+    """The arguments calculate_results would be called with for the PackedBallotSet."""
+    return {
+        "numSeats": ballot_set.seats_available,
+        "choices": ballot_set.choices(),
+        "ballots": ballot_set.ballots(),
+    }
+
+
+def random_ballot_sets(num_cases, seed=0):
+    """Yields (description, PackedBallotSet) for small randomized elections."""
+    rng = random.Random(seed)
+    for case in range(num_cases):
+        ballot_set = generate_ballot_set(
+            rng.randint(1, 40),
+            rng.randint(1, 6),
+            seats_available=rng.randint(1, 3),
+            model=rng.choice(MODELS),
+            dispersion=rng.random(),
+            truncation=rng.choice(TRUNCATIONS),
+            spoil_rate=rng.choice([0, 0.05, 0.2]),
+            ron_first_rate=rng.choice([0, 0.1]),
+            ron_last_rate=rng.choice([0, 0.3]),
+            seed=rng.randrange(2**32),
+        )
+        yield f"random case {case} (seed {seed})", ballot_set
+
+
+def fixture_ballot_sets():
+    """Yields (file name, PackedBallotSet) for the dumps in backend/test_data."""
+    for file_name in sorted(os.listdir(TEST_DATA_DIR)):
+        with open(os.path.join(TEST_DATA_DIR, file_name), "r", encoding="utf-8") as f:
+            yield file_name, read_dynamodb_ballot_set(f)
+
+
+def differential_test(
+    candidate,
+    reference=DEFAULT_COUNTING_METHOD,
+    num_cases=500,
+    seed=0,
+    fixtures=True,
+    tolerance=0,
+):
+    """
+    Compares the candidate counting method with the reference, both given by their
+    names in backend.counting, on the test_data dumps (unless fixtures is False) and
+    num_cases randomized elections. Returns a list with an entry for every ballot set
+    they disagree on:
+
+        {
+            "source": "random case 12 (seed 0)",
+            "differences": ["results['winners']: expected [...], got [...]"],
+            "reproducer": {"numSeats": 1, "choices": [...], "ballots": [...]},
+        }
+
+    where the reproducer is the shrunk ballot set, and the differences are those on
+    the reproducer.
+    """
+    reference = get_counting_method(reference)
+    candidate = get_counting_method(candidate)
+
+    def fails(ballot_set):
+        return bool(compare(reference, candidate, ballot_set, tolerance))
+
+    ballot_sets = random_ballot_sets(num_cases, seed)
+    if fixtures:
+        ballot_sets = list(fixture_ballot_sets()) + list(ballot_sets)
+
+    mismatches = []
+    for source, ballot_set in ballot_sets:
+        if fails(ballot_set):
+            smallest = shrink(ballot_set, fails)
+            mismatches.append(
+                {
+                    "source": source,
+                    "differences": compare(reference, candidate, smallest, tolerance),
+                    "reproducer": reproducer(smallest),
+                }
+            )
+    return mismatches
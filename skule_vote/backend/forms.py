@@ -1,9 +1,11 @@
+from contextlib import ExitStack, closing
 import csv
 from datetime import datetime
 import io
 
 from django import forms
 from django.conf import settings
+from django.db import transaction
 
 from backend.models import Candidate, ElectionSession, Election, Eligibility
 
@@ -12,7 +14,147 @@ def _now():
     return datetime.now().astimezone(settings.TZ_INFO)
 
 
-class ElectionSessionAdminForm(forms.ModelForm):
+class _CSVStream:
+    """
+    Iterates over the rows of an uploaded CSV file, decoding it incrementally as it is
+    read rather than loading the whole file into memory first.
+    """
+
+    def __init__(self, upload):
+        upload.file.seek(0)
+        self._text = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        self._reader = csv.reader(self._text, delimiter=",")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._reader)
+
+    @property
+    def line_num(self):
+        return self._reader.line_num
+
+    def close(self):
+        # Detach rather than close, which would close the uploaded file with it
+        self._text.detach()
+
+
+class _CSVErrors:
+    """
+    Collects the errors found in the rows of a CSV file. Only the first MAX_ERRORS
+    are reported, so a file that is wrong throughout doesn't flood the admin page.
+    """
+
+    MAX_ERRORS = 20
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.errors = []
+        self.count = 0
+
+    def add(self, line_num, message, file_names=None):
+        self.count += 1
+        if self.count <= self.MAX_ERRORS:
+            file_names = ", ".join(file_names or [self.file_name])
+            self.errors.append(f"[{file_names}] {message} Error at line {line_num}.")
+
+    def messages(self):
+        if self.count > self.MAX_ERRORS:
+            return self.errors + [
+                f"[{self.file_name}] {self.count - self.MAX_ERRORS} more errors were found."
+            ]
+        return self.errors
+
+
+class _ElectionSessionTimesMixin:
+    """
+    Validation of ElectionSession start and end times shared by the ElectionSession forms.
+    """
+
+    def times_check(self):
+        if (
+            "start_time" not in self.cleaned_data.keys()
+            or "end_time" not in self.cleaned_data.keys()
+        ):
+            raise forms.ValidationError(
+                "The ElectionSession must have a valid start and end time."
+            )
+
+        if (
+            self.cleaned_data["start_time"] is not None
+            and self.cleaned_data["end_time"] is not None
+            and self.cleaned_data["start_time"].astimezone(settings.TZ_INFO)
+            >= self.cleaned_data["end_time"].astimezone(settings.TZ_INFO)
+        ):
+            raise forms.ValidationError(
+                "The ElectionSession must start before it ends. Ensure that your start time is before your end time."
+            )
+
+        self.overlapping_election_sessions_check()
+
+    def overlapping_election_sessions_check(self):
+
+        # Check if creating a new ElectionSession, or modifying an existing one
+        # Exclude only if modifying an existing one
+        exclude_id = self.instance.id if self.instance is not None else -1
+
+        # Check for ElectionSessions that have an overlapping start time within the new ElectionSession's time range
+        election_session_overlapping_start = (
+            ElectionSession.objects.filter(
+                start_time__gte=self.cleaned_data["start_time"].astimezone(
+                    settings.TZ_INFO
+                ),
+                start_time__lte=self.cleaned_data["end_time"].astimezone(
+                    settings.TZ_INFO
+                ),
+            )
+            .exclude(id=exclude_id)
+            .exists()
+        )
+
+        # Check for ElectionSessions that have an overlapping end time within the new ElectionSession's time range
+        election_session_overlapping_end = (
+            ElectionSession.objects.filter(
+                end_time__gte=self.cleaned_data["start_time"].astimezone(
+                    settings.TZ_INFO
+                ),
+                end_time__lte=self.cleaned_data["end_time"].astimezone(
+                    settings.TZ_INFO
+                ),
+            )
+            .exclude(id=exclude_id)
+            .exists()
+        )
+
+        # Check for ElectionSessions that envelop the new ElectionSession's time range
+        election_session_enveloping = (
+            ElectionSession.objects.filter(
+                start_time__lte=self.cleaned_data["start_time"].astimezone(
+                    settings.TZ_INFO
+                ),
+                end_time__gte=self.cleaned_data["end_time"].astimezone(
+                    settings.TZ_INFO
+                ),
+            )
+            .exclude(id=exclude_id)
+            .exists()
+        )
+
+        overlapping_election_sessions_present = (
+            election_session_overlapping_start
+            or election_session_overlapping_end
+            or election_session_enveloping
+        )
+
+        if overlapping_election_sessions_present:
+            raise forms.ValidationError(
+                f"Election Sessions must be non-overlapping. Please ensure the date range of "
+                f"the Election Session is not contained within any other Election Session."
+            )
+
+
+class ElectionSessionAdminForm(_ElectionSessionTimesMixin, forms.ModelForm):
     """
     Provides functionality for uploading CSV files which contain data for
     Elections, Candidates, and Eligibilities for that ElectionSession.
@@ -106,25 +248,7 @@ class ElectionSessionAdminForm(forms.ModelForm):
         """
         cleaned_data = super().clean()
 
-        if (
-            "start_time" not in self.cleaned_data.keys()
-            or "end_time" not in self.cleaned_data.keys()
-        ):
-            raise forms.ValidationError(
-                "The ElectionSession must have a valid start and end time."
-            )
-
-        if (
-            self.cleaned_data["start_time"] is not None
-            and self.cleaned_data["end_time"] is not None
-            and self.cleaned_data["start_time"].astimezone(settings.TZ_INFO)
-            >= self.cleaned_data["end_time"].astimezone(settings.TZ_INFO)
-        ):
-            raise forms.ValidationError(
-                "The ElectionSession must start before it ends. Ensure that your start time is before your end time."
-            )
-
-        self.overlapping_election_sessions_check()
+        self.times_check()
 
         # Get a list of the field names that should be readonly
         read_only_field_names = [field["field_name"] for field in self.read_only_fields]
@@ -158,7 +282,7 @@ class ElectionSessionAdminForm(forms.ModelForm):
                 "none at all."
             )
 
-        # If all files were uploaded extract the CSV data and pass it to the csv_checker functions
+        # If all files were uploaded pass them to the csv_checker functions
         elif raw_uploads.count(None) == 0:
             # Check to make sure user uploads a CSV and not a different type of file.
             for file in raw_uploads:
@@ -168,59 +292,17 @@ class ElectionSessionAdminForm(forms.ModelForm):
                         f"supported. Please upload your files again. Error at: [{file.name}]"
                     )
 
-            # Make sure we're at the beginning of the file
-            self.cleaned_data["upload_elections"].file.seek(0)
-            elections_data = list(
-                csv.reader(
-                    io.StringIO(
-                        self.cleaned_data["upload_elections"]
-                        .file.read()
-                        .decode("utf-8")
-                    ),
-                    delimiter=",",
-                )
-            )
-
-            # Make sure we're at the beginning of the file
-            self.cleaned_data["upload_candidates"].file.seek(0)
-            candidates_data = list(
-                csv.reader(
-                    io.StringIO(
-                        self.cleaned_data["upload_candidates"]
-                        .file.read()
-                        .decode("utf-8")
-                    ),
-                    delimiter=",",
-                )
-            )
-
-            # Make sure we're at the beginning of the file
-            self.cleaned_data["upload_eligibilities"].file.seek(0)
-            eligibilities_data = list(
-                csv.reader(
-                    io.StringIO(
-                        self.cleaned_data["upload_eligibilities"]
-                        .file.read()
-                        .decode("utf-8")
-                    ),
-                    delimiter=",",
-                )
-            )
-
             self.file_upload_list = {
                 "elections": {
-                    "header": elections_data.pop(0),
-                    "body": elections_data,
+                    "file": self.cleaned_data["upload_elections"],
                     "file_name": self.cleaned_data["upload_elections"].name,
                 },
                 "candidates": {
-                    "header": candidates_data.pop(0),
-                    "body": candidates_data,
+                    "file": self.cleaned_data["upload_candidates"],
                     "file_name": self.cleaned_data["upload_candidates"].name,
                 },
                 "eligibilities": {
-                    "header": eligibilities_data.pop(0),
-                    "body": eligibilities_data,
+                    "file": self.cleaned_data["upload_eligibilities"],
                     "file_name": self.cleaned_data["upload_eligibilities"].name,
                 },
             }
@@ -229,85 +311,54 @@ class ElectionSessionAdminForm(forms.ModelForm):
             self.csv_checks()
         return cleaned_data
 
-    def overlapping_election_sessions_check(self):
+    def csv_checks(self):
+        """
+        Main checks function. All other functions are called from here.
+        This calls headers_check beforehand to ensure that the headers are standardized,
+        since the header is used as a reference within the other checks functions.
 
-        # Check if creating a new ElectionSession, or modifying an existing one
-        # Exclude only if modifying an existing one
-        exclude_id = self.instance.id if self.instance is not None else -1
+        The files are then checked in a single pass, decoding each one row by row as it
+        is read so that they are never held in memory in full. Every error found is
+        collected, along with the line it was found on, and they are reported together
+        at the end.
+        """
 
-        # Check for ElectionSessions that have an overlapping start time within the new ElectionSession's time range
-        election_session_overlapping_start = (
-            ElectionSession.objects.filter(
-                start_time__gte=self.cleaned_data["start_time"].astimezone(
-                    settings.TZ_INFO
-                ),
-                start_time__lte=self.cleaned_data["end_time"].astimezone(
-                    settings.TZ_INFO
-                ),
-            )
-            .exclude(id=exclude_id)
-            .exists()
-        )
+        with ExitStack() as stack:
+            streams = {
+                key: stack.enter_context(closing(_CSVStream(upload["file"])))
+                for key, upload in self.file_upload_list.items()
+            }
 
-        # Check for ElectionSessions that have an overlapping end time within the new ElectionSession's time range
-        election_session_overlapping_end = (
-            ElectionSession.objects.filter(
-                end_time__gte=self.cleaned_data["start_time"].astimezone(
-                    settings.TZ_INFO
-                ),
-                end_time__lte=self.cleaned_data["end_time"].astimezone(
-                    settings.TZ_INFO
-                ),
-            )
-            .exclude(id=exclude_id)
-            .exists()
-        )
+            for key, stream in streams.items():
+                self.file_upload_list[key]["header"] = self.read_header(key, stream)
 
-        # Check for ElectionSessions that envelop the new ElectionSession's time range
-        election_session_enveloping = (
-            ElectionSession.objects.filter(
-                start_time__lte=self.cleaned_data["start_time"].astimezone(
-                    settings.TZ_INFO
-                ),
-                end_time__gte=self.cleaned_data["end_time"].astimezone(
-                    settings.TZ_INFO
-                ),
-            )
-            .exclude(id=exclude_id)
-            .exists()
-        )
+            # Insert check headers here before other checks
+            self.headers_check()
 
-        overlapping_election_sessions_present = (
-            election_session_overlapping_start
-            or election_session_overlapping_end
-            or election_session_enveloping
-        )
+            self.rows_check(streams)
 
-        if overlapping_election_sessions_present:
+    def read_header(self, key, stream):
+        """Reads the header row of one of the CSV files."""
+        try:
+            header = next(stream, None)
+        except UnicodeDecodeError:
+            self.add_error(
+                f"upload_{key}",
+                f"[{self.file_upload_list[key]['file_name']}] The CSV file must be UTF-8 encoded.",
+            )
             raise forms.ValidationError(
-                f"Election Sessions must be non-overlapping. Please ensure the date range of "
-                f"the Election Session is not contained within any other Election Session."
+                "Invalid header discovered. See more info below."
             )
 
-    def csv_checks(self):
-        """
-        Main checks function. All other functions are called from here.
-        This calls headers_check and lengths_check beforehand to ensure that the headers
-        and number of entries per row are all standardized, since these parameters are used
-        as references within the other checks functions.
-        """
-
-        # Insert check headers here before other checks
-        self.headers_check()
-        self.lengths_check()
-
-        method_list = [
-            method
-            for method in dir(ElectionSessionAdminForm)
-            if method.startswith("check_")
-        ]
-        for method in method_list:
-            getattr(self, method)()
+        if header is None:
+            self.add_error(
+                f"upload_{key}",
+                f"[{self.file_upload_list[key]['file_name']}] The CSV file is empty.",
+            )
+            raise forms.ValidationError(
+                "Invalid header discovered. See more info below."
+            )
+        return header
 
     def headers_check(self):
         """Checks if all the CSV files have the correct headers."""
@@ -341,157 +392,162 @@ class ElectionSessionAdminForm(forms.ModelForm):
                     "Incomplete header discovered. See more info below."
                 )
 
-    def lengths_check(self):
+    def rows_check(self, streams):
         """
-        Checks if all the rows in all the CSVs are the same length.
-        Also checks that Elections and Eligibilities CSVs have the same number of rows.
+        Checks every row of the CSV files, in one pass over each file:
+        1. All the rows must be the same length as the header.
+        2. Election names in the Candidates and Eligibilities CSVs must match those in
+           the Elections CSV, which is read first for that reason.
+        3. The Elections and Eligibilities CSVs must have the same number of rows.
+        4. The values within each row must be valid, see the check_*_row functions.
+
+        Errors for rows of the wrong length or with unknown Election names are reported
+        as before, along with an error for the whole form. Rows of the wrong length
+        aren't checked any further.
         """
 
-        error_found = False
-        for key in self.file_upload_list:
+        row_checks = {
+            "elections": self.check_election_seats_and_categories,
+            "candidates": None,
+            "eligibilities": self.check_eligible_fields,
+        }
+        row_counts = {}
+        election_names = set()
+        length_error_found = False
+        election_name_error_found = False
+
+        for key, stream in streams.items():
+            file_name = self.file_upload_list[key]["file_name"]
             header = self.file_upload_list[key]["header"]
-            body = self.file_upload_list[key]["body"]
-            for row in body:
-                if len(row) != len(header):
-                    error_found = True
-                    ElectionSessionAdminForm.add_error(
-                        self=self,
-                        field=f"upload_{key}",
-                        error=f"[{self.file_upload_list[key]['file_name']}] All rows in the CSV must be the same "
-                        f"length as the header. Ensure that any commas that may exist in text are enclosed in "
-                        f"quotation marks. Ensure there are no additional trailing commas at the end of any"
-                        f" rows.",
-                    )
-                    break
-        if error_found:
-            raise forms.ValidationError(
+            election_name_index = header.index("election_name")
+            errors = _CSVErrors(file_name)
+            row_count = 0
+
+            try:
+                for row in stream:
+                    row_count += 1
+                    if key == "elections" and election_name_index < len(row):
+                        election_names.add(row[election_name_index])
+
+                    if len(row) != len(header):
+                        length_error_found = True
+                        errors.add(
+                            stream.line_num,
+                            "All rows in the CSV must be the same length as the header. Ensure that any commas "
+                            "that may exist in text are enclosed in quotation marks. Ensure there are no "
+                            "additional trailing commas at the end of any rows.",
+                        )
+                        continue
+
+                    if (
+                        key != "elections"
+                        and row[election_name_index] not in election_names
+                    ):
+                        election_name_error_found = True
+                        errors.add(
+                            stream.line_num,
+                            f"Election names within the {key.capitalize()} CSV must match those within the "
+                            f"Elections CSV. Invalid Election name discovered: {row[election_name_index]}",
+                            file_names=[
+                                self.file_upload_list["elections"]["file_name"],
+                                file_name,
+                            ],
+                        )
+
+                    if row_checks[key] is not None:
+                        for error in row_checks[key](header, row):
+                            errors.add(stream.line_num, error)
+            except UnicodeDecodeError:
+                errors.add(stream.line_num + 1, "The CSV file must be UTF-8 encoded.")
+                length_error_found = True
+
+            for error in errors.messages():
+                self.add_error(f"upload_{key}", error)
+            row_counts[key] = row_count
+
+        non_field_errors = []
+        if length_error_found:
+            non_field_errors.append(
                 "Invalid row length discovered. See more info below."
             )
 
         # Check that Election and Eligibility CSVs are the same length
-        if len(self.file_upload_list["elections"]["body"]) != len(
-            self.file_upload_list["eligibilities"]["body"]
-        ):
-            ElectionSessionAdminForm.add_error(
-                self=self,
-                field="upload_elections",
-                error=f"[{self.file_upload_list['elections']['file_name']}] "
+        elif row_counts["elections"] != row_counts["eligibilities"]:
+            self.add_error(
+                "upload_elections",
+                f"[{self.file_upload_list['elections']['file_name']}] "
                 f"Elections and Eligibilities CSVs must have the same number of rows. "
-                f"Elections CSV has {len(self.file_upload_list['elections']['body'])} rows.",
+                f"Elections CSV has {row_counts['elections']} rows.",
             )
-            ElectionSessionAdminForm.add_error(
-                self=self,
-                field="upload_eligibilities",
-                error=f"[{self.file_upload_list['eligibilities']['file_name']}] "
+            self.add_error(
+                "upload_eligibilities",
+                f"[{self.file_upload_list['eligibilities']['file_name']}] "
                 f"Elections and Eligibilities CSVs must have the same number of rows. "
-                f"Eligibilities CSV has {len(self.file_upload_list['eligibilities']['body'])} rows.",
+                f"Eligibilities CSV has {row_counts['eligibilities']} rows.",
             )
-            raise forms.ValidationError(
+            non_field_errors.append(
                 "Election and Eligibilities don't match. See more info below."
             )
 
-    def check_election_names(self):
-        """
-        Checks if the ElectionNames in Eligibilities and Candidates CSVs match the ones
-        in the Elections CSV.
-        """
+        if election_name_error_found:
+            non_field_errors.append("Election names don't match over all CSV files.")
 
-        # Get a list of all election names
-        elections_header = self.file_upload_list["elections"]["header"]
-        elections_body = self.file_upload_list["elections"]["body"]
-        election_name_index = elections_header.index("election_name")
-        election_names_list = []
-        for election_row in elections_body:
-            election_names_list.append(election_row[election_name_index])
-
-        # Check Candidates and Eligibilities CSVs
-        csv_files_to_check = ["candidates", "eligibilities"]
-        for csv_name in csv_files_to_check:
-            header = self.file_upload_list[csv_name]["header"]
-            body = self.file_upload_list[csv_name]["body"]
-            election_name_index = header.index("election_name")
-            for row in body:
-                if row[election_name_index] not in election_names_list:
-                    ElectionSessionAdminForm.add_error(
-                        self=self,
-                        field=f"upload_{csv_name}",
-                        error=f"[{self.file_upload_list['elections']['file_name']}, "
-                        f"{self.file_upload_list[csv_name]['file_name']}] "
-                        f"Election names within the {csv_name.capitalize()} CSV must match those within the "
-                        f"Elections CSV. Invalid Election name discovered: {row[election_name_index]}",
-                    )
-                    raise forms.ValidationError(
-                        "Election names don't match over all CSV files."
-                    )
+        if non_field_errors:
+            raise forms.ValidationError(non_field_errors)
 
-    def check_election_seats_and_categories(self):
+    def check_election_seats_and_categories(self, header, row):
         """
         Checks that all the seats available are Integers and >=1.
         Checks that the Election Category is one of the Election.ELECTION_CATEGORY_CHOICES.
         """
 
-        header = self.file_upload_list["elections"]["header"]
-        body = self.file_upload_list["elections"]["body"]
         election_categories = [
             category[1] for category in Election.ELECTION_CATEGORY_CHOICES
         ]
         seats_index = header.index("seats_available")
         category_index = header.index("category")
 
-        for row in body:
-            if not row[seats_index].isnumeric():
-                ElectionSessionAdminForm.add_error(
-                    self=self,
-                    field="upload_elections",
-                    error=f"[{self.file_upload_list['elections']['file_name']}] seats_available for each election "
-                    f"must be an integer.",
-                )
+        if not row[seats_index].isnumeric():
+            yield "seats_available for each election must be an integer."
 
-            elif int(row[seats_index]) < 1:
-                ElectionSessionAdminForm.add_error(
-                    self=self,
-                    field="upload_elections",
-                    error=f"[{self.file_upload_list['elections']['file_name']}] seats_available for each election "
-                    f"must be >=1.",
-                )
+        elif int(row[seats_index]) < 1:
+            yield "seats_available for each election must be >=1."
 
-            if row[category_index] not in election_categories:
-                ElectionSessionAdminForm.add_error(
-                    self=self,
-                    field="upload_elections",
-                    error=f"[{self.file_upload_list['elections']['file_name']}] Election category must be one of: "
-                    f"[{', '.join(category for category in election_categories)}]. "
-                    f"Incorrect election category found in CSV: [{row[category_index]}].",
-                )
+        if row[category_index] not in election_categories:
+            yield (
+                f"Election category must be one of: "
+                f"[{', '.join(category for category in election_categories)}]. "
+                f"Incorrect election category found in CSV: [{row[category_index]}]."
+            )
 
-    def check_eligible_fields(self):
+    def check_eligible_fields(self, header, row):
         """
         Checks that all the eligible fields are Integers and either 1 or 0 (T or F).
         Checks that status_eligible is one of the values in Eligibility.STATUS_CHOICES.
         """
 
-        header = self.file_upload_list["eligibilities"]["header"]
-        body = self.file_upload_list["eligibilities"]["body"]
         status_categories = [category[1] for category in Eligibility.STATUS_CHOICES]
         status_eligible_index = header.index("status_eligible")
-        for row in body:
-            if row[status_eligible_index] not in status_categories:
-                ElectionSessionAdminForm.add_error(
-                    self=self,
-                    field="upload_eligibilities",
-                    error=f"[{self.file_upload_list['eligibilities']['file_name']}] Eligibility status category must "
-                    f"be one of: [{', '.join(category for category in status_categories)}]. "
-                    f"Incorrect category found in CSV: [{row[status_eligible_index]}].",
+        if row[status_eligible_index] not in status_categories:
+            yield (
+                f"Eligibility status category must be one of: "
+                f"[{', '.join(category for category in status_categories)}]. "
+                f"Incorrect category found in CSV: [{row[status_eligible_index]}]."
+            )
+        for i, category in enumerate(header):
+            if category in ("election_name", "status_eligible"):
+                continue
+            if not row[i].isnumeric() or (int(row[i]) not in [0, 1]):
+                yield (
+                    f"Eligibilities must be true/false values represented by the *integer* values of 1 or 0. "
+                    f"Non-integer value found in CSV: [{row[i]}]."
                 )
-            for i in range(1, len(row) - 1):
-                if not row[i].isnumeric() or (int(row[i]) not in [0, 1]):
-                    ElectionSessionAdminForm.add_error(
-                        self=self,
-                        field="upload_eligibilities",
-                        error=f"[{self.file_upload_list['eligibilities']['file_name']}] Eligibilities must be "
-                        f"true/false values represented by the *integer* values of 1 or 0. "
-                        f"Non-integer value found in CSV: [{row[i]}].",
-                    )
+
+    def csv_rows(self, key):
+        """Streams the rows of one of the uploaded CSV files, without its header."""
+        with closing(_CSVStream(self.file_upload_list[key]["file"])) as stream:
+            next(stream)
+            yield from stream
 
     def save(self, commit=True):
         """
@@ -525,15 +581,21 @@ class ElectionSessionAdminForm(forms.ModelForm):
         """
         Saves the CSV files for Elections, Candidates, and Eligibilities to the
         database, connected to the ElectionSession they were uploaded in.
+
+        Everything is created with bulk inserts in a single transaction. Election names
+        in the Candidates and Eligibilities CSVs are resolved through a map of the newly
+        created Elections instead of querying for each row.
         """
 
-        self.csv_save_elections()
-        self.csv_save_candidates()
-        self.csv_save_eligibilities()
+        with transaction.atomic():
+            elections = self.csv_save_elections()
+            self.csv_save_candidates(elections)
+            self.csv_save_eligibilities(elections)
 
     def csv_save_elections(self):
         """
-        Save the Elections from the elections.csv file.
+        Save the Elections from the elections.csv file, along with their Reopen
+        Nominations Candidates. Returns a map of Election name -> Election.
 
         Note: if Elections already exist tied to that ElectionSession, it will delete
         all of them, as well as any Candidates and Eligibilities tied to that Election.
@@ -542,63 +604,71 @@ class ElectionSessionAdminForm(forms.ModelForm):
         """
 
         header = self.file_upload_list["elections"]["header"]
-        body = self.file_upload_list["elections"]["body"]
+        body = self.csv_rows("elections")
 
         # Delete all entries for the ElectionSession being edited, if they exist
-        old_elections = Election.objects.filter(election_session=self.instance)
-        for election in old_elections:
-            election.delete()
+        Election.objects.filter(election_session=self.instance).delete()
 
         # Create new entries
-        for election_row in body:
-            data = {
-                "election_name": election_row[header.index("election_name")],
-                "election_session": self.instance,
-                "seats_available": election_row[header.index("seats_available")],
-                "category": election_row[header.index("category")]
-                .lower()
-                .replace(" ", "_"),
-            }
-            election = Election(**data)
-            election.save()
+        Election.objects.bulk_create(
+            [
+                Election(
+                    election_name=election_row[header.index("election_name")],
+                    election_session=self.instance,
+                    seats_available=election_row[header.index("seats_available")],
+                    category=election_row[header.index("category")]
+                    .lower()
+                    .replace(" ", "_"),
+                )
+                for election_row in body
+            ]
+        )
+
+        # bulk_create doesn't set primary keys on every database, so read them back.
+        # If an Election name is repeated, rows refer to the first Election with it.
+        new_elections = list(
+            Election.objects.filter(election_session=self.instance).order_by("id")
+        )
+        Candidate.objects.bulk_create(
+            [election.build_ron_candidate() for election in new_elections]
+        )
+
+        elections = {}
+        for election in new_elections:
+            elections.setdefault(election.election_name, election)
+        return elections
 
-    def csv_save_candidates(self):
+    def csv_save_candidates(self, elections):
         """
         Save the Candidates from the candidates.csv file.
         """
 
         header = self.file_upload_list["candidates"]["header"]
-        body = self.file_upload_list["candidates"]["body"]
-
-        for candidate_row in body:
-            election = Election.objects.filter(
-                election_name=candidate_row[header.index("election_name")],
-                election_session=self.instance,
-            )[0]
-
-            data = {
-                "name": candidate_row[header.index("name")],
-                "election": election,
-                "statement": candidate_row[header.index("statement")],
-            }
-            candidate = Candidate(**data)
-            candidate.save()
+        body = self.csv_rows("candidates")
+
+        Candidate.objects.bulk_create(
+            [
+                Candidate(
+                    name=candidate_row[header.index("name")],
+                    election=elections[candidate_row[header.index("election_name")]],
+                    statement=candidate_row[header.index("statement")],
+                )
+                for candidate_row in body
+            ]
+        )
 
-    def csv_save_eligibilities(self):
+    def csv_save_eligibilities(self, elections):
         """
         Save the Eligibilities from the eligibilities.csv file.
         """
 
         header = self.file_upload_list["eligibilities"]["header"]
-        body = self.file_upload_list["eligibilities"]["body"]
+        body = self.csv_rows("eligibilities")
 
+        eligibilities = []
         for eligibility_row in body:
-            election = Election.objects.filter(
-                election_name=eligibility_row[header.index("election_name")],
-                election_session=self.instance,
-            )[0]
             data = {
-                "election": election,
+                "election": elections[eligibility_row[header.index("election_name")]],
                 "eng_eligible": eligibility_row[header.index("eng_eligible")],
                 "che_eligible": eligibility_row[header.index("che_eligible")],
                 "civ_eligible": eligibility_row[header.index("civ_eligible")],
@@ -618,5 +688,122 @@ class ElectionSessionAdminForm(forms.ModelForm):
                 .lower()
                 .replace(" ", "_"),
             }
-            eligibility = Eligibility(**data)
-            eligibility.save()
+            eligibilities.append(Eligibility(**data))
+        Eligibility.objects.bulk_create(eligibilities)
+
+
+class ElectionSessionCloneForm(_ElectionSessionTimesMixin, forms.ModelForm):
+    """
+    Creates a new ElectionSession with a copy of the Elections and Eligibilities of an
+    existing one, and optionally its Candidates, so the same set of Elections doesn't
+    have to be rebuilt every term.
+    """
+
+    include_candidates = forms.BooleanField(
+        required=False,
+        help_text="Also copy the Candidates of each Election. Disqualifications and rule "
+        "violations are not copied.",
+    )
+
+    class Meta:
+        model = ElectionSession
+        fields = ["election_session_name", "start_time", "end_time"]
+
+    def __init__(self, *args, source=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source = source
+
+    def clean(self):
+        cleaned_data = super().clean()
+        self.times_check()
+        return cleaned_data
+
+    def save(self, commit=True):
+        """
+        Saves the new ElectionSession and copies the source ElectionSession's Elections,
+        their Reopen Nominations Candidates, Eligibilities and (optionally) Candidates
+        into it. Each of those is a single bulk insert, all in one transaction.
+        """
+
+        with transaction.atomic():
+            election_session = super().save()
+
+            old_elections = list(
+                Election.objects.filter(election_session=self.source).order_by("id")
+            )
+            Election.objects.bulk_create(
+                [
+                    Election(
+                        election_name=election.election_name,
+                        election_session=election_session,
+                        seats_available=election.seats_available,
+                        category=election.category,
+                        counting_method=election.counting_method,
+                    )
+                    for election in old_elections
+                ]
+            )
+
+            # bulk_create doesn't set primary keys on every database, so read them back.
+            # They are inserted in order, so match them up with the old ones by id.
+            new_elections = list(
+                Election.objects.filter(election_session=election_session).order_by(
+                    "id"
+                )
+            )
+            elections = {old.id: new for old, new in zip(old_elections, new_elections)}
+
+            candidates = [election.build_ron_candidate() for election in new_elections]
+            if self.cleaned_data["include_candidates"]:
+                candidates += [
+                    Candidate(
+                        name=candidate.name,
+                        election=elections[candidate.election_id],
+                        statement=candidate.statement,
+                    )
+                    for candidate in Candidate.objects.filter(
+                        election__election_session=self.source
+                    )
+                    .exclude(name="Reopen Nominations")
+                    .order_by("id")
+                ]
+            Candidate.objects.bulk_create(candidates)
+
+            eligibility_fields = [
+                field.attname
+                for field in Eligibility._meta.concrete_fields
+                if field.name not in ("id", "election", "created_at", "updated_at")
+            ]
+            Eligibility.objects.bulk_create(
+                [
+                    Eligibility(
+                        election=elections[eligibility["election_id"]],
+                        **{field: eligibility[field] for field in eligibility_fields},
+                    )
+                    for eligibility in Eligibility.objects.filter(
+                        election__election_session=self.source
+                    ).values("election_id", *eligibility_fields)
+                ]
+            )
+
+        return election_session
+
+
+class ElectionRecountForm(forms.Form):
+    """
+    Picks the Candidates to remove for a "what if" recount of an Election, see
+    backend.recount.
+    """
+
+    excluded_candidates = forms.ModelMultipleChoiceField(
+        queryset=Candidate.objects.none(),
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        help_text="Recount as if these Candidates had been removed from the Election.",
+    )
+
+    def __init__(self, *args, election=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["excluded_candidates"].queryset = Candidate.objects.filter(
+            election=election
+        ).order_by("id")
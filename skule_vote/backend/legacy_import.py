@@ -0,0 +1,349 @@
+"""
+Importer for elections exported from the previous voting system, which stored each
+election as a single DynamoDB item dumped to typed JSON (see backend/test_data).
+
+The dumps list every ballot before the election's choices, so they are parsed as a
+stream: ballots are handed off one at a time as they are read instead of decoding
+the whole document first. Ballot rankings are indices into the "choices" list, in
+which Reopen Nominations is the last entry.
+"""
+from collections import Counter
+import json
+import os
+
+from django.db import transaction
+
+from backend.ballot import RON
+from backend.ballot_sets import PackedBallotSet
+from backend.models import (
+    DISCIPLINE_CHOICES,
+    Ballot,
+    BallotSignature,
+    Candidate,
+    Election,
+    Eligibility,
+    TurnoutCounter,
+    Voter,
+)
+
+# Real dumps, with their results, kept for tests and benchmarks
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")
+
+# Imported ballots don't say anything about the voters who cast them
+DEFAULT_VOTER_FIELDS = {
+    "discipline": "ENG",
+    "engineering_student": True,
+    "study_year": 1,
+    "pey": False,
+    "student_status": "full_time",
+}
+
+
+class LegacyImportError(Exception):
+    pass
+
+
+class _JSONStream:
+    """
+    Minimal incremental JSON reader: skips over structural characters by hand and
+    decodes complete values with json.JSONDecoder.raw_decode, reading more of the
+    file whenever the buffered text ends mid-value.
+    """
+
+    def __init__(self, file, chunk_size=64 * 1024):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+
+    def _read_more(self):
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while (
+                self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n"
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                raise LegacyImportError("Unexpected end of file.")
+
+    def consume(self, char):
+        if self.peek() == char:
+            self._pos += 1
+            return True
+        return False
+
+    def expect(self, char):
+        if not self.consume(char):
+            raise LegacyImportError(
+                f"Expected {char!r} but found {self.peek()!r} in the dump."
+            )
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._read_more():
+                    raise LegacyImportError(f"Invalid JSON in the dump: {e}")
+                continue
+
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._read_more():
+                continue
+
+            self._pos = end
+            return value
+
+
+def _from_dynamo(value):
+    """Converts a DynamoDB typed attribute, i.e. {"N": "1"}, into a plain value."""
+    ((attribute_type, attribute),) = value.items()
+    if attribute_type == "M":
+        return {key: _from_dynamo(v) for key, v in attribute.items()}
+    if attribute_type == "L":
+        return [_from_dynamo(v) for v in attribute]
+    if attribute_type == "N":
+        return int(attribute) if attribute.lstrip("-").isdigit() else float(attribute)
+    if attribute_type == "NS":
+        return [int(n) if n.lstrip("-").isdigit() else float(n) for n in attribute]
+    if attribute_type == "NULL":
+        return None
+    # S, SS and BOOL need no conversion
+    return attribute
+
+
+def stream_dynamodb_election(file, on_ballot, chunk_size=64 * 1024):
+    """
+    Parses a dump from the file object, calling on_ballot(voter_id, ranking) for
+    every ballot as soon as it is read. Returns all the other attributes of the
+    election, converted to plain values.
+    """
+    stream = _JSONStream(file, chunk_size)
+    attributes = {}
+
+    stream.expect("{")
+    if stream.consume("}"):
+        return attributes
+
+    while True:
+        key = stream.value()
+        stream.expect(":")
+
+        if key == "Ballots":
+            stream.expect("{")
+            if stream.value() != "L":
+                raise LegacyImportError("Ballots must be a DynamoDB list.")
+            stream.expect(":")
+            stream.expect("[")
+            if not stream.consume("]"):
+                while True:
+                    ballot = _from_dynamo(stream.value())
+                    on_ballot(ballot["vid"], [int(rank) for rank in ballot["ranking"]])
+                    if stream.consume("]"):
+                        break
+                    stream.expect(",")
+            stream.expect("}")
+        else:
+            attributes[key] = _from_dynamo(stream.value())
+
+        if stream.consume("}"):
+            return attributes
+        stream.expect(",")
+
+
+def read_dynamodb_ballot_set(file, chunk_size=64 * 1024):
+    """
+    Reads a dump straight into a PackedBallotSet for counting, without touching the
+    database. Candidate ids are their positions in the dump's list of choices.
+    """
+    ballot_set = PackedBallotSet(None, None, None)
+    attributes = stream_dynamodb_election(
+        file, lambda voter_id, ranking: ballot_set.add(ranking), chunk_size
+    )
+
+    ballot_set.election_name = attributes["name"]
+    ballot_set.seats_available = attributes["seats"]
+    ballot_set.candidates = [
+        {"id": i, "name": choice["name"], "disqualified_status": False}
+        for i, choice in enumerate(attributes["choices"])
+    ]
+    for ranking in ballot_set.rankings:
+        if not all(0 <= choice < len(ballot_set.candidates) for choice in ranking):
+            raise LegacyImportError(f"The dump contains an invalid ranking: {ranking}")
+    return ballot_set
+
+
+def _election_category(etype):
+    for category, label in Election.ELECTION_CATEGORY_CHOICES:
+        if etype in (category, label):
+            return category
+    return "other"
+
+
+def _eligibility(election, attributes):
+    disciplines = set(attributes.get("eligibleDiscipline", []))
+    years = set(attributes.get("eligibleYear", []))
+    statuses = set(attributes.get("eligibleStatus", []))
+    if statuses == {"PT"}:
+        status = "part_time"
+    elif statuses == {"FT"}:
+        status = "full_time"
+    else:
+        status = "full_and_part_time"
+
+    return Eligibility(
+        election=election,
+        status_eligible=status,
+        pey_eligible=bool(attributes.get("eligiblePEY", False)),
+        **{
+            f"{code.lower()}_eligible": code in disciplines
+            for code, _ in DISCIPLINE_CHOICES
+        },
+        **{f"year_{year}_eligible": year in years for year in range(1, 5)},
+    )
+
+
+def insert_ballots(election, candidates, ballots, voter_fields, signatures):
+    """
+    Bulk inserts one batch of (voter_id, ranking) ballots, creating a Voter for each
+    student number hash that doesn't exist yet. Each ranking is tallied into
+    signatures.
+    """
+    voter_hashes = {voter_id for voter_id, _ in ballots}
+    existing = set(
+        Voter.objects.filter(student_number_hash__in=voter_hashes).values_list(
+            "student_number_hash", flat=True
+        )
+    )
+    Voter.objects.bulk_create(
+        [
+            Voter(student_number_hash=voter_hash, **voter_fields)
+            for voter_hash in voter_hashes - existing
+        ]
+    )
+    voters = dict(
+        Voter.objects.filter(student_number_hash__in=voter_hashes).values_list(
+            "student_number_hash", "id"
+        )
+    )
+
+    ballot_rows = []
+    for voter_id, ranking in ballots:
+        # Negative indices would otherwise pick Candidates from the end of the list
+        if not all(0 <= choice < len(candidates) for choice in ranking):
+            raise LegacyImportError(
+                f"Ballot for voter {voter_id} contains an invalid ranking: {ranking}"
+            )
+        ranked_candidates = [candidates[choice] for choice in ranking]
+
+        if not ranked_candidates:
+            ballot_rows.append(Ballot(voter_id=voters[voter_id], election=election))
+        for rank, candidate in enumerate(ranked_candidates):
+            ballot_rows.append(
+                Ballot(
+                    voter_id=voters[voter_id],
+                    election=election,
+                    candidate=candidate,
+                    rank=rank,
+                )
+            )
+
+        signatures[
+            BallotSignature.from_candidate_ids(
+                candidate.id for candidate in ranked_candidates
+            )
+        ] += 1
+
+    Ballot.objects.bulk_create(ballot_rows)
+
+
+def import_dynamodb_election(path, election_session, voter_fields=None, batch_size=500):
+    """
+    Imports the dump at path into the ElectionSession as a new Election with its
+    Candidates, Eligibility, Voters and Ballots, all with bulk inserts in a single
+    transaction. Returns the new Election.
+
+    The file is read twice: once for the election's attributes, which come after
+    the ballots in the dump, and once to stream the ballots into the database in
+    batches of batch_size.
+    """
+    if voter_fields is None:
+        voter_fields = DEFAULT_VOTER_FIELDS
+
+    with open(path, "r", encoding="utf-8") as f:
+        attributes = stream_dynamodb_election(f, lambda voter_id, ranking: None)
+
+    choice_names = [choice["name"] for choice in attributes["choices"]]
+    duplicates = sorted(
+        name for name, count in Counter(choice_names).items() if count > 1
+    )
+    if duplicates:
+        raise LegacyImportError(
+            f"The dump has more than one choice named {', '.join(duplicates)}."
+        )
+
+    with transaction.atomic():
+        election = Election(
+            election_name=attributes["name"],
+            election_session=election_session,
+            seats_available=attributes["seats"],
+            category=_election_category(attributes.get("etype", "")),
+        )
+        election.save()
+        _eligibility(election, attributes).save()
+
+        Candidate.objects.bulk_create(
+            [
+                Candidate(
+                    name=choice["name"],
+                    statement=choice.get("statement"),
+                    election=election,
+                )
+                for choice in attributes["choices"]
+                if choice["name"] != RON
+            ]
+        )
+        # Reopen Nominations was created with the Election, and the others in the
+        # order of the choices, so they are matched to their indices by id
+        ron, *created = election.candidates.order_by("id")
+        created = iter(created)
+        candidates = [ron if name == RON else next(created) for name in choice_names]
+
+        signatures = Counter()
+        with open(path, "r", encoding="utf-8") as f:
+            batch = []
+
+            def on_ballot(voter_id, ranking):
+                batch.append((voter_id, ranking))
+                if len(batch) >= batch_size:
+                    insert_ballots(
+                        election, candidates, batch, voter_fields, signatures
+                    )
+                    batch.clear()
+
+            stream_dynamodb_election(f, on_ballot)
+            if batch:
+                insert_ballots(election, candidates, batch, voter_fields, signatures)
+
+        BallotSignature.objects.bulk_create(
+            [
+                BallotSignature(election=election, signature=signature, count=count)
+                for signature, count in signatures.items()
+            ]
+        )
+        TurnoutCounter.objects.create(
+            election=election, shard=0, count=sum(signatures.values())
+        )
+
+    return election
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.archive import ArchiveError, write_archive
+from backend.ballot_sets import load_election_session_ballot_sets
+from backend.models import ElectionSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes every ballot cast in an ElectionSession to a compact binary archive, "
+        "which can be recounted offline with the recount_archive command."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("election_session_id", type=int)
+        parser.add_argument("output", help="Path of the archive file to write.")
+
+    def handle(self, *args, **options):
+        try:
+            election_session = ElectionSession.objects.get(
+                id=options["election_session_id"]
+            )
+        except ElectionSession.DoesNotExist:
+            raise CommandError(
+                f"ElectionSession {options['election_session_id']} does not exist."
+            )
+
+        ballot_sets = load_election_session_ballot_sets(election_session)
+        try:
+            with open(options["output"], "wb") as f:
+                write_archive(f, election_session.election_session_name, ballot_sets)
+        except ArchiveError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Archived {sum(len(b) for b in ballot_sets.values())} ballots from "
+            f"{len(ballot_sets)} elections to {options['output']}"
+        )
@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from backend.benchmark import DEFAULT_BALLOTS, DEFAULT_CANDIDATES, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the ballot counting engine on the test_data dumps and on synthetic "
+        "elections, and writes a JSON report of the throughput, peak memory and time "
+        "spent in each stage. See backend/benchmark.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ballots",
+            type=int,
+            nargs="+",
+            default=DEFAULT_BALLOTS,
+            help="Numbers of ballots in the synthetic elections.",
+        )
+        parser.add_argument(
+            "--candidates",
+            type=int,
+            nargs="+",
+            default=DEFAULT_CANDIDATES,
+            help="Numbers of choices (Reopen Nominations included) in the synthetic "
+            "elections.",
+        )
+        parser.add_argument("--seats", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--pipeline-max-ballots",
+            type=int,
+            default=100000,
+            help="Only run the database pipeline on synthetic elections with at most "
+            "this many ballots.",
+        )
+        parser.add_argument(
+            "--no-pipeline",
+            action="store_true",
+            help="Skip the database pipeline and only time counting in memory.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the report to this file instead of standard output.",
+        )
+
+    def handle(self, *args, **options):
+        report = run_benchmarks(
+            ballots=options["ballots"],
+            candidates=options["candidates"],
+            seats_available=options["seats"],
+            pipeline_max_ballots=None
+            if options["no_pipeline"]
+            else options["pipeline_max_ballots"],
+            seed=options["seed"],
+            progress=self._progress,
+        )
+
+        output = json.dumps(report, indent="\t")
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _progress(self, case):
+        self.stderr.write(
+            f"{case['kind']:>8} {case['name']}: {case['ballots']} ballots, "
+            f"{case['candidates']} candidates in {case['seconds']:.3f}s"
+        )
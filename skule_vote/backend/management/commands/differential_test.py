@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.counting import DEFAULT_COUNTING_METHOD, get_counting_method
+from backend.differential import differential_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts the test_data dumps and randomized elections with a counting method "
+        "and the reference one, and reports a minimal reproducer for every ballot "
+        "set they disagree on. See backend/differential.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "counting_method", help="Name of the counting method to check."
+        )
+        parser.add_argument(
+            "--reference",
+            default=DEFAULT_COUNTING_METHOD,
+            help="Name of the counting method to compare against.",
+        )
+        parser.add_argument("--cases", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0,
+            help="How far vote counts may differ, for engines that sum fractional "
+            "transfers in a different order.",
+        )
+        parser.add_argument(
+            "--no-fixtures",
+            action="store_true",
+            help="Only check randomized elections.",
+        )
+
+    def handle(self, *args, **options):
+        for name in [options["counting_method"], options["reference"]]:
+            try:
+                get_counting_method(name)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        mismatches = differential_test(
+            options["counting_method"],
+            reference=options["reference"],
+            num_cases=options["cases"],
+            seed=options["seed"],
+            fixtures=not options["no_fixtures"],
+            tolerance=options["tolerance"],
+        )
+        if mismatches:
+            self.stdout.write(json.dumps(mismatches, indent="\t"))
+            raise CommandError(
+                f"{options['counting_method']} disagrees with {options['reference']} "
+                f"on {len(mismatches)} ballot sets."
+            )
+        self.stdout.write(
+            f"{options['counting_method']} agrees with {options['reference']}."
+        )
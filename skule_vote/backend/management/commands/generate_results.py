@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.admin import generate_results
+from backend.ballot_sets import (
+    BallotSignatureError,
+    load_election_session_signature_sets,
+)
+from backend.models import ElectionSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the results of ElectionSessions in the same format as the admin "
+        "results download, optionally from the submitted ranking totals or with a "
+        "Condorcet cross-check, to check the official count against."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("election_session_ids", nargs="+", type=int)
+        parser.add_argument(
+            "--from-signatures",
+            action="store_true",
+            help="Count the ranking totals kept when ballots are submitted instead of "
+            "the Ballot rows. They are advisory: ballots deleted since they were "
+            "submitted are still counted.",
+        )
+        parser.add_argument(
+            "--condorcet",
+            action="store_true",
+            help="Add a pairwise Condorcet cross-check to each Election's results.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of standard output.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = ElectionSession.objects.filter(
+            id__in=options["election_session_ids"]
+        ).order_by("id")
+        missing = set(options["election_session_ids"]) - {e.id for e in queryset}
+        if missing:
+            raise CommandError(
+                f"ElectionSession {', '.join(map(str, sorted(missing)))} does not exist."
+            )
+
+        try:
+            results = generate_results(
+                queryset,
+                load_ballot_sets=(
+                    load_election_session_signature_sets
+                    if options["from_signatures"]
+                    else None
+                ),
+                include_condorcet=options["condorcet"],
+            )
+        except BallotSignatureError as e:
+            raise CommandError(e)
+
+        output = json.dumps(results, indent="\t")
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
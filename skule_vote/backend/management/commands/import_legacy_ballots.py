@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.legacy_import import (
+    LegacyImportError,
+    import_dynamodb_election,
+    read_dynamodb_ballot_set,
+)
+from backend.models import ElectionSession
+from backend.turnout import get_turnout
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports elections dumped from the previous (DynamoDB) voting system. Either "
+        "counts them directly with --count, or imports them into an ElectionSession."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dumps", nargs="+", help="Paths of the dump files.")
+        parser.add_argument(
+            "--election-session",
+            type=int,
+            help="Id of the ElectionSession to import the elections into.",
+        )
+        parser.add_argument(
+            "--count",
+            action="store_true",
+            help="Count the ballots in memory and print the results, without "
+            "touching the database.",
+        )
+
+    def handle(self, *args, **options):
+        if options["count"] == (options["election_session"] is not None):
+            raise CommandError("Pass exactly one of --count or --election-session.")
+
+        try:
+            if options["count"]:
+                self._count(options["dumps"])
+            else:
+                self._import(options["dumps"], options["election_session"])
+        except (OSError, LegacyImportError) as e:
+            raise CommandError(str(e))
+
+    def _count(self, dumps):
+        results = {}
+        for dump in dumps:
+            with open(dump, "r", encoding="utf-8") as f:
+                ballot_set = read_dynamodb_ballot_set(f)
+            results[ballot_set.election_name] = ballot_set.calculate()
+        self.stdout.write(json.dumps(results, indent="\t"))
+
+    def _import(self, dumps, election_session_id):
+        try:
+            election_session = ElectionSession.objects.get(id=election_session_id)
+        except ElectionSession.DoesNotExist:
+            raise CommandError(f"ElectionSession {election_session_id} does not exist.")
+
+        for dump in dumps:
+            election = import_dynamodb_election(dump, election_session)
+            self.stdout.write(
+                f"Imported {get_turnout([election.id])[election.id]} ballots into "
+                f"{election.election_name}"
+            )
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.archive import ArchiveError, BallotArchive
+from backend.ballot_sets import calculate_election_session_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts a ballot archive written by archive_ballots, without touching the "
+        "database. Prints the results in the same format as the admin results download."
+    )
+
+    # Nothing here needs the database, so don't require one to be configured
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("archive", help="Path of the archive file to recount.")
+        parser.add_argument(
+            "--output",
+            help="Write the results to this file instead of standard output.",
+        )
+        parser.add_argument(
+            "--diagnostics",
+            action="store_true",
+            help="Include timings and ballot statistics for every round of each count.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with BallotArchive(options["archive"]) as archive:
+                results = {
+                    f"{archive.election_session_name} ElectionSession": (
+                        calculate_election_session_results(
+                            archive.ballot_sets(), diagnostics=options["diagnostics"]
+                        )
+                    )
+                }
+        except (OSError, ArchiveError) as e:
+            raise CommandError(str(e))
+
+        output = json.dumps(results, indent="\t")
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.ballot_sets import load_election_ballot_set
+from backend.models import Election
+from backend.sensitivity import leave_one_out
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts an Election once with each Candidate removed and reports which "
+        "removals would change the winners. Disqualified Candidates are left out, as "
+        "in the official results."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("election_id", type=int)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker processes (defaults to the number of CPUs, 0 runs "
+            "every recount in this process).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the report to this file instead of standard output.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            election = Election.objects.get(id=options["election_id"])
+        except Election.DoesNotExist:
+            raise CommandError(f"Election {options['election_id']} does not exist.")
+
+        ballot_set = load_election_ballot_set(election).without_disqualified()
+        report = leave_one_out(ballot_set, max_workers=options["workers"])
+
+        output = json.dumps(report, indent="\t")
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
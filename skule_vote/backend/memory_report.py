@@ -0,0 +1,174 @@
+"""
+Memory report of generating results, for finding out which Elections and stages
+drive up a worker's memory on a large ElectionSession.
+
+generate_results_with_memory_report counts every Election as the "Generate results"
+admin action does, always from the ballots, and records for each stage:
+
+    "load"                        reading every ballot of the ElectionSession into
+                                  PackedBallotSets, once per ElectionSession
+    "exclude_disqualified"        building the Election's set without its disqualified
+                                  Candidates
+    "results_with_dq"             counting it, which expands it into ballot lists
+    "results_without_dq"          counting the full set
+    "condorcet_with_dq", ...      the pairwise cross-check, with include_condorcet
+
+its wall time, the peak memory allocated by Python while it ran over what was
+allocated when it started ("peakMemory"), what it left allocated ("retainedMemory"),
+and the process's maximum resident set size after it ("maxRss"), which includes the
+database driver and everything else. Memory is in bytes, and traced with tracemalloc,
+which slows counting down several times over.
+
+Each stage is passed to progress as soon as it is done, so when the worker is killed
+for running out of memory the stages logged before it show where it was.
+"""
+from contextlib import contextmanager
+import resource
+import sys
+import time
+import tracemalloc
+
+from backend.ballot_sets import load_election_session_ballot_sets
+from backend.condorcet import calculate_condorcet_results
+
+
+def _max_rss():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class _MemoryStages:
+    def __init__(self, progress):
+        self.progress = progress
+        # Since tracing started, across every stage
+        self.peak_memory = 0
+
+    @contextmanager
+    def stage(self, stages, name, **labels):
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        memory, peak_memory = tracemalloc.get_traced_memory()
+        self.peak_memory = max(self.peak_memory, peak_memory)
+
+        stages[name] = {
+            "seconds": seconds,
+            "peakMemory": peak_memory - start_memory,
+            "retainedMemory": memory - start_memory,
+            "maxRss": _max_rss(),
+        }
+        if self.progress is not None:
+            self.progress(labels | {"stage": name} | stages[name])
+
+
+def _election_report(ballot_set, include_condorcet, memory_stages):
+    report = {
+        "name": ballot_set.election_name,
+        "ballots": len(ballot_set),
+        "distinctRankings": len(ballot_set.rankings),
+        "candidates": len(ballot_set.candidates),
+        "stages": {},
+    }
+
+    def stage(name):
+        return memory_stages.stage(
+            report["stages"], name, election=ballot_set.election_name
+        )
+
+    with stage("exclude_disqualified"):
+        without_disqualified = ballot_set.without_disqualified()
+
+    # Same as PackedBallotSet.election_results, one stage at a time
+    results = {}
+    with stage("results_with_dq"):
+        results["results_with_dq"] = without_disqualified.calculate()
+    with stage("results_without_dq"):
+        results["results_without_dq"] = ballot_set.calculate()
+    if include_condorcet:
+        with stage("condorcet_with_dq"):
+            results["condorcet_with_dq"] = calculate_condorcet_results(
+                without_disqualified
+            )
+        with stage("condorcet_without_dq"):
+            results["condorcet_without_dq"] = calculate_condorcet_results(ballot_set)
+
+    report["peakMemory"] = max(s["peakMemory"] for s in report["stages"].values())
+    return results, report
+
+
+def generate_results_with_memory_report(
+    queryset,
+    load_ballot_sets=load_election_session_ballot_sets,
+    include_condorcet=False,
+    progress=None,
+):
+    """
+    Returns (results, report): the results of every Election in each ElectionSession,
+    as generate_results in backend/admin.py does, and the memory report:
+
+        {
+            "pythonPeakMemory": ...,
+            "electionSessions": [
+                {
+                    "name": "...",
+                    "stages": {"load": {"seconds": ..., "peakMemory": ..., ...}},
+                    "elections": [
+                        {
+                            "name": "...", "ballots": 1000, "distinctRankings": 120,
+                            "candidates": 4, "peakMemory": ...,
+                            "stages": {"exclude_disqualified": {...}, ...},
+                        },
+                    ],
+                },
+            ],
+        }
+
+    with the Elections of each ElectionSession sorted by peak memory, largest first.
+    progress, if given, is called with each stage's entry, and the ElectionSession or
+    Election it belongs to, as soon as it is done.
+    """
+    memory_stages = _MemoryStages(progress)
+    election_session_results = {}
+    report = {"electionSessions": []}
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        for election_session in queryset:
+            session_report = {
+                "name": election_session.election_session_name,
+                "stages": {},
+                "elections": [],
+            }
+            with memory_stages.stage(
+                session_report["stages"],
+                "load",
+                electionSession=election_session.election_session_name,
+            ):
+                ballot_sets = load_ballot_sets(election_session)
+
+            results = {}
+            for ballot_set in ballot_sets.values():
+                election_results, election_report = _election_report(
+                    ballot_set, include_condorcet, memory_stages
+                )
+                results[f"{ballot_set.election_name}"] = election_results
+                session_report["elections"].append(election_report)
+            del ballot_sets
+
+            session_report["elections"].sort(key=lambda e: -e["peakMemory"])
+            report["electionSessions"].append(session_report)
+            election_session_results[
+                f"{election_session.election_session_name} ElectionSession"
+            ] = results
+
+        report["pythonPeakMemory"] = memory_stages.peak_memory
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    return election_session_results, report
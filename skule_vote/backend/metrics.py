@@ -0,0 +1,295 @@
+"""
+Per-view request metrics, served in the Prometheus text format by the staff-only
+MetricsView.
+
+MetricsMiddleware records, for every request resolved to a view, its method and
+status code, how long it took, how many database queries it ran and how long they
+took (through a connection.execute_wrapper around the request). Each process keeps
+its metrics in memory and writes them to METRICS_DIR/<host>.<pid>.<id>.json at most
+once every METRICS_FLUSH_INTERVAL seconds, and the metrics endpoint adds up the files
+of every process, so the totals cover all the gunicorn workers. The id is new for
+every process, so a worker started with the pid of one that has exited never
+overwrites its file.
+
+So that the counters never go down but the directory doesn't grow with every
+restarted worker, the metrics endpoint merges the files of the workers on its host
+that have exited into METRICS_DIR/exited.json, which keeps the names of the last
+files merged until they have been removed, so none is ever counted twice.
+"""
+from collections import defaultdict
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+
+# Upper bounds of the histogram buckets, the last one is +Inf
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200]
+
+# The metrics of the workers that have exited, see load_metrics
+EXITED_FILE_NAME = "exited.json"
+
+
+def _empty_view_metrics():
+    return {
+        # "<method> <status code>" -> number of requests
+        "requests": defaultdict(int),
+        "duration": [0] * (len(DURATION_BUCKETS) + 1),
+        "durationSum": 0.0,
+        "queries": [0] * (len(QUERY_BUCKETS) + 1),
+        "queriesSum": 0,
+        "dbSeconds": 0.0,
+    }
+
+
+def _bucket(buckets, value):
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+class _ProcessMetrics:
+    """The metrics recorded by this process since it started."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pid = os.getpid()
+            self.file_name = (
+                f"{socket.gethostname()}.{self.pid}.{uuid.uuid4().hex}.json"
+            )
+            self.views = defaultdict(_empty_view_metrics)
+            self._last_flush = time.monotonic()
+
+    def record(self, view, method, status_code, seconds, queries, db_seconds):
+        if os.getpid() != self.pid:
+            # Forked after recording, the parent's requests aren't this process's
+            self.reset()
+
+        with self._lock:
+            metrics = self.views[view]
+            metrics["requests"][f"{method} {status_code}"] += 1
+            metrics["duration"][_bucket(DURATION_BUCKETS, seconds)] += 1
+            metrics["durationSum"] += seconds
+            metrics["queries"][_bucket(QUERY_BUCKETS, queries)] += 1
+            metrics["queriesSum"] += queries
+            metrics["dbSeconds"] += db_seconds
+
+        if time.monotonic() - self._last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            data = json.dumps(self.views)
+            self._last_flush = time.monotonic()
+
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _write(os.path.join(settings.METRICS_DIR, self.file_name), data)
+
+
+def _write(path, data):
+    with open(f"{path}.tmp", "w") as f:
+        f.write(data)
+    # Readers never see a partially written file
+    os.replace(f"{path}.tmp", path)
+
+
+process_metrics = _ProcessMetrics()
+
+
+class _QueryTimer:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_timer = _QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(query_timer):
+            response = self.get_response(request)
+        seconds = time.perf_counter() - start
+
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else "unresolved"
+        process_metrics.record(
+            view,
+            request.method,
+            response.status_code,
+            seconds,
+            query_timer.queries,
+            query_timer.seconds,
+        )
+        return response
+
+
+def _add(totals, views):
+    for view, metrics in views.items():
+        total = totals[view]
+        for key, count in metrics["requests"].items():
+            total["requests"][key] += count
+        for key in ["duration", "queries"]:
+            total[key] = [a + b for a, b in zip(total[key], metrics[key])]
+        for key in ["durationSum", "queriesSum", "dbSeconds"]:
+            total[key] += metrics[key]
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _has_exited(file_name):
+    """Whether the worker that writes the file ran on this host and has exited."""
+    try:
+        host, pid, _ = file_name[: -len(".json")].rsplit(".", 2)
+        pid = int(pid)
+    except ValueError:
+        return False
+    if host != socket.gethostname():
+        # Workers on other hosts sharing the directory merge their own files
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def load_metrics():
+    """
+    Adds up the metrics files of every process, after merging those of the workers
+    that have exited into the exited file.
+    """
+    totals = defaultdict(_empty_view_metrics)
+    try:
+        file_names = os.listdir(settings.METRICS_DIR)
+    except FileNotFoundError:
+        return totals
+
+    exited_path = os.path.join(settings.METRICS_DIR, EXITED_FILE_NAME)
+    with open(os.path.join(settings.METRICS_DIR, ".lock"), "w") as lock:
+        # Only one worker merges files at a time
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        exited = _read(exited_path) or {"merged": [], "views": {}}
+        exited_views = defaultdict(_empty_view_metrics)
+        _add(exited_views, exited["views"])
+
+        merged = []
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".json") or file_name == EXITED_FILE_NAME:
+                continue
+            path = os.path.join(settings.METRICS_DIR, file_name)
+            if file_name in exited["merged"]:
+                # Merged already, but not removed
+                os.remove(path)
+                continue
+            views = _read(path)
+            if views is None:
+                continue
+
+            if _has_exited(file_name):
+                _add(exited_views, views)
+                merged.append(file_name)
+            else:
+                _add(totals, views)
+
+        if merged:
+            _write(exited_path, json.dumps({"merged": merged, "views": exited_views}))
+            for file_name in merged:
+                os.remove(os.path.join(settings.METRICS_DIR, file_name))
+
+    _add(totals, exited_views)
+    return totals
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _histogram(lines, name, view, buckets, counts, total):
+    cumulative = 0
+    for bound, count in zip(buckets + ["+Inf"], counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{view="{view}"}} {total}')
+    lines.append(f'{name}_count{{view="{view}"}} {cumulative}')
+
+
+def render_metrics(views):
+    """Renders metrics, as returned by load_metrics, in the Prometheus text format."""
+    requests = [
+        "# HELP skule_vote_requests_total Requests handled, by view, method and status.",
+        "# TYPE skule_vote_requests_total counter",
+    ]
+    duration = [
+        "# HELP skule_vote_request_duration_seconds Time taken to handle each request.",
+        "# TYPE skule_vote_request_duration_seconds histogram",
+    ]
+    queries = [
+        "# HELP skule_vote_db_queries_per_request Database queries run by each request.",
+        "# TYPE skule_vote_db_queries_per_request histogram",
+    ]
+    db_seconds = [
+        "# HELP skule_vote_db_query_seconds_total Time spent running database queries.",
+        "# TYPE skule_vote_db_query_seconds_total counter",
+    ]
+
+    for view_name in sorted(views):
+        metrics = views[view_name]
+        view = _label(view_name)
+        for key in sorted(metrics["requests"]):
+            method, status_code = key.split(" ")
+            requests.append(
+                f'skule_vote_requests_total{{view="{view}",method="{_label(method)}",'
+                f'status="{status_code}"}} {metrics["requests"][key]}'
+            )
+        _histogram(
+            duration,
+            "skule_vote_request_duration_seconds",
+            view,
+            DURATION_BUCKETS,
+            metrics["duration"],
+            metrics["durationSum"],
+        )
+        _histogram(
+            queries,
+            "skule_vote_db_queries_per_request",
+            view,
+            QUERY_BUCKETS,
+            metrics["queries"],
+            metrics["queriesSum"],
+        )
+        db_seconds.append(
+            f'skule_vote_db_query_seconds_total{{view="{view}"}} {metrics["dbSeconds"]}'
+        )
+
+    return "\n".join(requests + duration + queries + db_seconds) + "\n"
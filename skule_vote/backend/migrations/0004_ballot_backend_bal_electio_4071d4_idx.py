@@ -0,0 +1,20 @@
+# Generated by Django 3.2.12 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0003_alter_voter_student_number_hash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ballot",
+            index=models.Index(
+                fields=["election", "voter", "rank"],
+                name="backend_bal_electio_4071d4_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 3.2.12 on 2026-10-19 11:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_ballot_signatures(apps, schema_editor):
+    """
+    Builds the ranking signature totals for every ballot submitted before they
+    were maintained at write time.
+    """
+    Ballot = apps.get_model("backend", "Ballot")
+    BallotSignature = apps.get_model("backend", "BallotSignature")
+
+    totals = {}
+    current_ballot, candidate_ids = None, []
+    rows = (
+        Ballot.objects.order_by("election_id", "voter_id", "rank")
+        .values_list("election_id", "voter_id", "candidate_id")
+        .iterator()
+    )
+    for election_id, voter_id, candidate_id in rows:
+        if (election_id, voter_id) != current_ballot:
+            if current_ballot is not None:
+                key = (current_ballot[0], ",".join(map(str, candidate_ids)))
+                totals[key] = totals.get(key, 0) + 1
+            current_ballot, candidate_ids = (election_id, voter_id), []
+        if candidate_id is not None:
+            candidate_ids.append(candidate_id)
+    if current_ballot is not None:
+        key = (current_ballot[0], ",".join(map(str, candidate_ids)))
+        totals[key] = totals.get(key, 0) + 1
+
+    BallotSignature.objects.bulk_create(
+        [
+            BallotSignature(election_id=election_id, signature=signature, count=count)
+            for (election_id, signature), count in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0004_ballot_backend_bal_electio_4071d4_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BallotSignature",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("signature", models.CharField(blank=True, max_length=1000)),
+                ("count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "election",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ballot_signatures",
+                        to="backend.election",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ballotsignature",
+            constraint=models.UniqueConstraint(
+                fields=("election", "signature"), name="unique_election_signature"
+            ),
+        ),
+        migrations.RunPython(populate_ballot_signatures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.12 on 2026-10-19 11:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def populate_turnout_counters(apps, schema_editor):
+    """
+    Seeds the first shard of each Election with the ballots cast before turnout
+    was counted at submission time.
+    """
+    Ballot = apps.get_model("backend", "Ballot")
+    TurnoutCounter = apps.get_model("backend", "TurnoutCounter")
+
+    TurnoutCounter.objects.bulk_create(
+        [
+            TurnoutCounter(election_id=row["election"], shard=0, count=row["voters"])
+            for row in Ballot.objects.values("election").annotate(
+                voters=Count("voter", distinct=True)
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0005_ballotsignature"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TurnoutCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.IntegerField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "election",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="turnout_counters",
+                        to="backend.election",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="turnoutcounter",
+            constraint=models.UniqueConstraint(
+                fields=("election", "shard"), name="unique_election_shard"
+            ),
+        ),
+        migrations.RunPython(populate_turnout_counters, migrations.RunPython.noop),
+    ]
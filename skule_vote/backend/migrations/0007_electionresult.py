@@ -0,0 +1,39 @@
+# Generated by Django 3.2.12 on 2026-10-19 11:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0006_turnoutcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ElectionResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("watermark", models.CharField(max_length=64)),
+                ("results", models.TextField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "election",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="result",
+                        to="backend.election",
+                    ),
+                ),
+            ],
+        ),
+    ]
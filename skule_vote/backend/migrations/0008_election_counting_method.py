@@ -0,0 +1,23 @@
+# Generated by Django 3.2.12 on 2026-10-19 11:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0007_electionresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="election",
+            name="counting_method",
+            field=models.CharField(
+                choices=[("instant_runoff", "Instant runoff")],
+                default="instant_runoff",
+                help_text="How should the ballots in this election be counted?",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.core import validators
+from django.dispatch import Signal
+
+from backend.counting import DEFAULT_COUNTING_METHOD, counting_method_choices
 
 
 DISCIPLINE_CHOICES = [
@@ -22,6 +25,21 @@ STUDY_YEAR_CHOICES = [
     (4, "Fourth Year"),
 ]
 
+# Sent when Eligibilities or Messages are deleted other than by a cascade, see
+# backend.api_cache. They don't send post_delete, as any receiver stops Django
+# deleting them in a single query when their Election or ElectionSession is deleted.
+rows_deleted = Signal()
+
+
+class _RowsDeletedQuerySet(models.QuerySet):
+    def delete(self):
+        deleted = super().delete()
+        rows_deleted.send(sender=self.model)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class ElectionSession(models.Model):
     class Meta:
@@ -86,6 +104,13 @@ class Election(models.Model):
         null=False,
         help_text="What category does this election belong to?",
     )
+    counting_method = models.CharField(
+        max_length=50,
+        choices=counting_method_choices(),
+        default=DEFAULT_COUNTING_METHOD,
+        null=False,
+        help_text="How should the ballots in this election be counted?",
+    )
 
     created_at = models.DateTimeField(auto_now_add=True, null=False)
     updated_at = models.DateTimeField(auto_now=True, null=False)
@@ -98,6 +123,14 @@ class Election(models.Model):
     ):
         super(Election, self).save(force_insert, force_update, using, update_fields)
 
+        candidate = self.build_ron_candidate()
+        candidate.save()
+
+    def build_ron_candidate(self):
+        """
+        Returns the (unsaved) Reopen Nominations Candidate for this Election. save()
+        creates it automatically, bulk inserts of Elections must create it themselves.
+        """
         data = {
             "name": "Reopen Nominations",
             "election": self,
@@ -105,8 +138,7 @@ class Election(models.Model):
             "If 'Reopen Nominations' wins, nominations for this position will be re-opened "
             "so that more candidates can run.",
         }
-        candidate = Candidate(**data)
-        candidate.save()
+        return Candidate(**data)
 
 
 class Candidate(models.Model):
@@ -180,6 +212,10 @@ class Voter(models.Model):
 
 
 class Ballot(models.Model):
+    class Meta:
+        # Results are computed by scanning ballots in (election, voter, rank) order
+        indexes = [models.Index(fields=["election", "voter", "rank"])]
+
     voter = models.ForeignKey(
         Voter, related_name="ballots", null=False, on_delete=models.CASCADE
     )
@@ -200,6 +236,92 @@ class Ballot(models.Model):
         return f"{self.voter} | {self.candidate}"
 
 
+class BallotSignature(models.Model):
+    """
+    Running total of how many ballots in an Election share the exact same ranking,
+    incremented alongside the Ballot rows when a ballot is submitted, so results can be
+    computed from at most one row per distinct ranking instead of every Ballot row.
+
+    The totals are advisory: Ballot rows remain the store of record that results are
+    counted from. They are never decremented, so Ballots deleted any other way (with
+    a Candidate or Voter, or in the admin) are still counted, and they only serve to
+    cross-check the official count, see the generate_results command.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["election", "signature"], name="unique_election_signature"
+            )
+        ]
+
+    election = models.ForeignKey(
+        Election, related_name="ballot_signatures", null=False, on_delete=models.CASCADE
+    )
+    # Comma separated Candidate ids in rank order, empty for a spoiled ballot
+    signature = models.CharField(max_length=1000, null=False, blank=True)
+    count = models.IntegerField(null=False, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True, null=False)
+
+    def __str__(self):
+        return f"{self.election} | {self.signature} | {self.count}"
+
+    @staticmethod
+    def from_candidate_ids(candidate_ids):
+        return ",".join(str(candidate_id) for candidate_id in candidate_ids)
+
+    @staticmethod
+    def to_candidate_ids(signature):
+        return [
+            int(candidate_id) for candidate_id in signature.split(",") if candidate_id
+        ]
+
+
+class TurnoutCounter(models.Model):
+    """
+    One of several counter rows that together hold the number of ballots cast in an
+    Election. Submissions increment a random shard so concurrent voters rarely wait
+    on the same row lock; the turnout is the sum over all shards.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["election", "shard"], name="unique_election_shard"
+            )
+        ]
+
+    election = models.ForeignKey(
+        Election, related_name="turnout_counters", null=False, on_delete=models.CASCADE
+    )
+    shard = models.IntegerField(null=False)
+    count = models.IntegerField(null=False, default=0)
+
+    def __str__(self):
+        return f"{self.election} | {self.shard} | {self.count}"
+
+
+class ElectionResult(models.Model):
+    """
+    The last results computed for an Election, along with a watermark of the ballots
+    and Candidates they were computed from. The results are reused for as long as the
+    watermark stays the same, see backend.results.
+    """
+
+    election = models.OneToOneField(
+        Election, related_name="result", null=False, on_delete=models.CASCADE
+    )
+    watermark = models.CharField(max_length=64, null=False)
+    # Stored as JSON text rather than in a JSONField so the order of the Candidates in
+    # each round is kept as is (jsonb sorts object keys)
+    results = models.TextField(null=False)
+    updated_at = models.DateTimeField(auto_now=True, null=False)
+
+    def __str__(self):
+        return f"{self.election} | {self.watermark}"
+
+
 class Eligibility(models.Model):
     class Meta:
         verbose_name_plural = "Eligibilities"
@@ -277,9 +399,16 @@ class Eligibility(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=False)
     updated_at = models.DateTimeField(auto_now=True, null=False)
 
+    objects = _RowsDeletedQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.election} Eligibility"
 
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        rows_deleted.send(sender=Eligibility)
+        return deleted
+
 
 class Message(models.Model):
     message = models.TextField(
@@ -298,5 +427,12 @@ class Message(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=False)
     updated_at = models.DateTimeField(auto_now=True, null=False)
 
+    objects = _RowsDeletedQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.election_session} | {self.message[:15]}"
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        rows_deleted.send(sender=Message)
+        return deleted
@@ -0,0 +1,113 @@
+"""
+On-demand profiling of a single request, for finding out why an endpoint is slow in
+production with production data.
+
+A request with ?profile=1 in its query string, or an X-Profile: 1 header, from a
+logged in staff user is run under cProfile while every database query it makes is
+recorded. Instead of the view's response, the staff user gets back a JSON report with
+the view's status code, the slowest functions, and each query with its duration and
+EXPLAIN plan. The request is otherwise handled as usual, so a profiled POST still
+makes its changes.
+
+The flag is ignored for anyone else, voters included since they never log in, and
+requests without it only pay for looking the flag up.
+"""
+import cProfile
+import io
+import pstats
+import time
+
+from django.db import DatabaseError, connection
+from django.http import JsonResponse
+
+# Number of functions listed in the report
+PROFILE_LIMIT = 50
+
+
+def _profile_requested(request):
+    return request.GET.get("profile") == "1" or request.headers.get("X-Profile") == "1"
+
+
+class _QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": params,
+                    "many": many,
+                    "seconds": time.perf_counter() - start,
+                }
+            )
+
+
+def _explain(query):
+    """
+    Returns the EXPLAIN plan of a recorded query as a list of lines, or None for
+    queries other than SELECTs, which it isn't safe to explain again.
+    """
+    if query["many"] or not query["sql"].lstrip().upper().startswith("SELECT"):
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{connection.ops.explain_query_prefix()} {query['sql']}",
+                query["params"],
+            )
+            return [
+                " ".join(str(column) for column in row) for row in cursor.fetchall()
+            ]
+    except DatabaseError as e:
+        return [f"Could not explain the query: {e}"]
+
+
+class ProfilerMiddleware:
+    """Must come after AuthenticationMiddleware, which sets request.user."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _profile_requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+
+        recorder = _QueryRecorder()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        seconds = time.perf_counter() - start
+
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats("cumulative").print_stats(
+            PROFILE_LIMIT
+        )
+
+        return JsonResponse(
+            {
+                "method": request.method,
+                "path": request.get_full_path(),
+                "status": response.status_code,
+                "seconds": seconds,
+                "queries": [
+                    {
+                        "sql": query["sql"],
+                        "seconds": query["seconds"],
+                        "explain": _explain(query),
+                    }
+                    for query in recorder.queries
+                ],
+                "profile": stats.getvalue(),
+            }
+        )
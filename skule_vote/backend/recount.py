@@ -0,0 +1,49 @@
+"""
+"What if" recounts of an Election with an arbitrary set of Candidates removed, as if
+they had been disqualified.
+
+The Election's PackedBallotSet is cached, so after the first recount the ballots are
+not read again, and the results of each set of excluded Candidates are cached too.
+Both cache keys include the Election's watermark (see backend.results), so anything
+cached before a ballot is cast or a Candidate changes is never used again.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from backend.ballot_sets import load_election_ballot_set
+from backend.results import election_watermark
+
+
+def _ballot_set_key(election, watermark):
+    return f"recount:{election.id}:{watermark}"
+
+
+def _results_key(election, watermark, excluded_candidate_ids):
+    excluded = ",".join(str(candidate_id) for candidate_id in excluded_candidate_ids)
+    return f"recount:{election.id}:{watermark}:{excluded}"
+
+
+def recount(election, excluded_candidate_ids):
+    """
+    Returns the results of the Election with the given Candidates removed, in the same
+    format as calculate_results. As with disqualified Candidates, the excluded
+    Candidates are dropped from every ranking and ballots that only ranked excluded
+    Candidates are not counted.
+    """
+    excluded_candidate_ids = sorted(set(excluded_candidate_ids))
+    watermark = election_watermark(election)
+
+    results_key = _results_key(election, watermark, excluded_candidate_ids)
+    results = cache.get(results_key)
+    if results is not None:
+        return results
+
+    ballot_set_key = _ballot_set_key(election, watermark)
+    ballot_set = cache.get(ballot_set_key)
+    if ballot_set is None:
+        ballot_set = load_election_ballot_set(election)
+        cache.set(ballot_set_key, ballot_set, settings.RECOUNT_CACHE_TIMEOUT)
+
+    results = ballot_set.exclude(excluded_candidate_ids).calculate()
+    cache.set(results_key, results, settings.RECOUNT_CACHE_TIMEOUT)
+    return results
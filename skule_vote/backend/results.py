@@ -0,0 +1,128 @@
+"""
+Memoized results for the "Generate results" admin action.
+
+Once polls close the ballots don't change, but staff download the results many times.
+The results of each Election are stored in an ElectionResult along with a watermark of
+what they were computed from, and only Elections whose watermark has changed since are
+recounted.
+"""
+import hashlib
+import json
+
+from django.db.models import Count, Max
+
+from backend.ballot_sets import load_election_session_ballot_sets
+from backend.models import Ballot, Candidate, Election, ElectionResult
+
+
+def _watermark(seats_available, counting_method, ballots, candidates):
+    data = json.dumps(
+        [seats_available, counting_method, ballots, candidates], separators=(",", ":")
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _watermarks(election_filter):
+    related_filter = {
+        f"election__{key}": value for key, value in election_filter.items()
+    }
+    ballots = {
+        row["election_id"]: [row["max_id"], row["count"]]
+        for row in Ballot.objects.filter(**related_filter)
+        .values("election_id")
+        .annotate(max_id=Max("id"), count=Count("id"))
+        .order_by()
+    }
+
+    candidates = {}
+    for election_id, candidate_id, name, disqualified_status in (
+        Candidate.objects.filter(**related_filter)
+        .order_by("election_id", "id")
+        .values_list("election_id", "id", "name", "disqualified_status")
+    ):
+        candidates.setdefault(election_id, []).append(
+            [candidate_id, name, disqualified_status]
+        )
+
+    return {
+        election_id: (
+            election_name,
+            _watermark(
+                seats_available,
+                counting_method,
+                ballots.get(election_id, [None, 0]),
+                candidates.get(election_id, []),
+            ),
+        )
+        for (
+            election_id,
+            election_name,
+            seats_available,
+            counting_method,
+        ) in Election.objects.filter(**election_filter)
+        .order_by("id")
+        .values_list("id", "election_name", "seats_available", "counting_method")
+    }
+
+
+def election_session_watermarks(election_session):
+    """
+    Returns {Election id: (Election name, watermark)} for every Election in the
+    ElectionSession, in three queries.
+
+    The watermark covers the highest Ballot id and the number of Ballot rows, which
+    change whenever ballots are cast or removed, along with the number of seats, the
+    counting method and the id, name and disqualification status of every Candidate.
+    Ballot rows edited in place (only possible through the admin in DEBUG) are not
+    detected.
+    """
+    return _watermarks({"election_session": election_session})
+
+
+def election_watermark(election):
+    """Returns the watermark of a single Election, see election_session_watermarks."""
+    return _watermarks({"id": election.id})[election.id][1]
+
+
+def load_election_session_results(election_session):
+    """
+    Returns the results of every Election in the ElectionSession, keyed by Election
+    name as calculate_election_session_results does. Stored results are used for the
+    Elections whose watermark is unchanged; the ballots are only loaded and counted
+    when at least one Election is out of date, and then only those are recounted.
+    """
+    watermarks = election_session_watermarks(election_session)
+    stored = {
+        election_id: (watermark, results)
+        for election_id, watermark, results in ElectionResult.objects.filter(
+            election__election_session=election_session
+        ).values_list("election_id", "watermark", "results")
+    }
+
+    stale = [
+        election_id
+        for election_id, (_, watermark) in watermarks.items()
+        if election_id not in stored or stored[election_id][0] != watermark
+    ]
+    results = {
+        election_id: json.loads(stored[election_id][1])
+        for election_id in watermarks
+        if election_id not in stale
+    }
+
+    if stale:
+        ballot_sets = load_election_session_ballot_sets(election_session)
+        for election_id in stale:
+            results[election_id] = ballot_sets[election_id].election_results()
+            ElectionResult.objects.update_or_create(
+                election_id=election_id,
+                defaults={
+                    "watermark": watermarks[election_id][1],
+                    "results": json.dumps(results[election_id]),
+                },
+            )
+
+    return {
+        f"{election_name}": results[election_id]
+        for election_id, (election_name, _) in watermarks.items()
+    }
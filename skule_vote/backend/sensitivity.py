@@ -0,0 +1,71 @@
+"""
+Leave-one-out sensitivity analysis: recounts an Election once for every Candidate,
+with that Candidate removed, to show which single withdrawal or disqualification
+would change who wins.
+
+The recounts are independent, so they are spread over a pool of worker processes.
+Workers are forked after the PackedBallotSet is set aside in a module global, so every
+worker shares the one copy instead of having it pickled for each recount.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from backend.ballot import RON
+
+# The PackedBallotSet being analysed, inherited by the forked worker processes
+_ballot_set = None
+
+
+def _winners_without(candidate_id):
+    return _ballot_set.exclude([candidate_id]).calculate()["winners"]
+
+
+def leave_one_out(ballot_set, max_workers=None):
+    """
+    Recounts the PackedBallotSet once without each of its Candidates (other than
+    Reopen Nominations, which can't be removed). Returns:
+
+        {
+            "election_name": "...",
+            "winners": [...],
+            "removals": [
+                {"id": 1, "name": "...", "winners": [...], "changes_outcome": True},
+            ],
+        }
+
+    max_workers is passed on to ProcessPoolExecutor; 0 runs every recount in this
+    process instead, as does any platform that can't fork.
+    """
+    global _ballot_set
+
+    winners = ballot_set.calculate()["winners"]
+    candidates = [c for c in ballot_set.candidates if c["name"] != RON]
+    candidate_ids = [c["id"] for c in candidates]
+
+    _ballot_set = ballot_set
+    try:
+        if max_workers == 0 or "fork" not in multiprocessing.get_all_start_methods():
+            outcomes = [
+                _winners_without(candidate_id) for candidate_id in candidate_ids
+            ]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("fork")
+            ) as executor:
+                outcomes = list(executor.map(_winners_without, candidate_ids))
+    finally:
+        _ballot_set = None
+
+    return {
+        "election_name": ballot_set.election_name,
+        "winners": winners,
+        "removals": [
+            {
+                "id": candidate["id"],
+                "name": candidate["name"],
+                "winners": new_winners,
+                "changes_outcome": sorted(new_winners) != sorted(winners),
+            }
+            for candidate, new_winners in zip(candidates, outcomes)
+        ],
+    }
@@ -1,6 +1,15 @@
-from django.db import transaction
-
-from backend.models import Ballot, Candidate, Election, ElectionSession, Message, Voter
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from backend.models import (
+    Ballot,
+    BallotSignature,
+    Candidate,
+    Election,
+    ElectionSession,
+    Message,
+)
+from backend.turnout import increment_turnout
 from rest_framework import serializers
 
 # General Ballot serializer used for views and recording ballots
@@ -26,29 +35,93 @@ class BallotSerializer(serializers.Serializer):
         return data
 
     def save(self):
-        election = Election.objects.get(id=self.validated_data["electionId"])
-        candidates_dict = {c.id: c for c in Candidate.objects.filter(election=election)}
-        voter = Voter.objects.get(
-            student_number_hash=self.context["student_number_hash"]
-        )
+        # BallotSubmitView has already checked the Election exists
+        election_id = self.validated_data["electionId"]
+        voter = self.context["voter"]
+
+        ranking = self.validated_data["ranking"]
+        candidate_ids = [ranking[rank] for rank in sorted(ranking, key=int)]
+        signature = BallotSignature.from_candidate_ids(candidate_ids)
 
         with transaction.atomic(durable=True):
-            if self.validated_data["ranking"]:
-                for rank in self.validated_data["ranking"]:
-                    ballot = Ballot(
-                        voter=voter,
-                        candidate=candidates_dict[self.validated_data["ranking"][rank]],
-                        election=election,
-                        rank=int(rank),
-                    )
-                    ballot.save()
+            if ranking:
+                # validate() has already checked the Candidates belong to the Election,
+                # and all the ranks are inserted in a single query
+                Ballot.objects.bulk_create(
+                    [
+                        Ballot(
+                            voter=voter,
+                            candidate_id=ranking[rank],
+                            election_id=election_id,
+                            rank=int(rank),
+                        )
+                        for rank in ranking
+                    ]
+                )
             else:
                 # Spoiled ballot
                 ballot = Ballot(
                     voter=voter,
-                    election=election,
+                    election_id=election_id,
                 )
                 ballot.save()
+            self.increment_signature(election_id, signature)
+            # In the same transaction, so the turnout never drifts from the ballots
+            increment_turnout(election_id)
+
+    @staticmethod
+    def increment_signature(election_id, signature):
+        """
+        Adds one to the running total for this ranking. The first ballot with a new
+        ranking creates the row; if another request creates it first we fall back to
+        incrementing it.
+        """
+        signatures = BallotSignature.objects.filter(
+            election_id=election_id, signature=signature
+        )
+        if signatures.update(count=F("count") + 1):
+            return
+
+        try:
+            with transaction.atomic():
+                BallotSignature.objects.create(
+                    election_id=election_id, signature=signature, count=1
+                )
+        except IntegrityError:
+            signatures.update(count=F("count") + 1)
+
+
+# Validates a request for a "what if" recount of an Election, see backend/recount.py
+class RecountSerializer(serializers.Serializer):
+    electionId = serializers.IntegerField(min_value=0)
+    excludedCandidates = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=True
+    )
+
+    def validate(self, data):
+        """
+        Ensure the election exists and the excluded candidates belong to it.
+        """
+
+        try:
+            data["election"] = Election.objects.get(id=data["electionId"])
+        except Election.DoesNotExist:
+            raise serializers.ValidationError(
+                f"No election with id: {data['electionId']} exists"
+            )
+
+        candidate_ids = set(
+            Candidate.objects.filter(election=data["election"]).values_list(
+                "id", flat=True
+            )
+        )
+        for candidate in data["excludedCandidates"]:
+            if candidate not in candidate_ids:
+                raise serializers.ValidationError(
+                    f"No candidate with id: {candidate} exists in election: {data['electionId']}"
+                )
+
+        return data
 
 
 # Specialized Ballot serializer used for converting to the format that
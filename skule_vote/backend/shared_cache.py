@@ -0,0 +1,393 @@
+"""
+A cache backend shared by every worker process on a host, without an external
+service: entries are kept in a memory-mapped file that all the workers map.
+
+The file is a header followed by SETS sets of WAYS fixed-size slots. A key is hashed
+to a set and can only be stored in one of its slots, so a lookup reads at most WAYS
+slots. When a set is full, its least recently used entry is evicted. Each slot holds
+the key's hash, the cache generation it was written in, its expiry time, when it was
+last used, and the key and pickled value themselves.
+
+A value that doesn't fit in one slot with its key and slot header is split into parts:
+the key's own slot holds the start of it and how many parts follow, and part n is
+stored under the key followed by a NUL byte and n, so the parts are spread over other
+sets. If any part has been evicted, the whole value is a miss. Values larger than
+MAX_VALUE_SIZE bytes pickled are not cached, and are logged as a warning.
+
+clear() bumps the generation in the header rather than wiping the file, so every
+entry written before it is treated as empty. Access is serialized with flock on the
+file, which covers every worker and, since each cache instance opens the file for
+itself, every thread.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "backend.shared_cache.SharedMemoryCache",
+            "LOCATION": "/srv/skule_vote/cache/skule_vote_cache",
+            "OPTIONS": {
+                "SETS": 512,
+                "WAYS": 8,
+                "SLOT_SIZE": 16384,
+                "MAX_VALUE_SIZE": 4 * 1024 * 1024,
+            },
+        }
+    }
+
+The file takes SETS * WAYS * SLOT_SIZE bytes of disk and memory, at most, as pages
+are only allocated once they are written to. Its name is LOCATION followed by the
+format version and the layout, e.g. /srv/skule_vote/cache/skule_vote_cache.v2.512x8x16384,
+so workers
+started with another layout, as during a rolling deploy that changes it, use a file of
+their own rather than resetting one the old workers still have mapped. Files of old
+layouts are left behind, and can be removed once no worker uses them.
+
+Values are unpickled, so anyone who can write to the file can run code in the workers.
+Its directory is created private to the workers' user if it doesn't exist, and the
+file is refused, with ImproperlyConfigured, if it is a symlink, isn't owned by that
+user or can be read or written by anyone else. LOCATION should still not be in a
+directory others can write to, such as /tmp.
+"""
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+_MAGIC = b"SKVCACHE"
+# Bumped whenever the header or slot layout changes
+_VERSION = 2
+# magic, sets, ways, slot size, generation, clock
+_HEADER = struct.Struct("<8sIIIQQ")
+# key hash, generation, expiry time, last used, key length, length of the value (or
+# the part of it) in the slot, number of parts that follow
+_SLOT = struct.Struct("<QQdQIII")
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def _part_key(key, index):
+    return key + b"\0" + str(index).encode()
+
+
+class SharedMemoryCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._sets = int(options.get("SETS", 512))
+        self._ways = int(options.get("WAYS", 8))
+        self._slot_size = int(options.get("SLOT_SIZE", 16384))
+        self._max_value_size = int(options.get("MAX_VALUE_SIZE", 4 * 1024 * 1024))
+        self._path = (
+            f"{location}.v{_VERSION}.{self._sets}x{self._ways}x{self._slot_size}"
+        )
+        self._size = _HEADER.size + self._sets * self._ways * self._slot_size
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._mmap = None
+
+    def _open(self):
+        """
+        Maps the file, creating it if needed. A process forked after the file was
+        opened opens it again, as flock doesn't lock anything between processes sharing
+        an open file.
+        """
+        if self._pid == os.getpid():
+            return
+        if self._mmap is not None:
+            self._mmap.close()
+            os.close(self._fd)
+
+        os.makedirs(os.path.dirname(self._path), 0o700, exist_ok=True)
+        try:
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        except OSError as e:
+            raise ImproperlyConfigured(
+                f"Can't open the cache file {self._path}: {e}"
+            ) from e
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            stat = os.fstat(fd)
+            if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+                raise ImproperlyConfigured(
+                    f"Refusing to use the cache file {self._path}: it must be owned "
+                    f"by this user and only readable and writable by it"
+                )
+            # Only ever grown, from empty, as shrinking a file that other processes
+            # have mapped makes them crash when they touch the pages cut off
+            if stat.st_size < self._size:
+                os.ftruncate(fd, self._size)
+            mm = mmap.mmap(fd, self._size)
+            if _HEADER.unpack_from(mm, 0)[0] != _MAGIC:
+                # A new file, in which every slot is zeroed, and generation 0 is never
+                # current, so they are all empty
+                _HEADER.pack_into(
+                    mm, 0, _MAGIC, self._sets, self._ways, self._slot_size, 1, 0
+                )
+        except BaseException:
+            # Which also releases the lock
+            os.close(fd)
+            raise
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+        self._fd, self._mmap, self._pid = fd, mm, os.getpid()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield self._mmap
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find(self, mm, key, key_hash):
+        """
+        Returns the offset of the key's live slot, or None, and the offset of the slot
+        to store it in: its own, an empty or expired one, or the least recently used.
+        """
+        generation = _HEADER.unpack_from(mm, 0)[4]
+        now = time.time()
+        first = _HEADER.size + (key_hash % self._sets) * self._ways * self._slot_size
+
+        empty = least_recent = None
+        least_recent_used = math.inf
+        for offset in range(
+            first, first + self._ways * self._slot_size, self._slot_size
+        ):
+            (
+                slot_hash,
+                slot_generation,
+                expiry,
+                used,
+                key_length,
+                _,
+                _,
+            ) = _SLOT.unpack_from(mm, offset)
+            if slot_generation != generation or expiry <= now:
+                if empty is None:
+                    empty = offset
+                continue
+
+            start = offset + _SLOT.size
+            if slot_hash == key_hash and mm[start : start + key_length] == key:
+                return offset, offset
+            if used < least_recent_used:
+                least_recent, least_recent_used = offset, used
+
+        return None, empty if empty is not None else least_recent
+
+    def _use(self, mm, offset):
+        magic, sets, ways, slot_size, generation, clock = _HEADER.unpack_from(mm, 0)
+        _HEADER.pack_into(mm, 0, magic, sets, ways, slot_size, generation, clock + 1)
+        struct.pack_into("<Q", mm, offset + 24, clock + 1)
+        return generation, clock + 1
+
+    def _parts(self, mm, key, key_hash):
+        """
+        Returns the offsets of the slots holding the key's value, its own first, or
+        None if it isn't cached or any of its parts has been evicted.
+        """
+        offset, _ = self._find(mm, key, key_hash)
+        if offset is None:
+            return None
+
+        offsets = [offset]
+        for index in range(1, _SLOT.unpack_from(mm, offset)[6] + 1):
+            part_key = _part_key(key, index)
+            part_offset, _ = self._find(mm, part_key, _hash(part_key))
+            if part_offset is None:
+                return None
+            offsets.append(part_offset)
+        return offsets
+
+    def _read(self, mm, key, key_hash):
+        offsets = self._parts(mm, key, key_hash)
+        if offsets is None:
+            return None
+
+        value = bytearray()
+        for offset in offsets:
+            self._use(mm, offset)
+            _, _, _, _, key_length, value_length, _ = _SLOT.unpack_from(mm, offset)
+            start = offset + _SLOT.size + key_length
+            value += mm[start : start + value_length]
+        return bytes(value)
+
+    def _split(self, key, value):
+        """
+        Splits the value into (key, part) pairs that each fit in a slot, the first
+        under the key itself. Returns None if it's too large to cache.
+        """
+        if len(value) > self._max_value_size:
+            return None
+
+        parts, start = [], 0
+        while start < len(value) or not parts:
+            part_key = key if not parts else _part_key(key, len(parts))
+            capacity = self._slot_size - _SLOT.size - len(part_key)
+            if capacity <= 0:
+                return None
+            parts.append((part_key, value[start : start + capacity]))
+            start += capacity
+        return parts
+
+    def _write(self, mm, key, key_hash, parts, expiry):
+        """
+        Writes the parts from _split(). Returns whether they all fit: a part can evict
+        another of the same value from a full set, and then none of them are kept.
+        """
+        written = []
+        for index, (part_key, part) in enumerate(parts):
+            part_hash = key_hash if index == 0 else _hash(part_key)
+            _, offset = self._find(mm, part_key, part_hash)
+            generation, used = self._use(mm, offset)
+            _SLOT.pack_into(
+                mm,
+                offset,
+                part_hash,
+                generation,
+                expiry,
+                used,
+                len(part_key),
+                len(part),
+                len(parts) - 1 if index == 0 else 0,
+            )
+            start = offset + _SLOT.size
+            mm[start : start + len(part_key)] = part_key
+            mm[start + len(part_key) : start + len(part_key) + len(part)] = part
+            written.append((part_key, part_hash))
+
+        if self._parts(mm, key, key_hash) is not None:
+            return True
+        for part_key, part_hash in written:
+            self._remove(mm, part_key, part_hash)
+        return False
+
+    def _remove(self, mm, key, key_hash):
+        offset, _ = self._find(mm, key, key_hash)
+        if offset is None:
+            return False
+
+        parts = _SLOT.unpack_from(mm, offset)[6]
+        # Generation 0 is never current, so the slot is empty
+        struct.pack_into("<Q", mm, offset + 8, 0)
+        for index in range(1, parts + 1):
+            part_key = _part_key(key, index)
+            part_offset, _ = self._find(mm, part_key, _hash(part_key))
+            if part_offset is not None:
+                struct.pack_into("<Q", mm, part_offset + 8, 0)
+        return True
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        key = key.encode()
+        return key, _hash(key)
+
+    def _expiry(self, timeout):
+        expiry = self.get_backend_timeout(timeout)
+        return math.inf if expiry is None else expiry
+
+    def get(self, key, default=None, version=None):
+        key, key_hash = self._key(key, version)
+        with self._locked() as mm:
+            value = self._read(mm, key, key_hash)
+        if value is None:
+            return default
+        return pickle.loads(value)
+
+    def _store(self, key, value, timeout, version, only_if_missing):
+        key, key_hash = self._key(key, version)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        parts = self._split(key, value)
+        expiry = self._expiry(timeout)
+        with self._locked() as mm:
+            if only_if_missing and self._parts(mm, key, key_hash) is not None:
+                return False
+            if expiry <= time.time():
+                # Already expired, as with a timeout of 0
+                self._remove(mm, key, key_hash)
+                return True
+            if parts is not None:
+                stored = self._write(mm, key, key_hash, parts, expiry)
+            else:
+                stored = False
+            if not stored:
+                # Don't leave the old value behind
+                self._remove(mm, key, key_hash)
+
+        if parts is None:
+            logger.warning(
+                "Not caching %s: its value is %d bytes, more than the %d allowed",
+                key.decode(),
+                len(value),
+                self._max_value_size,
+            )
+        elif not stored:
+            logger.warning(
+                "Not caching %s: its %d parts evict each other",
+                key.decode(),
+                len(parts),
+            )
+        return stored
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._store(key, value, timeout, version, only_if_missing=False)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._store(key, value, timeout, version, only_if_missing=True)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key, key_hash = self._key(key, version)
+        with self._locked() as mm:
+            offsets = self._parts(mm, key, key_hash)
+            if offsets is None:
+                return False
+            for offset in offsets:
+                struct.pack_into("<d", mm, offset + 16, self._expiry(timeout))
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key, key_hash = self._key(key, version)
+        with self._locked() as mm:
+            value = self._read(mm, key, key_hash)
+            if value is None:
+                raise ValueError(f"Key '{key.decode()}' not found")
+            value = pickle.loads(value) + delta
+            offset, _ = self._find(mm, key, key_hash)
+            expiry = _SLOT.unpack_from(mm, offset)[2]
+            self._write(
+                mm,
+                key,
+                key_hash,
+                self._split(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)),
+                expiry,
+            )
+        return value
+
+    def delete(self, key, version=None):
+        key, key_hash = self._key(key, version)
+        with self._locked() as mm:
+            return self._remove(mm, key, key_hash)
+
+    def clear(self):
+        with self._locked() as mm:
+            magic, sets, ways, slot_size, generation, clock = _HEADER.unpack_from(mm, 0)
+            _HEADER.pack_into(
+                mm, 0, magic, sets, ways, slot_size, generation + 1, clock
+            )
@@ -0,0 +1,246 @@
+"""
+Synthetic ballots for benchmarks, load tests and differential tests, so none of them
+need real voter data.
+
+generate_ballot_set builds a PackedBallotSet (use its ballots() and choices() for
+the calculate_results input format) from one of these preference models over the
+Candidates, Reopen Nominations aside:
+
+    "impartial_culture"  every ranking is equally likely.
+    "mallows"            rankings close to a reference ranking are more likely, each
+                         swap away from it multiplying the probability by dispersion
+                         (0 always gives the reference, 1 is impartial culture).
+    "plackett_luce"      Candidates are ranked one after another, each picked with
+                         probability proportional to its weight among those left.
+
+The full ranking is then cut to a length drawn from the truncation distribution:
+
+    "none"       every Candidate is ranked.
+    "uniform"    the length is uniform between 1 and the number of Candidates.
+    "geometric"  after each choice the voter stops with stop_probability.
+
+Finally a spoil_rate fraction of ballots are spoiled, and Reopen Nominations is put
+first on a ron_first_rate fraction of the others and last on a ron_last_rate fraction.
+
+insert_ballot_set writes a generated set to the database as a new Election, in bulk.
+"""
+from collections import Counter
+import hashlib
+import random
+
+from django.db import transaction
+
+from backend.ballot import RON
+from backend.ballot_sets import PackedBallotSet
+from backend.legacy_import import DEFAULT_VOTER_FIELDS, insert_ballots
+from backend.models import (
+    BallotSignature,
+    Candidate,
+    Election,
+    TurnoutCounter,
+)
+
+MODELS = ["impartial_culture", "mallows", "plackett_luce"]
+TRUNCATIONS = ["none", "uniform", "geometric"]
+
+
+def _impartial_culture(rng, candidates, **kwargs):
+    candidates = list(candidates)
+
+    def ranking():
+        rng.shuffle(candidates)
+        return list(candidates)
+
+    return ranking
+
+
+def _mallows(rng, candidates, dispersion=0.5, **kwargs):
+    # Repeated insertion: the i-th Candidate of the reference ranking is inserted at
+    # position j <= i with probability proportional to dispersion ** (i - j)
+    cum_weights = []
+    for i in range(len(candidates)):
+        total, cumulative = 0, []
+        for j in range(i + 1):
+            total += dispersion ** (i - j)
+            cumulative.append(total)
+        cum_weights.append(cumulative)
+
+    def ranking():
+        ranked = []
+        for i, candidate in enumerate(candidates):
+            (position,) = rng.choices(range(i + 1), cum_weights=cum_weights[i])
+            ranked.insert(position, candidate)
+        return ranked
+
+    return ranking
+
+
+def _plackett_luce(rng, candidates, weights=None, **kwargs):
+    if weights is None:
+        # Zipf-like popularity, in the order of the reference ranking
+        weight = {candidate: 1 / (i + 1) for i, candidate in enumerate(candidates)}
+    else:
+        weight = {i + 1: w for i, w in enumerate(weights)}
+
+    def ranking():
+        # Ordering by exponential arrival times with rates equal to the weights picks
+        # each next Candidate with probability proportional to its weight
+        return sorted(
+            candidates, key=lambda candidate: rng.expovariate(weight[candidate])
+        )
+
+    return ranking
+
+
+_MODELS = {
+    "impartial_culture": _impartial_culture,
+    "mallows": _mallows,
+    "plackett_luce": _plackett_luce,
+}
+
+
+def _truncation(rng, num_candidates, truncation, stop_probability):
+    if truncation == "none":
+        return lambda: num_candidates
+    if truncation == "uniform":
+        return lambda: rng.randint(1, num_candidates)
+
+    def geometric():
+        length = 1
+        while length < num_candidates and rng.random() >= stop_probability:
+            length += 1
+        return length
+
+    return geometric
+
+
+def generate_ballot_set(
+    num_ballots,
+    num_candidates,
+    seats_available=1,
+    model="impartial_culture",
+    reference=None,
+    dispersion=0.5,
+    weights=None,
+    truncation="none",
+    stop_probability=0.5,
+    spoil_rate=0.0,
+    ron_first_rate=0.0,
+    ron_last_rate=0.0,
+    seed=None,
+    election_name="Synthetic Election",
+):
+    """
+    Returns a PackedBallotSet of num_ballots ballots over num_candidates Candidates
+    plus Reopen Nominations, which is always the first choice as in the ballot sets
+    loaded from the database. The models and parameters are described at the top of
+    this module; reference is a ranking of the Candidates by choice index (1 to
+    num_candidates, in order by default) and weights are in choice order too. The
+    same seed always generates the same ballots.
+    """
+    if model not in _MODELS:
+        raise ValueError(f"Unknown preference model: {model}.")
+    if truncation not in TRUNCATIONS:
+        raise ValueError(f"Unknown truncation: {truncation}.")
+    if num_candidates < 1:
+        raise ValueError("There must be at least one Candidate.")
+    if not 0 <= dispersion <= 1:
+        raise ValueError("dispersion must be between 0 and 1.")
+    for name, rate in [
+        ("stop_probability", stop_probability),
+        ("spoil_rate", spoil_rate),
+        ("ron_first_rate", ron_first_rate),
+        ("ron_last_rate", ron_last_rate),
+    ]:
+        if not 0 <= rate <= 1:
+            raise ValueError(f"{name} must be between 0 and 1.")
+    if ron_first_rate + ron_last_rate > 1:
+        raise ValueError("ron_first_rate and ron_last_rate can't add up to over 1.")
+
+    if reference is None:
+        reference = list(range(1, num_candidates + 1))
+    elif sorted(reference) != list(range(1, num_candidates + 1)):
+        raise ValueError("reference must rank every Candidate exactly once.")
+    if weights is not None and (len(weights) != num_candidates or min(weights) <= 0):
+        raise ValueError("There must be one positive weight per Candidate.")
+
+    rng = random.Random(seed)
+    ranking = _MODELS[model](rng, reference, dispersion=dispersion, weights=weights)
+    length = _truncation(rng, num_candidates, truncation, stop_probability)
+
+    candidates = [{"id": 0, "name": RON, "disqualified_status": False}] + [
+        {"id": i, "name": f"Candidate {i}", "disqualified_status": False}
+        for i in range(1, num_candidates + 1)
+    ]
+    ballot_set = PackedBallotSet(None, election_name, seats_available, candidates)
+
+    for _ in range(num_ballots):
+        if rng.random() < spoil_rate:
+            ballot_set.add(())
+            continue
+
+        ranked = ranking()[: length()]
+        ron = rng.random()
+        if ron < ron_first_rate:
+            ranked.insert(0, 0)
+        elif ron < ron_first_rate + ron_last_rate:
+            ranked.append(0)
+        ballot_set.add(ranked)
+
+    return ballot_set
+
+
+def insert_ballot_set(election_session, ballot_set, voter_fields=None, batch_size=2000):
+    """
+    Writes the PackedBallotSet to the ElectionSession as a new Election, with a new
+    Voter for every ballot, in the same way as import_dynamodb_election: Ballot,
+    BallotSignature and TurnoutCounter rows are all bulk inserted in a single
+    transaction. The first choice must be Reopen Nominations, as it is in
+    generated sets. Returns the new Election.
+    """
+    if voter_fields is None:
+        voter_fields = DEFAULT_VOTER_FIELDS
+
+    with transaction.atomic():
+        election = Election(
+            election_name=ballot_set.election_name,
+            election_session=election_session,
+            seats_available=ballot_set.seats_available,
+            category="other",
+            counting_method=ballot_set.counting_method,
+        )
+        election.save()
+        Candidate.objects.bulk_create(
+            [
+                Candidate(name=candidate["name"], election=election)
+                for candidate in ballot_set.candidates[1:]
+            ]
+        )
+        # Reopen Nominations was created first, so ordering by id matches the choices
+        candidates = list(election.candidates.order_by("id"))
+
+        signatures, batch, voter_number = Counter(), [], 0
+        for ranking, count in ballot_set.rankings.items():
+            for _ in range(count):
+                voter_hash = hashlib.sha256(
+                    f"synthetic:{election.id}:{voter_number}".encode("utf-8")
+                ).hexdigest()
+                batch.append((voter_hash, ranking))
+                voter_number += 1
+                if len(batch) >= batch_size:
+                    insert_ballots(
+                        election, candidates, batch, voter_fields, signatures
+                    )
+                    batch.clear()
+        if batch:
+            insert_ballots(election, candidates, batch, voter_fields, signatures)
+
+        BallotSignature.objects.bulk_create(
+            [
+                BallotSignature(election=election, signature=signature, count=count)
+                for signature, count in signatures.items()
+            ]
+        )
+        TurnoutCounter.objects.create(election=election, shard=0, count=voter_number)
+
+    return election
@@ -1,8 +1,12 @@
+import csv
 from datetime import timedelta
+import io
+import json
 import random
 from unittest.mock import patch
 
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -409,6 +413,117 @@ class ElectionSessionAdminTestCase(SetupMixin, TestCase):
         )  # Factor in RON Candidate
         self.assertEqual(Eligibility.objects.count(), 1)
 
+    def test_clone_action_redirects_to_clone_view(self):
+        election_session = self._create_election_session()
+
+        response = self.client.post(
+            reverse("admin:backend_electionsession_changelist"),
+            data={
+                "action": "clone_election_session_action",
+                "_selected_action": [election_session.id],
+            },
+        )
+        clone_view = reverse(
+            "admin:backend_electionsession_clone",
+            kwargs={"object_id": election_session.id},
+        )
+        self.assertRedirects(response, clone_view)
+
+        response = self.client.get(clone_view)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, f"Clone {election_session}")
+
+    def test_clone_view_creates_election_session(self):
+        election_session = self._create_election_session()
+        self.setUpElections(election_session)
+
+        new_start = self._now() + timedelta(days=10)
+        new_end = self._now() + timedelta(days=15)
+        response = self.client.post(
+            reverse(
+                "admin:backend_electionsession_clone",
+                kwargs={"object_id": election_session.id},
+            ),
+            data={
+                "election_session_name": "ElectionSession2022",
+                "start_time": new_start.strftime("%Y-%m-%d %H:%M:%S"),
+                "end_time": new_end.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
+        self.assertRedirects(
+            response, reverse("admin:backend_electionsession_changelist")
+        )
+
+        new_election_session = ElectionSession.objects.get(
+            election_session_name="ElectionSession2022"
+        )
+        self.assertEqual(
+            Election.objects.filter(election_session=new_election_session).count(),
+            Election.objects.filter(election_session=election_session).count(),
+        )
+        self.assertEqual(
+            Eligibility.objects.filter(
+                election__election_session=new_election_session
+            ).count(),
+            Eligibility.objects.filter(
+                election__election_session=election_session
+            ).count(),
+        )
+
+
+class ElectionAdminTestCase(SetupMixin, TestCase):
+    """
+    Tests the "what if" recount view of an Election.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self._set_election_session_data()
+        self._login_admin()
+
+        self.election_session = self._create_election_session()
+        self.officer = self._create_officer(self.election_session)
+        self.candidates = self.add_candidates(self.officer)
+        self._generate_voters(count=2)
+        for voter, candidate in zip(Voter.objects.all(), self.candidates):
+            Ballot.objects.create(
+                voter=voter, election=self.officer, candidate=candidate, rank=0
+            )
+
+    def test_recount_link_appears_on_change_form(self):
+        response = self.client.get(
+            reverse(
+                "admin:backend_election_change",
+                kwargs={"object_id": self.officer.id},
+            )
+        )
+        self.assertContains(
+            response,
+            reverse(
+                "admin:backend_election_recount",
+                kwargs={"object_id": self.officer.id},
+            ),
+        )
+
+    def test_recount_view_shows_results_without_excluded_candidates(self):
+        recount_view = reverse(
+            "admin:backend_election_recount", kwargs={"object_id": self.officer.id}
+        )
+
+        response = self.client.get(recount_view)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.context["results"])
+
+        response = self.client.get(
+            recount_view,
+            {"recount": 1, "excluded_candidates": [self.candidates[0].id]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = json.loads(response.context["results"])
+        self.assertEqual(results["winners"], ["test candidate 1"])
+        self.assertEqual(results["totalVotes"], 1)
+
 
 class CandidateAdminTestCase(SetupMixin, TestCase):
     """
@@ -620,3 +735,59 @@ class BallotAdminTestCase(SetupMixin, TestCase):
             # Can't delete or save in production mode
             self.assertContains(response, "Save")
             self.assertContains(response, "Delete")
+
+    def test_export_streams_ballots_as_csv(self):
+        # A spoiled ballot in a second ElectionSession, which the filter should exclude
+        self._set_election_session_data(
+            name="OtherElectionSession",
+            start_time_offset_days=10,
+            end_time_offset_days=15,
+        )
+        other_session = self._create_election_session(self.data)
+        other_election = self._create_officer(other_session)
+        Ballot.objects.create(voter=Voter.objects.first(), election=other_election)
+
+        export_view = reverse("admin:backend_ballot_export")
+        response = self.client.get(export_view)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(
+            rows[0],
+            [
+                "student_number_hash",
+                "candidate_name",
+                "rank",
+                "election_name",
+                "election_session_name",
+            ],
+        )
+        self.assertEqual(len(rows), Ballot.objects.count() + 1)
+        self.assertIn(
+            [
+                Voter.objects.first().student_number_hash,
+                "",
+                "",
+                other_election.election_name,
+                "OtherElectionSession",
+            ],
+            rows,
+        )
+
+        response = self.client.get(
+            export_view,
+            {
+                "election__election_session__election_session_name": "OtherElectionSession"
+            },
+        )
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(len(rows), 2)
+
+    def test_export_link_appears_in_production_mode(self):
+        response = self.client.get(self.changelist_view)
+        self.assertContains(response, reverse("admin:backend_ballot_export"))
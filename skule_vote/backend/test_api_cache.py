@@ -0,0 +1,255 @@
+from datetime import timedelta
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models.deletion import Collector
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from backend import api_cache
+from backend.api_cache import API_CACHE_VERSION_KEY, NOTIFY_CHANNEL
+from backend.models import Candidate, Eligibility, Message
+from skule_vote.tests import SetupMixin
+
+
+class ApiCacheTestCase(SetupMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.messages_view = reverse("api:backend:messages")
+        self.election_session_view = reverse("api:backend:election-session-list")
+        self.election_list_view = reverse("api:backend:election-list")
+
+        self.election_session = self._create_election_session(
+            self._set_election_session_data()
+        )
+        Message.objects.create(
+            message="Voting is open", election_session=self.election_session
+        )
+
+    def test_payloads_are_cached(self):
+        self.client.get(self.messages_view)
+        self.client.get(self.election_session_view)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(self.messages_view).json(),
+                [{"message": "Voting is open"}],
+            )
+            self.assertEqual(
+                self.client.get(self.election_session_view).json()[0][
+                    "election_session_name"
+                ],
+                self.election_session.election_session_name,
+            )
+
+    def test_changes_invalidate_payloads(self):
+        self.client.post(
+            reverse("api:backend:bypass-cookie"), self._urlencode_cookie_request()
+        )
+        officer = self._create_officer(self.election_session)
+        self.assertEqual(len(self.client.get(self.election_list_view).json()), 1)
+        self.assertEqual(len(self.client.get(self.messages_view).json()), 1)
+
+        Candidate.objects.create(name="Alex", election=officer, statement="")
+        message = Message.objects.create(
+            message="Voting closes soon", election_session=self.election_session
+        )
+
+        candidates = self.client.get(self.election_list_view).json()[0]["candidates"]
+        self.assertEqual(
+            [c["name"] for c in candidates], ["Reopen Nominations", "Alex"]
+        )
+        self.assertEqual(len(self.client.get(self.messages_view).json()), 2)
+
+        message.delete()
+        self.assertEqual(len(self.client.get(self.messages_view).json()), 1)
+
+    def test_elections_of_a_large_election_session_are_cached(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared_cache = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "backend.shared_cache.SharedMemoryCache",
+                    "LOCATION": os.path.join(directory.name, "cache"),
+                }
+            }
+        )
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+
+        self.client.post(
+            reverse("api:backend:bypass-cookie"), self._urlencode_cookie_request()
+        )
+        for _ in range(20):
+            election = self._create_officer(self.election_session)
+            for candidate in range(5):
+                Candidate.objects.create(
+                    name=f"Candidate {candidate}",
+                    election=election,
+                    statement="I will make Skule better for everyone. " * 50,
+                )
+
+        elections = self.client.get(self.election_list_view).json()
+        self.assertEqual(len(elections), 20)
+        # Only the voter and the Elections they can vote in are read again
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.election_list_view).json(), elections)
+
+    def test_payloads_expire_when_the_election_session_ends(self):
+        self.assertEqual(len(self.client.get(self.messages_view).json()), 1)
+
+        # Shortly after the ElectionSession ends, without any change being saved
+        after_end = self.election_session.end_time + timedelta(minutes=1)
+        with patch("backend.views._now", return_value=after_end), patch(
+            "django.utils.timezone.now", return_value=after_end
+        ), patch("time.time", return_value=after_end.timestamp()):
+            self.assertEqual(self.client.get(self.messages_view).json(), [])
+            self.assertEqual(self.client.get(self.election_session_view).json(), [])
+
+    def test_deleting_eligibilities_and_messages_stays_fast(self):
+        officer = self._create_officer(self.election_session)
+        collector = Collector(using="default")
+        self.assertTrue(
+            collector.can_fast_delete(Eligibility.objects.filter(election=officer))
+        )
+        self.assertTrue(collector.can_fast_delete(self.election_session.messages.all()))
+
+        Message.objects.filter(election_session=self.election_session).delete()
+        self.assertEqual(self.client.get(self.messages_view).json(), [])
+
+    @patch("threading.Thread")
+    def test_listener_is_started_once_per_process_on_postgres(self, thread):
+        self.addCleanup(setattr, api_cache, "_listener_pid", None)
+
+        self.client.get(self.messages_view)
+        thread.assert_not_called()
+
+        with patch("backend.api_cache.connection") as connection:
+            connection.vendor = "postgresql"
+            with override_settings(API_CACHE_LISTEN=False):
+                api_cache.start_listener()
+            thread.assert_not_called()
+
+            api_cache.start_listener()
+            api_cache.start_listener()
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+    def test_listener_invalidates_on_notifications(self):
+        self.client.get(self.messages_view)
+        version = self._cache_version()
+
+        pg_connection = MagicMock(notifies=[])
+        pg_connection.poll.side_effect = lambda: pg_connection.notifies.append(
+            "backend.Message"
+        )
+        with patch("backend.api_cache.connection") as connection, patch(
+            "select.select",
+            side_effect=[([pg_connection], [], []), OSError("connection lost")],
+        ):
+            connection.connection = pg_connection
+            with self.assertRaises(OSError):
+                api_cache._listen_once()
+
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with(f"LISTEN {NOTIFY_CHANNEL}")
+        # Once on connecting, since changes may have been missed, then once for the
+        # notification
+        self.assertEqual(self._cache_version(), version + 2)
+        self.assertEqual(pg_connection.notifies, [])
+
+    @staticmethod
+    def _cache_version():
+        return cache.get(API_CACHE_VERSION_KEY)
+
+
+@override_settings(API_CACHE_LISTEN=False)
+class ApiCacheCommitTestCase(SetupMixin, APITransactionTestCase):
+    """Changes are committed for real here, unlike in a TestCase."""
+
+    def setUp(self):
+        super().setUp()
+        self.messages_view = reverse("api:backend:messages")
+        self.election_session = self._create_election_session(
+            self._set_election_session_data()
+        )
+        self.client.get(self.messages_view)
+
+    def test_a_transaction_is_published_once_on_commit(self):
+        officer = self._create_officer(self.election_session)
+        version = ApiCacheTestCase._cache_version()
+
+        with patch("backend.api_cache.connection") as connection:
+            connection.vendor = "postgresql"
+            with transaction.atomic():
+                for i in range(10):
+                    Candidate.objects.create(
+                        name=f"Candidate {i}", election=officer, statement=""
+                    )
+                    Message.objects.create(
+                        message=f"Message {i}", election_session=self.election_session
+                    )
+                self.assertEqual(ApiCacheTestCase._cache_version(), version + 1)
+                self.assertEqual(len(self.client.get(self.messages_view).json()), 10)
+
+                Message.objects.create(
+                    message="Message 10", election_session=self.election_session
+                )
+                # Again, as the payload read in the transaction was cached
+                self.assertEqual(ApiCacheTestCase._cache_version(), version + 2)
+                self.assertEqual(len(self.client.get(self.messages_view).json()), 11)
+
+        self.assertEqual(ApiCacheTestCase._cache_version(), version + 3)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with(
+            "SELECT pg_notify(%s, %s)",
+            [NOTIFY_CHANNEL, "backend.Candidate,backend.Message"],
+        )
+
+    def test_a_rolled_back_transaction_is_not_published(self):
+        version = ApiCacheTestCase._cache_version()
+
+        with patch("backend.api_cache.connection") as connection:
+            connection.vendor = "postgresql"
+            with transaction.atomic():
+                with self.assertRaises(DatabaseError), transaction.atomic():
+                    Message.objects.create(
+                        message="Voting closes soon",
+                        election_session=self.election_session,
+                    )
+                    raise DatabaseError
+            self.assertEqual(ApiCacheTestCase._cache_version(), version + 1)
+
+            # A new callback, as the first was dropped with the savepoint
+            with transaction.atomic():
+                Message.objects.create(
+                    message="Voting closes soon", election_session=self.election_session
+                )
+
+        self.assertEqual(ApiCacheTestCase._cache_version(), version + 3)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with(
+            "SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, "backend.Message"]
+        )
+
+    def test_changes_outside_a_transaction_are_published_immediately(self):
+        version = ApiCacheTestCase._cache_version()
+
+        with patch("backend.api_cache.connection") as connection:
+            connection.vendor = "postgresql"
+            message = Message.objects.create(
+                message="Voting closes soon", election_session=self.election_session
+            )
+            message.delete()
+
+        self.assertEqual(ApiCacheTestCase._cache_version(), version + 2)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        self.assertEqual(cursor.execute.call_count, 2)
+        cursor.execute.assert_called_with(
+            "SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, "backend.Message"]
+        )
@@ -0,0 +1,109 @@
+from io import BytesIO, StringIO
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from backend.admin import generate_results
+from backend.archive import ArchiveError, BallotArchive, write_archive
+from backend.ballot_sets import PackedBallotSet, load_election_session_ballot_sets
+from backend.models import Ballot, Candidate, ElectionSession, Voter
+from skule_vote.tests import SetupMixin
+
+
+class BallotArchiveTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+
+        self.officer = self._create_officer(self.election_session, seats_available=2)
+        self.referendum = self._create_referendum(self.election_session)
+        candidates = self.add_candidates(self.officer, 3)
+        candidates[2].disqualified_status = True
+        candidates[2].save()
+        ron = Candidate.objects.get(election=self.officer, name="Reopen Nominations")
+
+        self._generate_voters(count=6)
+        rankings = [
+            [candidates[0], candidates[2]],
+            [candidates[2], candidates[1], ron],
+            [candidates[1]],
+            [candidates[0], candidates[1]],
+            [candidates[2]],
+            [],
+        ]
+        for voter, ranking in zip(Voter.objects.all(), rankings):
+            if not ranking:
+                Ballot.objects.create(voter=voter, election=self.officer)
+            for rank, candidate in enumerate(ranking):
+                Ballot.objects.create(
+                    voter=voter, election=self.officer, candidate=candidate, rank=rank
+                )
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive_path = os.path.join(directory.name, "ballots.skva")
+
+    def test_archive_round_trip(self):
+        call_command(
+            "archive_ballots",
+            self.election_session.id,
+            self.archive_path,
+            stdout=StringIO(),
+        )
+
+        ballot_sets = load_election_session_ballot_sets(self.election_session)
+        with BallotArchive(self.archive_path) as archive:
+            self.assertEqual(
+                archive.election_session_name,
+                self.election_session.election_session_name,
+            )
+            archived_sets = archive.ballot_sets()
+
+        self.assertEqual(list(archived_sets), list(ballot_sets))
+        for election_id, ballot_set in ballot_sets.items():
+            self.assertEqual(
+                archived_sets[election_id].candidates, ballot_set.candidates
+            )
+            self.assertEqual(archived_sets[election_id].rankings, ballot_set.rankings)
+
+    def test_recount_matches_generate_results(self):
+        call_command(
+            "archive_ballots",
+            self.election_session.id,
+            self.archive_path,
+            stdout=StringIO(),
+        )
+
+        out = StringIO()
+        with self.assertNumQueries(0):
+            call_command("recount_archive", self.archive_path, stdout=out)
+
+        self.assertEqual(
+            json.loads(out.getvalue()),
+            generate_results(
+                ElectionSession.objects.filter(id=self.election_session.id)
+            ),
+        )
+
+    def test_rankings_too_long_are_refused(self):
+        ballot_set = PackedBallotSet(
+            1, "President", 1, [{"id": 1, "name": "A", "disqualified_status": False}]
+        )
+        ballot_set.add([0] * 256)
+
+        with self.assertRaises(ArchiveError):
+            write_archive(BytesIO(), "Fall 2021", {1: ballot_set})
+
+    def test_invalid_archive(self):
+        with open(self.archive_path, "wb") as f:
+            f.write(b"not an archive")
+
+        with self.assertRaises(ArchiveError):
+            BallotArchive(self.archive_path)
+        with self.assertRaises(CommandError):
+            call_command("recount_archive", self.archive_path, stdout=StringIO())
@@ -2039,3 +2039,81 @@ class BallotTestCase(SetupMixin, TestCase):
         self.assertEqual(results["quota"], 2)
         self.assertEqual(results["spoiledBallots"], 0)
         self.assertEqual(results["totalVotes"], len(voters) - NUM_SPOILED)
+
+
+class CountDiagnosticsTestCase(TestCase):
+    CHOICES = [
+        {"name": "Reopen Nominations"},
+        {"name": "Alex Bogdan"},
+        {"name": "Lisa Li"},
+        {"name": "Armin Ale"},
+    ]
+
+    def _ballots(self, rankings):
+        return [
+            {"ranking": ranking} for ranking, count in rankings for _ in range(count)
+        ]
+
+    def test_diagnostics_are_optional(self):
+        ballots = self._ballots([([1, 3], 4), ([2, 1], 3), ([3, 2], 3), ([], 1)])
+
+        results = calculate_results(ballots, self.CHOICES, 2)
+        results_with_diagnostics = calculate_results(
+            ballots, self.CHOICES, 2, diagnostics=True
+        )
+
+        self.assertNotIn("diagnostics", results)
+        diagnostics = results_with_diagnostics.pop("diagnostics")
+        self.assertEqual(results_with_diagnostics, results)
+        self.assertEqual(len(diagnostics["rounds"]), len(results["rounds"]))
+        self.assertGreater(diagnostics["seconds"], 0)
+
+    def test_rounds_report_transfers(self):
+        ballots = self._ballots([([1], 4), ([2], 3), ([3, 2], 2)])
+
+        results = calculate_results(ballots, self.CHOICES, 1, diagnostics=True)
+        rounds = results["diagnostics"]["rounds"]
+
+        # Armin Ale is eliminated, and his ballots go to Lisa Li who wins
+        self.assertEqual(results["winners"], ["Lisa Li"])
+        self.assertEqual(len(rounds), 2)
+        for round_diagnostics in rounds:
+            self.assertEqual(round_diagnostics["ballotsVisited"], 9)
+            self.assertIsNone(round_diagnostics["tieBreak"])
+        self.assertEqual(
+            [(r["positionsAdvanced"], r["transfers"], r["exhausted"]) for r in rounds],
+            [(0, 0, 0), (2, 2, 0)],
+        )
+
+    def test_tie_breaks_are_reported(self):
+        ballots = self._ballots([([1, 3], 2), ([2], 2), ([3], 3)])
+
+        results = calculate_results(ballots, self.CHOICES, 1, diagnostics=True)
+        rounds = results["diagnostics"]["rounds"]
+
+        # Alex Bogdan and Lisa Li are tied all the way down, so both are eliminated
+        self.assertEqual(results["winners"], ["Armin Ale"])
+        self.assertEqual(
+            rounds[0]["tieBreak"],
+            {
+                "type": "elimination",
+                "tied": 2,
+                "roundsRescanned": 0,
+                "rankingPositionsRescanned": 3,
+                "ballotsVisited": 21,
+                "resolved": False,
+            },
+        )
+        self.assertEqual(
+            (rounds[1]["transfers"], rounds[1]["exhausted"]),
+            (2, 2),
+        )
+
+    def test_two_choices_have_a_single_round(self):
+        ballots = self._ballots([([1], 3), ([0], 1), ([], 1)])
+
+        results = calculate_results(ballots, self.CHOICES[:2], 1, diagnostics=True)
+
+        self.assertEqual(len(results["diagnostics"]["rounds"]), 1)
+        self.assertEqual(results["diagnostics"]["rounds"][0]["ballotsVisited"], 5)
+        self.assertEqual(results["diagnostics"]["rounds"][0]["transfers"], 0)
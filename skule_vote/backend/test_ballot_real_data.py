@@ -1,21 +1,25 @@
-from django.test import TestCase
 import json
+import os
+import tempfile
 
-from backend.ballot import calculate_results
+from django.test import TestCase
 
-from backend.models import (
-    Ballot,
-    Candidate,
-    Election,
-    Voter,
-)
-from backend.serializers import (
-    BallotResultsCalculationSerializer as BallotSerializer,
-    CandidateSerializer,
+from backend.admin import generate_results
+from backend.legacy_import import (
+    LegacyImportError,
+    import_dynamodb_election,
+    read_dynamodb_ballot_set,
 )
+from backend.models import Ballot, ElectionSession, Voter
 
 from skule_vote.tests import SetupMixin
 
+TEST_DATA = [
+    "./backend/test_data/2021_VPSL_pre.txt",
+    "./backend/test_data/2021_VPSL_post.txt",
+    "./backend/test_data/2022_Valedictorian.txt",
+]
+
 
 class BallotRealDataTestCase(SetupMixin, TestCase):
     def setUp(self):
@@ -24,111 +28,92 @@ class BallotRealDataTestCase(SetupMixin, TestCase):
 
         self.election_session = self._create_election_session()
 
-    def _create_candidates(self, election_choices, election):
-        names = [c["M"]["name"]["S"] for c in election_choices]
-        names.pop()  # Remove Ron from list
-
-        for name in names:
-            candidate = Candidate(
-                name=name, statement="Insert statement here.", election=election
-            )
-            candidate.save()
-        candidates = Candidate.objects.filter(election=election).exclude(
-            name="Reopen Nominations"
+    def _import_results(self, path):
+        """
+        Imports a dump from the previous voting system into the database, and returns
+        its results as calculated by the "Generate results" admin action.
+        """
+        election = import_dynamodb_election(path, self.election_session)
+        results = generate_results(
+            ElectionSession.objects.filter(id=self.election_session.id)
         )
-        candidates = list(candidates)
-        ron = Candidate.objects.get(election=election, name="Reopen Nominations")
-
-        # Make sure they appear in the same order as names
-        candidates_in_order = []
-        for name in names:
-            for c in candidates:
-                if c.name == name:
-                    candidates_in_order.append(c)
-                    continue
-        return candidates_in_order + [ron]
-
-    def _create_results(self, ballots, choices, election, error=False):
-        # Create and serialize the ballots
-        for ballot in ballots:
-            Ballot.objects.create(**ballot)
-        ballot_dict = BallotSerializer(Ballot.objects.all())
-
-        # Ballot dict gives us Candidate objects, we need indicies from the choices list.
-        ballots_formatted = ballot_dict.map_candidates_in_ballots_to_choices(
-            ballots=ballot_dict.data, choices=choices
+        return results[
+            f"{self.election_session.election_session_name} ElectionSession"
+        ][election.election_name]["results_without_dq"]
+
+    def _write_dump(self, choices, rankings):
+        """Writes a minimal dump with the given choice names and ballot rankings."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "dump.txt")
+
+        def ballot(voter, ranking):
+            return {
+                "M": {
+                    "vid": {"S": f"voter{voter}"},
+                    "ranking": {"L": [{"N": str(choice)} for choice in ranking]},
+                }
+            }
+
+        dump = {
+            "name": {"S": "President"},
+            "seats": {"N": "1"},
+            "Ballots": {"L": [ballot(i, r) for i, r in enumerate(rankings)]},
+            "choices": {"L": [{"M": {"name": {"S": name}}} for name in choices]},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dump, f)
+        return path
+
+    def test_candidates_are_matched_by_index(self):
+        path = self._write_dump(["Alex", "Sam", "Reopen Nominations"], [[1, 0], [2]])
+
+        election = import_dynamodb_election(path, self.election_session)
+
+        rankings = {}
+        for ballot in Ballot.objects.filter(election=election).order_by("rank"):
+            rankings.setdefault(ballot.voter.student_number_hash, []).append(
+                ballot.candidate.name
+            )
+        self.assertEqual(
+            rankings,
+            {"voter0": ["Sam", "Alex"], "voter1": ["Reopen Nominations"]},
         )
 
-        # The choice array is a queryset, we need a dictionary
-        choices_dict = CandidateSerializer(choices, many=True).data
-        for i in range(len(choices_dict)):
-            choices_dict[i] = dict(choices_dict[i])
+    def test_duplicate_choice_names_are_rejected(self):
+        path = self._write_dump(["Alex", "Alex", "Reopen Nominations"], [[1]])
 
-        if error:
-            # Change the ranking to be invalid
-            ballots_formatted[0]["ranking"][0] = len(choices) + 1
+        with self.assertRaisesRegex(LegacyImportError, "named Alex"):
+            import_dynamodb_election(path, self.election_session)
+        self.assertFalse(Ballot.objects.exists())
 
-        # Return calculated results
-        return calculate_results(
-            ballots=ballots_formatted,
-            choices=choices_dict,
-            numSeats=election.seats_available,
-        )
+    def test_out_of_range_choices_are_rejected(self):
+        for ranking in [[3], [-1]]:
+            path = self._write_dump(["Alex", "Sam", "Reopen Nominations"], [ranking])
 
-    def _create_ballots(self, raw_ballots, election, choices_in_order, num_voters=0):
-        num_spoiled = 0
-        clean_ballots = []
-        for b in raw_ballots:
-            ranking = []
-            for rank in b["M"]["ranking"]["L"]:
-                ranking.append(choices_in_order[int(rank["N"])])
-
-            if len(ranking) == 0:
-                num_spoiled += 1
-            else:
-                clean_ballots.append(ranking)
-
-        self._generate_voters(count=len(raw_ballots))
-        voters = Voter.objects.all()
-        ballots = []
-
-        for i, ballot in enumerate(clean_ballots):
-            for rank, choice in enumerate(ballot):
-                ballots.append(
-                    {
-                        "voter": voters[i],
-                        "candidate": choice,
-                        "rank": rank,
-                        "election": election,
-                    }
-                )
-
-        for j in range(num_spoiled):
-            ballots.append(
-                {
-                    "voter": voters[i + 1 + j],
-                    "candidate": None,
-                    "rank": None,
-                    "election": election,
-                }
-            )
+            with self.assertRaisesRegex(LegacyImportError, "invalid ranking"):
+                import_dynamodb_election(path, self.election_session)
+            with open(path, "r") as f, self.assertRaisesRegex(
+                LegacyImportError, "invalid ranking"
+            ):
+                read_dynamodb_ballot_set(f)
+        self.assertFalse(Ballot.objects.exists())
 
-        return ballots, voters
+    def test_counting_in_memory_matches_database(self):
+        for path in TEST_DATA:
+            with open(path, "r") as f:
+                ballot_set = read_dynamodb_ballot_set(f)
 
-    def test_valedictorian_2022(self):
-        # Real data and results from the 2022 Valedictorian election
-        self._create_officer(self.election_session, 1)
-        officer = Election.objects.filter(category="officer")[0]
+            # Tiny chunks make values straddle buffer boundaries
+            with open(path, "r") as f:
+                chunked_ballot_set = read_dynamodb_ballot_set(f, chunk_size=7)
+            self.assertEqual(chunked_ballot_set.rankings, ballot_set.rankings)
 
-        with open("./backend/test_data/2022_Valedictorian.txt", "r") as f:
-            lines = f.read()
-            election = json.loads(lines)
+            self.assertEqual(ballot_set.calculate(), self._import_results(path))
 
-        choices = self._create_candidates(election["choices"]["L"], officer)
-        ballots, voters = self._create_ballots(
-            election["Ballots"]["L"], officer, choices
-        )
-        results = self._create_results(ballots, choices, officer)
+    def test_valedictorian_2022(self):
+        # Real data and results from the 2022 Valedictorian election
+        results = self._import_results("./backend/test_data/2022_Valedictorian.txt")
 
         self.assertEqual(results["winners"], ["Joshua Pius"])
 
@@ -191,22 +176,11 @@ class BallotRealDataTestCase(SetupMixin, TestCase):
         self.assertEqual(results["quota"], 106)
         self.assertEqual(results["spoiledBallots"], 1)
         self.assertEqual(results["totalVotes"], 210)
-        self.assertEqual(len(voters), 210 + 1)
+        self.assertEqual(Voter.objects.count(), 210 + 1)
 
     def test_vpsl_post_2021(self):
         # Real data and results from the 2021 VPSL election, post-disqualification of Andrew Chen
-        self._create_officer(self.election_session, 1)
-        officer = Election.objects.filter(category="officer")[0]
-
-        with open("./backend/test_data/2021_VPSL_post.txt", "r") as f:
-            lines = f.read()
-            election = json.loads(lines)
-
-        choices = self._create_candidates(election["choices"]["L"], officer)
-        ballots, voters = self._create_ballots(
-            election["Ballots"]["L"], officer, choices
-        )
-        results = self._create_results(ballots, choices, officer)
+        results = self._import_results("./backend/test_data/2021_VPSL_post.txt")
 
         self.assertEqual(results["winners"], ["Karman Lochab"])
 
@@ -230,22 +204,11 @@ class BallotRealDataTestCase(SetupMixin, TestCase):
         self.assertEqual(results["quota"], 184)
         self.assertEqual(results["spoiledBallots"], 75)
         self.assertEqual(results["totalVotes"], 366)
-        self.assertEqual(len(voters), 366 + 75)
+        self.assertEqual(Voter.objects.count(), 366 + 75)
 
     def test_vpsl_pre_2021(self):
         # Real data and results from the 2021 VPSL election, pre-disqualification of Andrew Chen
-        self._create_officer(self.election_session, 1)
-        officer = Election.objects.filter(category="officer")[0]
-
-        with open("./backend/test_data/2021_VPSL_pre.txt", "r") as f:
-            lines = f.read()
-            election = json.loads(lines)
-
-        choices = self._create_candidates(election["choices"]["L"], officer)
-        ballots, voters = self._create_ballots(
-            election["Ballots"]["L"], officer, choices
-        )
-        results = self._create_results(ballots, choices, officer)
+        results = self._import_results("./backend/test_data/2021_VPSL_pre.txt")
 
         self.assertEqual(results["winners"], ["Terry Luan"])
 
@@ -269,4 +232,4 @@ class BallotRealDataTestCase(SetupMixin, TestCase):
         self.assertEqual(results["quota"], 217)
         self.assertEqual(results["spoiledBallots"], 9)
         self.assertEqual(results["totalVotes"], 432)
-        self.assertEqual(len(voters), 432 + 9)
+        self.assertEqual(Voter.objects.count(), 432 + 9)
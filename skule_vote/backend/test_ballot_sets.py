@@ -0,0 +1,116 @@
+from django.test import TestCase
+
+from backend.ballot_sets import PackedBallotSet, load_election_session_ballot_sets
+from backend.models import Ballot, Candidate, Election, Voter
+from skule_vote.tests import SetupMixin
+
+
+class PackedBallotSetTestCase(TestCase):
+    def setUp(self):
+        self.ballot_set = PackedBallotSet(
+            1,
+            "President",
+            1,
+            [
+                {"id": 10, "name": "Reopen Nominations", "disqualified_status": False},
+                {"id": 11, "name": "Alex Bogdan", "disqualified_status": True},
+                {"id": 12, "name": "Lisa Li", "disqualified_status": False},
+            ],
+        )
+
+    def test_identical_rankings_are_grouped(self):
+        self.ballot_set.add([1, 2])
+        self.ballot_set.add((1, 2))
+        self.ballot_set.add([])
+
+        self.assertEqual(len(self.ballot_set), 3)
+        self.assertEqual(len(self.ballot_set.rankings), 2)
+        self.assertEqual(self.ballot_set.rankings[(1, 2)], 2)
+
+    def test_without_disqualified_reindexes_rankings(self):
+        self.ballot_set.add([1, 2, 0])
+        self.ballot_set.add([2])
+        self.ballot_set.add([1], 3)
+        self.ballot_set.add([], 2)
+
+        ballot_set = self.ballot_set.without_disqualified()
+
+        self.assertEqual(
+            [c["name"] for c in ballot_set.choices()], ["Reopen Nominations", "Lisa Li"]
+        )
+        # Ballots ranking only the disqualified Candidate are dropped, spoiled ones stay
+        self.assertEqual(dict(ballot_set.rankings), {(1, 0): 1, (1,): 1, (): 2})
+
+    def test_ballots_are_expanded_for_calculate_results(self):
+        self.ballot_set.add([2, 0], 2)
+        self.ballot_set.add([])
+
+        self.assertEqual(
+            self.ballot_set.ballots(),
+            [{"ranking": [2, 0]}, {"ranking": [2, 0]}, {"ranking": []}],
+        )
+        results = self.ballot_set.calculate()
+        self.assertEqual(results["winners"], ["Lisa Li"])
+        self.assertEqual(results["spoiledBallots"], 1)
+        self.assertEqual(results["totalVotes"], 2)
+
+
+class LoadElectionSessionBallotSetsTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+
+    def test_ballots_are_split_per_election(self):
+        president = self._create_officer(self.election_session)
+        referendum = self._create_referendum(self.election_session)
+        president_candidates = self.add_candidates(president, 2)
+        referendum_candidates = self.add_candidates(referendum, 1)
+        president_ron = Candidate.objects.get(
+            election=president, name="Reopen Nominations"
+        )
+
+        self._generate_voters(count=3)
+        voter1, voter2, voter3 = Voter.objects.all()
+
+        # Insert out of rank order to make sure rankings are sorted by rank
+        Ballot.objects.create(
+            voter=voter1, election=president, candidate=president_ron, rank=1
+        )
+        Ballot.objects.create(
+            voter=voter1, election=president, candidate=president_candidates[1], rank=0
+        )
+        Ballot.objects.create(
+            voter=voter2, election=president, candidate=president_candidates[1], rank=0
+        )
+        Ballot.objects.create(
+            voter=voter2, election=president, candidate=president_ron, rank=1
+        )
+        Ballot.objects.create(voter=voter3, election=president)
+        Ballot.objects.create(
+            voter=voter1,
+            election=referendum,
+            candidate=referendum_candidates[0],
+            rank=0,
+        )
+        empty_election = Election.objects.create(
+            election_name="Empty",
+            election_session=self.election_session,
+            seats_available=1,
+            category="other",
+        )
+
+        with self.assertNumQueries(3):
+            ballot_sets = load_election_session_ballot_sets(self.election_session)
+
+        self.assertEqual(
+            list(ballot_sets), [president.id, referendum.id, empty_election.id]
+        )
+        self.assertEqual(
+            [c["name"] for c in ballot_sets[president.id].candidates],
+            ["Reopen Nominations", "test candidate 0", "test candidate 1"],
+        )
+        self.assertEqual(dict(ballot_sets[president.id].rankings), {(2, 0): 2, (): 1})
+        self.assertEqual(dict(ballot_sets[referendum.id].rankings), {(1,): 1})
+        self.assertEqual(len(ballot_sets[empty_election.id]), 0)
+        self.assertEqual(ballot_sets[president.id].seats_available, 1)
@@ -0,0 +1,107 @@
+from io import StringIO
+import json
+import os
+import tempfile
+import tracemalloc
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from backend.benchmark import benchmark_count, synthetic_ballot_set
+from backend.models import Ballot, ElectionSession, Voter
+
+
+class SyntheticBallotSetTestCase(TestCase):
+    def test_ballots_are_reproducible(self):
+        ballot_set = synthetic_ballot_set(200, 5, seed=1)
+
+        self.assertEqual(len(ballot_set), 200)
+        self.assertEqual(len(ballot_set.candidates), 5)
+        self.assertEqual(ballot_set.candidates[0]["name"], "Reopen Nominations")
+        self.assertEqual(
+            ballot_set.rankings, synthetic_ballot_set(200, 5, seed=1).rankings
+        )
+        self.assertNotEqual(
+            ballot_set.rankings, synthetic_ballot_set(200, 5, seed=2).rankings
+        )
+
+    def test_count_case_reports_each_stage(self):
+        case = benchmark_count("synthetic", synthetic_ballot_set(100, 3))
+
+        self.assertEqual(case["kind"], "count")
+        self.assertEqual(case["ballots"], 100)
+        self.assertEqual(list(case["stages"]), ["expand", "count"])
+        self.assertGreater(case["peakMemory"], 0)
+        self.assertGreater(case["ballotsPerSecond"], 0)
+
+    def test_callers_trace_is_left_running(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        case = benchmark_count("synthetic", synthetic_ballot_set(100, 3))
+
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertGreater(case["peakMemory"], 0)
+
+
+class BenchmarkCountingCommandTestCase(TestCase):
+    def _run(self, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            call_command(
+                "benchmark_counting",
+                "--ballots",
+                "20",
+                "50",
+                "--candidates",
+                "2",
+                "4",
+                "--output",
+                path,
+                *args,
+                stderr=StringIO(),
+            )
+            with open(path) as f:
+                return json.load(f)
+
+    def test_report_covers_dumps_and_synthetic_elections(self):
+        report = self._run()
+
+        self.assertEqual(report["database"], "sqlite")
+        cases = {
+            (case["kind"], case["name"], case["ballots"], case["candidates"])
+            for case in report["cases"]
+        }
+        for kind in ["count", "pipeline"]:
+            self.assertIn((kind, "2022_Valedictorian.txt", 211, 8), cases)
+            for ballots in [20, 50]:
+                for candidates in [2, 4]:
+                    self.assertIn((kind, "synthetic", ballots, candidates), cases)
+
+        pipeline = next(case for case in report["cases"] if case["kind"] == "pipeline")
+        self.assertEqual(list(pipeline["stages"]), ["insert", "results"])
+        self.assertIsNone(pipeline["stages"]["insert"]["peakMemory"])
+
+    def test_pipeline_is_rolled_back(self):
+        self._run()
+
+        self.assertFalse(ElectionSession.objects.exists())
+        self.assertFalse(Voter.objects.exists())
+        self.assertFalse(Ballot.objects.exists())
+
+    def test_pipeline_can_be_skipped(self):
+        report = self._run("--no-pipeline")
+
+        self.assertEqual({case["kind"] for case in report["cases"]}, {"count"})
+
+    def test_pipeline_max_ballots(self):
+        report = self._run("--pipeline-max-ballots", "20")
+
+        self.assertEqual(
+            {
+                case["ballots"]
+                for case in report["cases"]
+                if case["kind"] == "pipeline" and case["name"] == "synthetic"
+            },
+            {20},
+        )
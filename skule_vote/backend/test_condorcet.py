@@ -0,0 +1,164 @@
+from io import StringIO
+import json
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from backend.admin import generate_results
+from backend.ballot_sets import PackedBallotSet, load_election_session_signature_sets
+from backend.condorcet import (
+    calculate_condorcet_results,
+    condorcet_winner,
+    pairwise_matrix,
+    schulze_winners,
+)
+from backend.models import Ballot, BallotSignature, ElectionSession, Voter
+from skule_vote.tests import SetupMixin
+
+
+def _ballot_set():
+    ballot_set = PackedBallotSet(
+        1,
+        "President",
+        1,
+        [
+            {"id": 10, "name": "Reopen Nominations", "disqualified_status": False},
+            {"id": 11, "name": "Alex Bogdan", "disqualified_status": False},
+            {"id": 12, "name": "Lisa Li", "disqualified_status": False},
+            {"id": 13, "name": "Armin Ale", "disqualified_status": False},
+        ],
+    )
+    # Lisa Li is squeezed out of the instant runoff but beats both others head to head
+    ballot_set.add([1, 2], 4)
+    ballot_set.add([3, 2], 5)
+    ballot_set.add([2, 1], 3)
+    return ballot_set
+
+
+class PairwiseMatrixTestCase(TestCase):
+    def test_ranked_candidates_beat_those_below_and_unranked(self):
+        d = pairwise_matrix(_ballot_set())
+
+        self.assertEqual(
+            d,
+            [
+                [0, 0, 0, 0],
+                [7, 0, 4, 7],
+                [12, 8, 0, 7],
+                [5, 5, 5, 0],
+            ],
+        )
+
+    def test_spoiled_ballots_express_no_preferences(self):
+        ballot_set = _ballot_set()
+        ballot_set.add([], 10)
+
+        self.assertEqual(pairwise_matrix(ballot_set), pairwise_matrix(_ballot_set()))
+
+    def test_condorcet_winner_can_differ_from_instant_runoff_winner(self):
+        ballot_set = _ballot_set()
+        results = calculate_condorcet_results(ballot_set)
+
+        self.assertEqual(ballot_set.calculate()["winners"], ["Alex Bogdan"])
+        self.assertEqual(results["condorcetWinner"], "Lisa Li")
+        self.assertEqual(results["schulzeWinners"], ["Lisa Li"])
+
+    def test_cycle_has_no_condorcet_winner(self):
+        # a > b 7-2, b > c 6-3, c > a 5-4
+        d = [
+            [0, 7, 4],
+            [2, 0, 6],
+            [5, 3, 0],
+        ]
+
+        self.assertIsNone(condorcet_winner(d))
+        # a's weakest link to c (6 via b) is stronger than c's direct win (5)
+        self.assertEqual(schulze_winners(d), [0])
+
+    def test_ties_have_several_schulze_winners(self):
+        d = [
+            [0, 3],
+            [3, 0],
+        ]
+
+        self.assertIsNone(condorcet_winner(d))
+        self.assertEqual(schulze_winners(d), [0, 1])
+
+
+class CondorcetElectionResultsTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+        self.officer = self._create_officer(self.election_session)
+        self.candidates = self.add_candidates(self.officer, 2)
+        self.candidates[1].disqualified_status = True
+        self.candidates[1].save()
+
+        self._generate_voters(count=3)
+        for voter, candidate in zip(Voter.objects.all(), [0, 1, 1]):
+            Ballot.objects.create(
+                voter=voter,
+                election=self.officer,
+                candidate=self.candidates[candidate],
+                rank=0,
+            )
+
+    def test_condorcet_results_are_opt_in(self):
+        queryset = ElectionSession.objects.filter(id=self.election_session.id)
+        key = f"{self.election_session.election_session_name} ElectionSession"
+
+        results = generate_results(queryset)[key][self.officer.election_name]
+        self.assertNotIn("condorcet_with_dq", results)
+
+        results = generate_results(queryset, include_condorcet=True)[key][
+            self.officer.election_name
+        ]
+        self.assertEqual(
+            results["condorcet_without_dq"]["condorcetWinner"], self.candidates[1].name
+        )
+        self.assertEqual(
+            results["condorcet_with_dq"]["condorcetWinner"], self.candidates[0].name
+        )
+        self.assertNotIn(
+            self.candidates[1].name, results["condorcet_with_dq"]["choices"]
+        )
+
+    def test_generate_results_command(self):
+        queryset = ElectionSession.objects.filter(id=self.election_session.id)
+        for candidate, count in [(0, 1), (1, 2)]:
+            BallotSignature.objects.create(
+                election=self.officer,
+                signature=str(self.candidates[candidate].id),
+                count=count,
+            )
+
+        for options, from_signatures in [
+            ({}, False),
+            ({"from_signatures": True, "condorcet": True}, True),
+        ]:
+            out = StringIO()
+            call_command(
+                "generate_results", self.election_session.id, stdout=out, **options
+            )
+            self.assertEqual(
+                json.loads(out.getvalue()),
+                generate_results(
+                    queryset,
+                    load_ballot_sets=(
+                        load_election_session_signature_sets
+                        if from_signatures
+                        else None
+                    ),
+                    include_condorcet=options.get("condorcet", False),
+                ),
+            )
+
+        self.candidates[0].delete()
+        with self.assertRaisesMessage(CommandError, "no longer exists"):
+            call_command(
+                "generate_results",
+                self.election_session.id,
+                from_signatures=True,
+                stdout=StringIO(),
+            )
@@ -0,0 +1,113 @@
+from django.test import TestCase
+
+from backend.admin import generate_results
+from backend.ballot import calculate_results
+from backend.ballot_sets import PackedBallotSet, load_election_ballot_set
+from backend.counting import (
+    DEFAULT_COUNTING_METHOD,
+    _counting_methods,
+    counting_method_choices,
+    get_counting_method,
+    register_counting_method,
+)
+from backend.models import Ballot, ElectionSession, Voter
+from skule_vote.tests import SetupMixin
+
+
+class CountingMethodRegistryTestCase(TestCase):
+    def tearDown(self):
+        _counting_methods.pop("test_method", None)
+
+    def test_default_method_is_calculate_results(self):
+        ballot_set = PackedBallotSet(
+            1,
+            "President",
+            1,
+            [
+                {"id": 10, "name": "Reopen Nominations", "disqualified_status": False},
+                {"id": 11, "name": "Alex Bogdan", "disqualified_status": False},
+                {"id": 12, "name": "Lisa Li", "disqualified_status": False},
+            ],
+        )
+        ballot_set.add([1, 2], 3)
+        ballot_set.add([2, 0], 2)
+        ballot_set.add([], 1)
+
+        self.assertEqual(ballot_set.counting_method, DEFAULT_COUNTING_METHOD)
+        self.assertEqual(
+            ballot_set.calculate(),
+            calculate_results(ballot_set.ballots(), ballot_set.choices(), 1),
+        )
+
+    def test_registered_methods_are_choices(self):
+        register_counting_method("test_method", "Test method")(lambda ballot_set: {})
+
+        self.assertIn(("test_method", "Test method"), counting_method_choices())
+        self.assertIn(
+            (DEFAULT_COUNTING_METHOD, "Instant runoff"), counting_method_choices()
+        )
+
+    def test_names_are_unique(self):
+        with self.assertRaises(ValueError):
+            register_counting_method(DEFAULT_COUNTING_METHOD, "Duplicate")(
+                lambda ballot_set: {}
+            )
+
+    def test_unknown_method_raises_error(self):
+        with self.assertRaises(ValueError):
+            get_counting_method("not_a_method")
+
+
+class ElectionCountingMethodTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+        self.officer = self._create_officer(self.election_session)
+        self.candidates = self.add_candidates(self.officer, 2)
+
+        self._generate_voters(count=3)
+        for voter, candidate in zip(Voter.objects.all(), [0, 1, 1]):
+            Ballot.objects.create(
+                voter=voter,
+                election=self.officer,
+                candidate=self.candidates[candidate],
+                rank=0,
+            )
+
+        @register_counting_method("test_method", "Test method")
+        def count_ballots(ballot_set):
+            return {"winners": [], "totalVotes": len(ballot_set)}
+
+    def tearDown(self):
+        _counting_methods.pop("test_method", None)
+
+    def test_ballot_sets_use_the_election_method(self):
+        self.assertEqual(
+            load_election_ballot_set(self.officer).counting_method,
+            DEFAULT_COUNTING_METHOD,
+        )
+
+        self.officer.counting_method = "test_method"
+        self.officer.save()
+        ballot_set = load_election_ballot_set(self.officer)
+
+        self.assertEqual(ballot_set.counting_method, "test_method")
+        self.assertEqual(
+            ballot_set.without_disqualified().counting_method, "test_method"
+        )
+
+    def test_generate_results_uses_the_election_method(self):
+        queryset = ElectionSession.objects.filter(id=self.election_session.id)
+        key = f"{self.election_session.election_session_name} ElectionSession"
+
+        results = generate_results(queryset)[key][self.officer.election_name]
+        self.assertEqual(results["results_without_dq"]["winners"], ["test candidate 1"])
+
+        # Changing the method invalidates the stored results
+        self.officer.counting_method = "test_method"
+        self.officer.save()
+        results = generate_results(queryset)[key][self.officer.election_name]
+        self.assertEqual(
+            results["results_without_dq"], {"winners": [], "totalVotes": 3}
+        )
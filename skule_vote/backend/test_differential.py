@@ -0,0 +1,147 @@
+from io import StringIO
+import json
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from backend.ballot import calculate_results
+from backend.counting import _counting_methods, register_counting_method
+from backend.differential import (
+    compare,
+    differential_test,
+    fixture_ballot_sets,
+    random_ballot_sets,
+    shrink,
+)
+
+
+def _legacy(ballot_set):
+    return calculate_results(
+        ballot_set.ballots(), ballot_set.choices(), ballot_set.seats_available
+    )
+
+
+def _no_spoiled_ballots(ballot_set):
+    """Forgets to count spoiled ballots."""
+    results = _legacy(ballot_set)
+    results["spoiledBallots"] = 0
+    return results
+
+
+def _plurality(ballot_set):
+    """Counts first choices only, never eliminating anyone."""
+    results = _legacy(ballot_set)
+    results["rounds"] = results["rounds"][:1]
+    return results
+
+
+class DifferentialTestCase(TestCase):
+    def setUp(self):
+        register_counting_method("no_spoiled_ballots", "No spoiled ballots")(
+            _no_spoiled_ballots
+        )
+        register_counting_method("plurality", "Plurality")(_plurality)
+
+    def tearDown(self):
+        _counting_methods.pop("no_spoiled_ballots")
+        _counting_methods.pop("plurality")
+
+    def test_legacy_engine_agrees_with_itself(self):
+        self.assertEqual(differential_test("instant_runoff", num_cases=50), [])
+
+    def test_differences_are_reported(self):
+        _, ballot_set = next(fixture_ballot_sets())
+
+        self.assertEqual(compare(_legacy, _legacy, ballot_set), [])
+        self.assertEqual(
+            compare(_legacy, _no_spoiled_ballots, ballot_set),
+            ["results['spoiledBallots']: expected 75, got 0"],
+        )
+        self.assertEqual(
+            compare(_legacy, lambda ballot_set: 1 / 0, ballot_set),
+            ["ZeroDivisionError: division by zero"],
+        )
+
+    def test_counts_within_tolerance_are_equal(self):
+        _, ballot_set = next(fixture_ballot_sets())
+
+        def rounded(ballot_set):
+            results = _legacy(ballot_set)
+            results["rounds"][0] = {
+                name: votes + 1e-12 for name, votes in results["rounds"][0].items()
+            }
+            return results
+
+        self.assertNotEqual(compare(_legacy, rounded, ballot_set), [])
+        self.assertEqual(compare(_legacy, rounded, ballot_set, tolerance=1e-9), [])
+
+    def test_mismatches_are_shrunk_to_a_minimal_reproducer(self):
+        mismatches = differential_test("no_spoiled_ballots", num_cases=20)
+
+        self.assertTrue(mismatches)
+        for mismatch in mismatches:
+            self.assertEqual(
+                mismatch["differences"],
+                ["results['spoiledBallots']: expected 1, got 0"],
+            )
+            # A single spoiled ballot, with one seat and no Candidates but RON
+            self.assertEqual(mismatch["reproducer"]["numSeats"], 1)
+            self.assertEqual(mismatch["reproducer"]["ballots"], [{"ranking": []}])
+            self.assertEqual(
+                [choice["name"] for choice in mismatch["reproducer"]["choices"]],
+                ["Reopen Nominations"],
+            )
+
+    def test_shrunk_ballot_set_still_fails(self):
+        def fails(ballot_set):
+            return bool(compare(_legacy, _plurality, ballot_set))
+
+        for _, ballot_set in random_ballot_sets(50):
+            if fails(ballot_set):
+                break
+        smallest = shrink(ballot_set, fails)
+
+        self.assertTrue(fails(smallest))
+        self.assertLess(len(smallest), len(ballot_set))
+        # An elimination needs at least three choices
+        self.assertEqual(len(smallest.candidates), 3)
+
+
+class DifferentialTestCommandTestCase(TestCase):
+    def tearDown(self):
+        _counting_methods.pop("no_spoiled_ballots", None)
+
+    def test_agreeing_engines(self):
+        stdout = StringIO()
+        call_command(
+            "differential_test",
+            "instant_runoff",
+            "--cases",
+            "10",
+            "--no-fixtures",
+            stdout=stdout,
+        )
+
+        self.assertIn("agrees", stdout.getvalue())
+
+    def test_disagreeing_engines_raise_error(self):
+        register_counting_method("no_spoiled_ballots", "No spoiled ballots")(
+            _no_spoiled_ballots
+        )
+        stdout = StringIO()
+        with self.assertRaises(CommandError):
+            call_command(
+                "differential_test",
+                "no_spoiled_ballots",
+                "--cases",
+                "10",
+                stdout=stdout,
+            )
+
+        mismatches = json.loads(stdout.getvalue())
+        self.assertEqual(mismatches[0]["source"], "2021_VPSL_post.txt")
+
+    def test_unknown_counting_method_raises_error(self):
+        with self.assertRaises(CommandError):
+            call_command("differential_test", "not_a_method", stdout=StringIO())
@@ -6,6 +6,7 @@ from django.urls import reverse
 
 from rest_framework import status
 
+from backend.forms import ElectionSessionCloneForm
 from backend.models import ElectionSession, Election, Candidate, Eligibility
 from skule_vote.tests import SetupMixin
 
@@ -69,6 +70,49 @@ class ElectionSessionAdminFormTestCase(SetupMixin, TestCase):
             self.assertIsNotNone(election.category)
             self.assertIsNotNone(eligibility.status_eligible)
 
+    def test_csv_files_are_saved_with_bulk_inserts(self):
+        modified_body = copy.deepcopy(self.body_definitions)
+        for i in range(20):
+            election_name = f"Election {i}"
+            modified_body["elections"].append([election_name, "2", "Other"])
+            modified_body["candidates"].append([f"Candidate {i}", election_name, ""])
+            modified_body["eligibilities"].append(
+                [election_name] + ["1"] * 15 + ["Full and Part Time"]
+            )
+
+        form = self._build_election_session_form(
+            files=self._build_admin_csv_files(body=modified_body)
+        )
+        self.assertTrue(form.is_valid())
+
+        # The number of queries doesn't depend on the number of rows in the CSVs
+        with self.assertNumQueries(10):
+            election_session = form.save()
+
+        self.assertEqual(Election.objects.count(), 22)
+        self.assertEqual(Candidate.objects.count(), 44)
+        self.assertEqual(Eligibility.objects.count(), 22)
+        for election in Election.objects.filter(election_session=election_session):
+            self.assertEqual(
+                sorted(election.candidates.values_list("name", flat=True))[-1],
+                "Reopen Nominations",
+            )
+            self.assertEqual(election.candidates.count(), 2)
+            self.assertTrue(Eligibility.objects.filter(election=election).exists())
+
+        election = Election.objects.get(election_name="Election 3")
+        self.assertEqual(election.seats_available, 2)
+        self.assertEqual(election.category, "other")
+        eligibility = Eligibility.objects.get(election=election)
+        self.assertTrue(eligibility.pey_eligible)
+        self.assertEqual(eligibility.status_eligible, "full_and_part_time")
+
+        # Uploading again replaces the ElectionSession's Elections
+        form.save_all_csvs()
+        self.assertEqual(Election.objects.count(), 22)
+        self.assertEqual(Candidate.objects.count(), 44)
+        self.assertEqual(Eligibility.objects.count(), 22)
+
     def test_1_or_2_csv_files_uploaded_throws_validation_error(self):
         modified_csv_files = self._build_admin_csv_files()
         del modified_csv_files["upload_candidates"]
@@ -375,6 +419,64 @@ class ElectionSessionAdminFormTestCase(SetupMixin, TestCase):
             form_2.errors["upload_eligibilities"][0],
         )
 
+    def test_all_row_errors_are_reported_with_line_numbers(self):
+        modified_body = copy.deepcopy(self.body_definitions)
+        modified_body["elections"][0][1] = "f"
+        modified_body["elections"][1][2] = "Class Rap"
+        modified_body["eligibilities"][0][2] = "4"
+        modified_body["eligibilities"][1][16] = "Full Time and Part Time"
+
+        modified_csv_files = self._build_admin_csv_files(body=modified_body)
+
+        form = self._build_election_session_form(files=modified_csv_files)
+        self.assertFalse(form.is_valid())
+
+        self.assertEqual(len(form.errors["upload_elections"]), 2)
+        self.assertIn("must be an integer.", form.errors["upload_elections"][0])
+        self.assertIn("Error at line 2.", form.errors["upload_elections"][0])
+        self.assertIn("[Class Rap].", form.errors["upload_elections"][1])
+        self.assertIn("Error at line 3.", form.errors["upload_elections"][1])
+
+        self.assertEqual(len(form.errors["upload_eligibilities"]), 2)
+        self.assertIn("[4].", form.errors["upload_eligibilities"][0])
+        self.assertIn("Error at line 2.", form.errors["upload_eligibilities"][0])
+        self.assertIn(
+            "[Full Time and Part Time].", form.errors["upload_eligibilities"][1]
+        )
+        self.assertIn("Error at line 3.", form.errors["upload_eligibilities"][1])
+
+    def test_row_errors_are_capped_per_file(self):
+        modified_body = copy.deepcopy(self.body_definitions)
+        for i in range(30):
+            modified_body["candidates"].append([f"Candidate {i}", "Chair", ""])
+
+        modified_csv_files = self._build_admin_csv_files(body=modified_body)
+
+        form = self._build_election_session_form(files=modified_csv_files)
+        self.assertFalse(form.is_valid())
+
+        self.assertEqual(
+            "Election names don't match over all CSV files.",
+            form.errors["__all__"][0],
+        )
+        self.assertEqual(len(form.errors["upload_candidates"]), 21)
+        self.assertIn(
+            "10 more errors were found.", form.errors["upload_candidates"][-1]
+        )
+
+    def test_non_utf8_csv_file_adds_error(self):
+        modified_csv_files = self._build_admin_csv_files()
+        upload = modified_csv_files["upload_candidates"]
+        upload.file.seek(0, 2)
+        upload.file.write("Zoë,4th Year Chair,\n".encode("latin-1"))
+
+        form = self._build_election_session_form(files=modified_csv_files)
+        self.assertFalse(form.is_valid())
+
+        self.assertIn(
+            "The CSV file must be UTF-8 encoded.", form.errors["upload_candidates"][0]
+        )
+
     def test_eligibilities_status_field_not_in_choices_adds_error(self):
         modified_body = copy.deepcopy(self.body_definitions)
         modified_body["eligibilities"][1][16] = "Full Time and Part Time"
@@ -653,3 +755,92 @@ class ElectionSessionOverlappingDatesTestCase(SetupMixin, TestCase):
         self.assertRedirects(
             response, reverse("admin:backend_electionsession_changelist")
         )
+
+
+class ElectionSessionCloneFormTestCase(SetupMixin, TestCase):
+    """
+    Tests the ElectionSessionCloneForm, which creates a new ElectionSession from the
+    Elections, Eligibilities and optionally Candidates of an existing one.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.source = self._create_election_session()
+        self.setUpElections(self.source)
+        for election in Election.objects.filter(election_session=self.source):
+            self.add_candidates(election, num=2)
+        Candidate.objects.filter(name="test candidate 0").update(
+            disqualified_status=True
+        )
+
+        self.clone_data = self._set_election_session_data(
+            name="ElectionSession2022",
+            start_time_offset_days=10,
+            end_time_offset_days=15,
+        )
+
+    def test_clone_copies_elections_and_eligibilities(self):
+        form = ElectionSessionCloneForm(data=self.clone_data, source=self.source)
+        self.assertTrue(form.is_valid())
+
+        # One bulk insert per model, except that SQLite splits the Eligibilities into
+        # two batches since each row has so many columns
+        with self.assertNumQueries(10):
+            election_session = form.save()
+
+        self.assertEqual(election_session.election_session_name, "ElectionSession2022")
+        old_elections = Election.objects.filter(election_session=self.source)
+        new_elections = Election.objects.filter(election_session=election_session)
+        self.assertEqual(
+            list(
+                old_elections.order_by("id").values_list(
+                    "election_name", "seats_available", "category"
+                )
+            ),
+            list(
+                new_elections.order_by("id").values_list(
+                    "election_name", "seats_available", "category"
+                )
+            ),
+        )
+
+        for old, new in zip(old_elections.order_by("id"), new_elections.order_by("id")):
+            self.assertEqual(
+                list(new.candidates.values_list("name", flat=True)),
+                ["Reopen Nominations"],
+            )
+            old_eligibility = Eligibility.objects.filter(election=old).values()[0]
+            new_eligibility = Eligibility.objects.filter(election=new).values()[0]
+            for field in ("id", "election_id", "created_at", "updated_at"):
+                del old_eligibility[field], new_eligibility[field]
+            self.assertEqual(old_eligibility, new_eligibility)
+
+    def test_clone_includes_candidates(self):
+        form = ElectionSessionCloneForm(
+            data=self.clone_data | {"include_candidates": True}, source=self.source
+        )
+        self.assertTrue(form.is_valid())
+        election_session = form.save()
+
+        for election in Election.objects.filter(election_session=election_session):
+            self.assertEqual(
+                list(election.candidates.order_by("id").values_list("name", flat=True)),
+                ["Reopen Nominations", "test candidate 0", "test candidate 1"],
+            )
+        self.assertFalse(
+            Candidate.objects.filter(
+                election__election_session=election_session, disqualified_status=True
+            ).exists()
+        )
+
+    def test_clone_must_not_overlap_existing_election_session(self):
+        data = self.clone_data | {"start_time": self._now()}
+        form = ElectionSessionCloneForm(data=data, source=self.source)
+        self.assertFalse(form.is_valid())
+        self.assertIn(
+            "Election Sessions must be non-overlapping. Please ensure the date range of the Election Session is not "
+            "contained within any other Election Session.",
+            form.errors["__all__"],
+        )
+        self.assertEqual(ElectionSession.objects.count(), 1)
@@ -0,0 +1,120 @@
+import json
+import tracemalloc
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+
+from backend.admin import generate_results
+from backend.ballot_sets import load_election_session_ballot_sets
+from backend.memory_report import generate_results_with_memory_report
+from backend.models import ElectionSession
+from backend.synthetic import generate_ballot_set, insert_ballot_set
+from skule_vote.tests import SetupMixin
+
+
+class MemoryReportTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+        self.queryset = ElectionSession.objects.filter(id=self.election_session.id)
+
+        self.small = insert_ballot_set(
+            self.election_session, generate_ballot_set(20, 2, seed=1)
+        )
+        self.large = insert_ballot_set(
+            self.election_session,
+            generate_ballot_set(
+                300, 6, seats_available=2, truncation="geometric", seed=2
+            ),
+        )
+
+    def test_results_match_generate_results(self):
+        results, _ = generate_results_with_memory_report(self.queryset)
+
+        self.assertEqual(
+            results,
+            generate_results(
+                self.queryset, load_ballot_sets=load_election_session_ballot_sets
+            ),
+        )
+
+    def test_report_covers_every_stage_and_election(self):
+        stages = []
+        _, report = generate_results_with_memory_report(
+            self.queryset, include_condorcet=True, progress=stages.append
+        )
+
+        session_report = report["electionSessions"][0]
+        self.assertEqual(
+            session_report["name"], self.election_session.election_session_name
+        )
+        self.assertEqual(list(session_report["stages"]), ["load"])
+
+        elections = session_report["elections"]
+        self.assertEqual(
+            {e["name"] for e in elections},
+            {self.small.election_name, self.large.election_name},
+        )
+        # Largest first
+        self.assertGreaterEqual(elections[0]["peakMemory"], elections[1]["peakMemory"])
+        large = next(e for e in elections if e["name"] == self.large.election_name)
+        self.assertEqual(large["ballots"], 300)
+        self.assertEqual(large["candidates"], 7)
+        self.assertEqual(
+            list(large["stages"]),
+            [
+                "exclude_disqualified",
+                "results_with_dq",
+                "results_without_dq",
+                "condorcet_with_dq",
+                "condorcet_without_dq",
+            ],
+        )
+        for stage in large["stages"].values():
+            self.assertGreater(stage["peakMemory"], 0)
+            self.assertGreaterEqual(stage["peakMemory"], stage["retainedMemory"])
+            self.assertGreater(stage["maxRss"], 0)
+        self.assertGreaterEqual(report["pythonPeakMemory"], large["peakMemory"])
+
+        # One progress entry per stage, load first
+        self.assertEqual(len(stages), 1 + 2 * 5)
+        self.assertEqual(stages[0]["stage"], "load")
+        self.assertEqual(
+            stages[0]["electionSession"], self.election_session.election_session_name
+        )
+        self.assertIn(stages[1]["election"], {e["name"] for e in elections})
+
+    def test_tracing_is_left_as_it_was(self):
+        generate_results_with_memory_report(self.queryset)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        tracemalloc.start()
+        try:
+            generate_results_with_memory_report(self.queryset)
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_admin_action_downloads_report_and_results(self):
+        self._login_admin()
+
+        with self.assertLogs("backend.admin", "INFO") as logs:
+            response = self.client.post(
+                reverse("admin:backend_electionsession_changelist"),
+                data={
+                    "action": "generate_results_with_memory_report_action",
+                    "_selected_action": [self.election_session.id],
+                },
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        download = json.loads(response.content)
+        self.assertEqual(set(download), {"memoryReport", "results"})
+        self.assertEqual(
+            len(download["memoryReport"]["electionSessions"][0]["elections"]), 2
+        )
+        # Every stage is logged as soon as it's done
+        self.assertEqual(len(logs.output), 1 + 2 * 3)
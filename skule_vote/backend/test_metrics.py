@@ -0,0 +1,154 @@
+import json
+import os
+import socket
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from backend.metrics import (
+    EXITED_FILE_NAME,
+    load_metrics,
+    process_metrics,
+    render_metrics,
+)
+from skule_vote.tests import SetupMixin
+
+
+class MetricsTestCase(SetupMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.metrics_dir = directory.name
+
+        settings = override_settings(
+            METRICS_DIR=self.metrics_dir, METRICS_FLUSH_INTERVAL=0
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        process_metrics.reset()
+        self.addCleanup(process_metrics.reset)
+
+        self.metrics_view = reverse("api:backend:metrics")
+        self.election_session_view = reverse("api:backend:election-session-list")
+        self._create_election_session(self._set_election_session_data())
+
+    def _metrics(self):
+        self._login_admin()
+        response = self.client.get(self.metrics_view)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode("utf-8").splitlines()
+
+    def test_non_staff_cannot_see_metrics(self):
+        response = self.client.get(self.metrics_view)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_requests_are_counted_per_view(self):
+        for _ in range(3):
+            self.client.get(self.election_session_view)
+
+        lines = self._metrics()
+        view = 'view="api:backend:election-session-list"'
+
+        self.assertIn(
+            f'skule_vote_requests_total{{{view},method="GET",status="200"}} 3', lines
+        )
+        self.assertIn(
+            f'skule_vote_request_duration_seconds_bucket{{{view},le="+Inf"}} 3', lines
+        )
+        self.assertIn(f"skule_vote_request_duration_seconds_count{{{view}}} 3", lines)
+        # The ElectionSession is upcoming, so the first request looks for a live one
+        # before reading it, and the others are served from the cache
+        self.assertIn(f"skule_vote_db_queries_per_request_sum{{{view}}} 2", lines)
+        self.assertIn(
+            f'skule_vote_db_queries_per_request_bucket{{{view},le="0"}} 2', lines
+        )
+        self.assertIn(
+            f'skule_vote_db_queries_per_request_bucket{{{view},le="2"}} 3', lines
+        )
+        self.assertTrue(
+            any(
+                line.startswith(f"skule_vote_db_query_seconds_total{{{view}}}")
+                for line in lines
+            )
+        )
+
+    def test_status_codes_are_counted_separately(self):
+        self.client.get(self.metrics_view)
+
+        lines = self._metrics()
+
+        self.assertIn(
+            'skule_vote_requests_total{view="api:backend:metrics",method="GET",'
+            'status="403"} 1',
+            lines,
+        )
+
+    def test_metrics_are_added_up_across_processes(self):
+        self.client.get(self.election_session_view)
+        process_metrics.flush()
+
+        # Another worker's file, which is still running as it has this process's pid
+        self._copy_metrics(f"{socket.gethostname()}.{os.getpid()}.other.json")
+
+        totals = load_metrics()
+        self.assertEqual(
+            totals["api:backend:election-session-list"]["requests"],
+            {"GET 200": 2},
+        )
+        self.assertEqual(totals["api:backend:election-session-list"]["queriesSum"], 4)
+
+    def test_metrics_of_exited_workers_are_kept(self):
+        self.client.get(self.election_session_view)
+        process_metrics.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0)
+        os.waitpid(pid, 0)
+        exited = f"{socket.gethostname()}.{pid}.exited.json"
+        self._copy_metrics(exited)
+        # Workers on other hosts are left to merge their own files
+        other_host = f"other-host.{pid}.exited.json"
+        self._copy_metrics(other_host)
+
+        for _ in range(2):
+            totals = load_metrics()
+            self.assertEqual(
+                totals["api:backend:election-session-list"]["requests"],
+                {"GET 200": 3},
+            )
+        self.assertEqual(
+            sorted(os.listdir(self.metrics_dir)),
+            sorted([".lock", EXITED_FILE_NAME, process_metrics.file_name, other_host]),
+        )
+
+    def test_a_new_worker_never_overwrites_an_old_ones_file(self):
+        self.client.get(self.election_session_view)
+        process_metrics.flush()
+        file_name = process_metrics.file_name
+
+        # As a worker started with the same pid
+        process_metrics.reset()
+        process_metrics.flush()
+
+        self.assertNotEqual(process_metrics.file_name, file_name)
+        self.assertEqual(
+            load_metrics()["api:backend:election-session-list"]["requests"],
+            {"GET 200": 1},
+        )
+
+    def _copy_metrics(self, file_name):
+        with open(os.path.join(self.metrics_dir, process_metrics.file_name)) as f:
+            views = json.load(f)
+        with open(os.path.join(self.metrics_dir, file_name), "w") as f:
+            json.dump(views, f)
+
+    def test_missing_metrics_dir_is_empty(self):
+        with override_settings(METRICS_DIR=os.path.join(self.metrics_dir, "missing")):
+            self.assertEqual(load_metrics(), {})
+            self.assertNotIn("skule_vote_requests_total{", render_metrics({}))
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from backend.models import Ballot, ElectionSession
+from skule_vote.tests import SetupMixin
+
+
+class ProfilerMiddlewareTestCase(SetupMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.election_session_view = reverse("api:backend:election-session-list")
+        self._create_election_session(self._set_election_session_data())
+
+    def _assert_not_profiled(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()[0]["election_session_name"], "ElectionSession2021"
+        )
+
+    def test_staff_get_profile_report(self):
+        self._login_admin()
+
+        for flag in [{"data": {"profile": "1"}}, {"HTTP_X_PROFILE": "1"}]:
+            # Otherwise the ElectionSession would come from the cache
+            cache.clear()
+            self._login_admin()
+
+            response = self.client.get(self.election_session_view, **flag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            report = response.json()
+            self.assertEqual(report["method"], "GET")
+            self.assertEqual(report["status"], status.HTTP_200_OK)
+            self.assertIn("cumulative", report["profile"])
+
+            # Whether there is a live ElectionSession, then reading it
+            self.assertEqual(len(report["queries"]), 2)
+            for query in report["queries"]:
+                self.assertIn("backend_electionsession", query["sql"])
+                self.assertGreater(len(query["explain"]), 0)
+
+    def test_profiled_request_is_still_handled(self):
+        election_session = ElectionSession.objects.get()
+        officer = self._create_officer(election_session)
+        candidate = self.add_candidates(officer, 1)[0]
+        self.client.post(
+            reverse("api:backend:bypass-cookie"), self._urlencode_cookie_request()
+        )
+        self._login_admin()
+
+        response = self.client.post(
+            f"{reverse('api:backend:ballot-submit')}?profile=1",
+            {"electionId": officer.id, "ranking": {"0": candidate.id}},
+            format="json",
+        )
+
+        report = response.json()
+        self.assertEqual(report["status"], status.HTTP_201_CREATED)
+        self.assertEqual(Ballot.objects.filter(election=officer).count(), 1)
+        # Only SELECTs are run again to be explained
+        for query in report["queries"]:
+            if query["sql"].startswith("SELECT"):
+                self.assertGreater(len(query["explain"]), 0)
+            else:
+                self.assertIsNone(query["explain"])
+        self.assertTrue(
+            any(query["sql"].startswith("INSERT") for query in report["queries"])
+        )
+
+    def test_voters_cannot_profile(self):
+        self.client.post(
+            reverse("api:backend:bypass-cookie"), self._urlencode_cookie_request()
+        )
+
+        self._assert_not_profiled(
+            self.client.get(self.election_session_view, {"profile": "1"})
+        )
+        self._assert_not_profiled(
+            self.client.get(self.election_session_view, HTTP_X_PROFILE="1")
+        )
+
+    def test_staff_requests_without_flag_are_not_profiled(self):
+        self._login_admin()
+
+        self._assert_not_profiled(self.client.get(self.election_session_view))
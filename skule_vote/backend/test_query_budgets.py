@@ -0,0 +1,225 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from backend.models import Ballot, Message, Voter
+from skule_vote.tests import QueryBudgetMixin, SetupMixin
+
+
+class QueryBudgetTestCase(QueryBudgetMixin, SetupMixin, APITestCase):
+    """
+    Every endpoint must run the same number of queries however many Elections,
+    Candidates, ballots and Messages there are.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.cookie_view = reverse("api:backend:bypass-cookie")
+
+        self.election_session = self._create_election_session(
+            self._set_election_session_data()
+        )
+
+    def _login_voter(self):
+        self.client.post(self.cookie_view, self._urlencode_cookie_request())
+        return Voter.objects.latest("id")
+
+    def _uoft_cookie_request(self):
+        # Signed the way UofT signs the query string, see _create_verified_voter
+        query = self._urlencode_cookie_request()
+        fields = [
+            "isstudent",
+            "isregistered",
+            "isundergrad",
+            "primaryorg",
+            "yofstudy",
+            "campus",
+            "postcd",
+            "attendance",
+            "assocorg",
+            "pid",
+        ]
+        check_string = "".join(query[field] for field in fields)
+        query["hash"] = hashlib.sha256(
+            (check_string + settings.UOFT_SECRET_KEY).encode("utf-8")
+        ).hexdigest()
+        return query
+
+    def test_login(self):
+        # The Voter is looked up, then created, or updated when they log in again
+        returning_voter = self._uoft_cookie_request()
+        responses = self.assertQueryBudget(
+            2,
+            lambda: self.client.get(reverse("cookie"), returning_voter),
+            self._generate_voters,
+        )
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertTrue(
+            Voter.objects.filter(student_number_hash=returning_voter["pid"]).exists()
+        )
+
+    def test_bypass_login(self):
+        responses = self.assertQueryBudget(
+            2,
+            lambda: self.client.post(
+                self.cookie_view, self._urlencode_cookie_request()
+            ),
+            self._generate_voters,
+        )
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(Voter.objects.count(), 4 + 3 * 4)
+
+    def test_election_list(self):
+        self._login_voter()
+        officer = self._create_officer(self.election_session)
+        self.add_candidates(officer, 3)
+
+        def grow():
+            # Each Election's Candidates are nested in the response
+            election = self._create_referendum(self.election_session)
+            self.add_candidates(election, 5)
+            self.add_candidates(officer, 5)
+
+        # Voter and the Elections they can vote in, then, since the changes invalidate
+        # the cache, the live ElectionSession, Elections and their Candidates
+        responses = self.assertQueryBudget(
+            5, lambda: self.client.get(reverse("api:backend:election-list")), grow
+        )
+        self.assertEqual(len(responses[-1].json()), 4)
+        self.assertEqual(len(responses[-1].json()[0]["candidates"]), 19)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("api:backend:election-list"))
+        self.assertEqual(response.json(), responses[-1].json())
+
+    def test_ballot_submit(self):
+        officer = self._create_officer(self.election_session)
+        candidates = self.add_candidates(officer, 2)
+        self._login_voter()
+
+        def grow():
+            # A longer ranking from a new voter, with ballots already cast
+            candidates.extend(self.add_candidates(officer, 5))
+            self._login_voter()
+
+        def vote():
+            ranking = {
+                str(rank): candidate.id for rank, candidate in enumerate(candidates)
+            }
+            return self.client.post(
+                reverse("api:backend:ballot-submit"),
+                {"electionId": officer.id, "ranking": ranking},
+                format="json",
+            )
+
+        # The Voter, Election and its Eligibility, any earlier ballot and the
+        # Candidates are looked up, then the Ballots are inserted in one query. The
+        # BallotSignature and turnout counter are each updated, then, when their row is
+        # new, inserted in a savepoint. The whole ballot is written in one savepoint,
+        # as the test runs in a transaction.
+        responses = self.assertQueryBudget(15, vote, grow)
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ballot.objects.count(), 2 + 7 + 12 + 17)
+
+    def test_election_session_list(self):
+        future_sessions = []
+
+        def grow():
+            offset = 10 * (len(future_sessions) + 1)
+            future_sessions.append(
+                self._create_election_session(
+                    self._set_election_session_data(
+                        name=f"Future ElectionSession {offset}",
+                        start_time_offset_days=offset,
+                        end_time_offset_days=offset + 5,
+                    )
+                )
+            )
+
+        self.assertQueryBudget(
+            2,
+            lambda: self.client.get(reverse("api:backend:election-session-list")),
+            grow,
+        )
+
+    def test_messages(self):
+        def grow():
+            for active in [True, False]:
+                Message.objects.create(
+                    message="Voting closes soon",
+                    active=active,
+                    election_session=self.election_session,
+                )
+
+        responses = self.assertQueryBudget(
+            2, lambda: self.client.get(reverse("api:backend:messages")), grow
+        )
+        self.assertEqual(len(responses[-1].json()), 3)
+
+    def test_voter_eligible(self):
+        self._login_voter()
+
+        self.assertQueryBudget(
+            1,
+            lambda: self.client.get(reverse("api:backend:voter-eligible")),
+            self._generate_voters,
+        )
+
+    def test_turnout(self):
+        def grow():
+            election = self._create_officer(self.election_session)
+            candidates = self.add_candidates(election, 2)
+            for voter in [self._login_voter() for _ in range(3)]:
+                Ballot.objects.create(
+                    voter=voter, election=election, candidate=candidates[0], rank=0
+                )
+
+        self._login_admin()
+        # User lookup, as the session is cached, then the Elections and their turnout
+        responses = self.assertQueryBudget(
+            3, lambda: self.client.get(reverse("api:backend:turnout")), grow
+        )
+        self.assertEqual(len(responses[-1].json()["elections"]), 3)
+
+    def test_recount(self):
+        officer = self._create_officer(self.election_session)
+        candidates = self.add_candidates(officer, 2)
+
+        def grow():
+            candidates.extend(self.add_candidates(officer, 3))
+            for voter in self._generate_voters(count=5):
+                voter = Voter.objects.get(student_number_hash=voter["pid"])
+                for rank, candidate in enumerate(candidates):
+                    Ballot.objects.create(
+                        voter=voter, election=officer, candidate=candidate, rank=rank
+                    )
+
+        def recount():
+            return self.client.post(
+                reverse("api:backend:recount"),
+                {"electionId": officer.id, "excludedCandidates": [candidates[0].id]},
+                format="json",
+            )
+
+        self._login_admin()
+        # New ballots change the watermark, so every recount reads them again, in
+        # chunks of 2000 rows
+        responses = self.assertQueryBudget(10, recount, grow)
+        self.assertEqual(responses[-1].json()["totalVotes"], 15)
+
+    def test_metrics(self):
+        self._login_admin()
+
+        self.assertQueryBudget(
+            2,
+            lambda: self.client.get(reverse("api:backend:metrics")),
+            lambda: self.client.get(reverse("api:backend:election-session-list")),
+        )
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from backend.models import Ballot, Candidate, Voter
+from backend.recount import recount
+from skule_vote.tests import SetupMixin
+
+
+class RecountTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+
+        self.officer = self._create_officer(self.election_session)
+        self.candidates = self.add_candidates(self.officer, 3)
+
+        self._generate_voters(count=5)
+        self.voters = list(Voter.objects.all())
+        rankings = [[0, 1], [1, 2], [1, 2], [2, 1], [2]]
+        for voter, ranking in zip(self.voters, rankings):
+            for rank, candidate in enumerate(ranking):
+                Ballot.objects.create(
+                    voter=voter,
+                    election=self.officer,
+                    candidate=self.candidates[candidate],
+                    rank=rank,
+                )
+
+    def test_excluded_candidates_are_removed_from_rankings(self):
+        self.assertEqual(recount(self.officer, [])["winners"], ["test candidate 1"])
+
+        results = recount(self.officer, [self.candidates[2].id])
+        self.assertEqual(results["winners"], ["test candidate 1"])
+        self.assertNotIn("test candidate 2", results["rounds"][0])
+        # The ballot that only ranked the excluded Candidate is not counted
+        self.assertEqual(results["totalVotes"], 4)
+
+        results = recount(self.officer, [self.candidates[1].id])
+        self.assertEqual(results["winners"], ["test candidate 2"])
+
+    def test_ballot_set_and_results_are_cached(self):
+        with self.assertNumQueries(6):
+            # Watermark, then the Election, its Candidates and its Ballots
+            results = recount(self.officer, [self.candidates[0].id])
+
+        with self.assertNumQueries(3):
+            self.assertEqual(recount(self.officer, [self.candidates[0].id]), results)
+
+        with self.assertNumQueries(3):
+            recount(self.officer, [self.candidates[1].id])
+
+    def test_changes_invalidate_the_cache(self):
+        recount(self.officer, [self.candidates[1].id])
+
+        Candidate.objects.filter(id=self.candidates[2].id).update(name="Renamed")
+        results = recount(self.officer, [self.candidates[1].id])
+        self.assertEqual(results["winners"], ["Renamed"])
+        self.assertEqual(results["totalVotes"], 5)
+
+        Ballot.objects.filter(voter__in=self.voters[3:]).delete()
+        results = recount(self.officer, [self.candidates[1].id])
+        self.assertEqual(results["totalVotes"], 3)
@@ -0,0 +1,88 @@
+from django.test import TestCase
+
+from backend.ballot_sets import (
+    calculate_election_session_results,
+    load_election_session_ballot_sets,
+)
+from backend.models import Ballot, Candidate, ElectionResult, Voter
+from backend.results import load_election_session_results
+from skule_vote.tests import SetupMixin
+
+
+class LoadElectionSessionResultsTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+
+        self.officer = self._create_officer(self.election_session)
+        self.referendum = self._create_referendum(self.election_session)
+        self.candidates = self.add_candidates(self.officer, 2)
+        referendum_candidate = self.add_candidates(self.referendum, 1)[0]
+
+        self._generate_voters(count=4)
+        self.voters = list(Voter.objects.all())
+        for voter, candidate in zip(self.voters[:3], [0, 1, 1]):
+            Ballot.objects.create(
+                voter=voter,
+                election=self.officer,
+                candidate=self.candidates[candidate],
+                rank=0,
+            )
+            Ballot.objects.create(
+                voter=voter,
+                election=self.referendum,
+                candidate=referendum_candidate,
+                rank=0,
+            )
+
+    def _fresh_results(self):
+        return calculate_election_session_results(
+            load_election_session_ballot_sets(self.election_session)
+        )
+
+    def test_results_are_stored_and_reused(self):
+        results = load_election_session_results(self.election_session)
+        self.assertEqual(results, self._fresh_results())
+        self.assertEqual(ElectionResult.objects.count(), 2)
+
+        # Only the watermarks and stored results are read, no ballots are loaded
+        with self.assertNumQueries(4):
+            self.assertEqual(
+                load_election_session_results(self.election_session), results
+            )
+
+    def test_new_ballots_recount_only_their_election(self):
+        load_election_session_results(self.election_session)
+        referendum_result = ElectionResult.objects.get(election=self.referendum)
+
+        Ballot.objects.create(
+            voter=self.voters[3],
+            election=self.officer,
+            candidate=self.candidates[0],
+            rank=0,
+        )
+        results = load_election_session_results(self.election_session)
+
+        self.assertEqual(results, self._fresh_results())
+        self.assertEqual(results["President"]["results_without_dq"]["totalVotes"], 4)
+        self.assertEqual(
+            ElectionResult.objects.get(election=self.referendum).updated_at,
+            referendum_result.updated_at,
+        )
+
+    def test_disqualifying_a_candidate_recounts(self):
+        results = load_election_session_results(self.election_session)
+        self.assertEqual(
+            results["President"]["results_with_dq"]["winners"], ["test candidate 1"]
+        )
+
+        Candidate.objects.filter(id=self.candidates[1].id).update(
+            disqualified_status=True
+        )
+        results = load_election_session_results(self.election_session)
+
+        self.assertEqual(results, self._fresh_results())
+        self.assertEqual(
+            results["President"]["results_with_dq"]["winners"], ["test candidate 0"]
+        )
@@ -0,0 +1,95 @@
+from io import StringIO
+import json
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from backend.ballot_sets import PackedBallotSet
+from backend.models import Ballot, Voter
+from backend.sensitivity import leave_one_out
+from skule_vote.tests import SetupMixin
+
+
+class LeaveOneOutTestCase(TestCase):
+    def setUp(self):
+        self.ballot_set = PackedBallotSet(
+            1,
+            "President",
+            1,
+            [
+                {"id": 10, "name": "Reopen Nominations", "disqualified_status": False},
+                {"id": 11, "name": "Alex Bogdan", "disqualified_status": False},
+                {"id": 12, "name": "Lisa Li", "disqualified_status": False},
+                {"id": 13, "name": "Armin Ale", "disqualified_status": False},
+            ],
+        )
+        # Lisa Li is squeezed out first, but wins if Armin Ale is removed
+        self.ballot_set.add([1, 2], 4)
+        self.ballot_set.add([3, 2], 5)
+        self.ballot_set.add([2, 1], 3)
+
+    def _removals(self, report):
+        return {
+            removal["name"]: (removal["winners"], removal["changes_outcome"])
+            for removal in report["removals"]
+        }
+
+    def test_removals_that_change_the_winners_are_reported(self):
+        report = leave_one_out(self.ballot_set, max_workers=0)
+
+        self.assertEqual(report["winners"], ["Alex Bogdan"])
+        self.assertEqual(
+            self._removals(report),
+            {
+                "Alex Bogdan": (["Lisa Li"], True),
+                "Lisa Li": (["Alex Bogdan"], False),
+                "Armin Ale": (["Lisa Li"], True),
+            },
+        )
+
+    def test_process_pool_matches_inline(self):
+        self.assertEqual(
+            leave_one_out(self.ballot_set, max_workers=2),
+            leave_one_out(self.ballot_set, max_workers=0),
+        )
+
+
+class SensitivityAnalysisCommandTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+        self.officer = self._create_officer(self.election_session)
+        self.candidates = self.add_candidates(self.officer, 3)
+        self.candidates[2].disqualified_status = True
+        self.candidates[2].save()
+
+        self._generate_voters(count=3)
+        for voter, candidate in zip(Voter.objects.all(), [0, 0, 1]):
+            Ballot.objects.create(
+                voter=voter,
+                election=self.officer,
+                candidate=self.candidates[candidate],
+                rank=0,
+            )
+
+    def test_command_reports_each_removal(self):
+        stdout = StringIO()
+        call_command(
+            "sensitivity_analysis", self.officer.id, "--workers", "0", stdout=stdout
+        )
+        report = json.loads(stdout.getvalue())
+
+        self.assertEqual(report["winners"], ["test candidate 0"])
+        # Disqualified Candidates are already left out
+        self.assertEqual(
+            [removal["name"] for removal in report["removals"]],
+            ["test candidate 0", "test candidate 1"],
+        )
+        self.assertTrue(report["removals"][0]["changes_outcome"])
+        self.assertFalse(report["removals"][1]["changes_outcome"])
+
+    def test_missing_election_raises_error(self):
+        with self.assertRaises(CommandError):
+            call_command("sensitivity_analysis", 0, stdout=StringIO())
@@ -0,0 +1,227 @@
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from backend.shared_cache import SharedMemoryCache
+
+
+class SharedMemoryCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache")
+        self.cache = self._cache()
+
+    def _cache(self, **options):
+        return SharedMemoryCache(
+            self.path,
+            {"OPTIONS": {"SETS": 64, "WAYS": 2, "SLOT_SIZE": 256} | options},
+        )
+
+    def test_set_get_delete(self):
+        self.cache.set("election", {"id": 1, "candidates": ["RON", "Alex"]})
+
+        self.assertEqual(
+            self.cache.get("election"), {"id": 1, "candidates": ["RON", "Alex"]}
+        )
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.get("missing", 0), 0)
+        self.assertTrue(self.cache.has_key("election"))
+
+        self.assertTrue(self.cache.delete("election"))
+        self.assertFalse(self.cache.delete("election"))
+        self.assertIsNone(self.cache.get("election"))
+
+    def test_entries_are_shared_between_instances(self):
+        # As in two worker processes
+        other = self._cache()
+
+        self.cache.set("message", "Voting closes soon")
+        self.assertEqual(other.get("message"), "Voting closes soon")
+
+        other.set("message", "Voting is closed")
+        self.assertEqual(self.cache.get("message"), "Voting is closed")
+
+    def test_entries_are_shared_with_forked_processes(self):
+        self.cache.set("before", 1)
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self.cache.set("after", self.cache.get("before") + 1)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(self.cache.get("after"), 2)
+
+    def test_expiry(self):
+        self.cache.set("short", 1, timeout=10)
+        self.cache.set("forever", 2, timeout=None)
+        self.cache.set("gone", 3, timeout=0)
+
+        with patch("time.time", return_value=time.time() + 60):
+            self.assertIsNone(self.cache.get("short"))
+            self.assertEqual(self.cache.get("forever"), 2)
+        self.assertIsNone(self.cache.get("gone"))
+
+        self.assertTrue(self.cache.touch("short", timeout=None))
+        with patch("time.time", return_value=time.time() + 60):
+            self.assertEqual(self.cache.get("short"), 1)
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("key", 1))
+        self.assertFalse(self.cache.add("key", 2))
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_incr(self):
+        self.cache.set("version", 1)
+
+        self.assertEqual(self.cache.incr("version"), 2)
+        self.assertEqual(self.cache.incr("version", 10), 12)
+        self.assertEqual(self.cache.get("version"), 12)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self._cache(SETS=1)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_values_larger_than_a_slot_span_several(self):
+        self.cache.set("results", "x" * 1000)
+        self.assertEqual(self.cache.get("results"), "x" * 1000)
+
+        # Replaced by a value with fewer parts, and then deleted
+        self.cache.set("results", "y" * 300)
+        self.assertEqual(self.cache.get("results"), "y" * 300)
+        self.assertTrue(self.cache.touch("results", timeout=None))
+        self.assertTrue(self.cache.delete("results"))
+        self.assertIsNone(self.cache.get("results"))
+
+    def test_value_is_missing_once_a_part_is_evicted(self):
+        # Three parts, which fill the only set
+        cache = self._cache(SETS=1, WAYS=3)
+        cache.set("results", "x" * 500)
+        self.assertEqual(cache.get("results"), "x" * 500)
+
+        # Evicts the least recently used part, so the rest is useless
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("results"))
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_values_whose_parts_evict_each_other_are_not_cached(self):
+        cache = self._cache(SETS=1, WAYS=2)
+        cache.set("results", "small")
+
+        with self.assertLogs("backend.shared_cache", "WARNING") as logs:
+            cache.set("results", "x" * 1000)
+        self.assertIn("parts evict each other", logs.output[0])
+        # Rather than keeping the old value
+        self.assertIsNone(cache.get("results"))
+
+    def test_values_too_large_are_not_cached(self):
+        cache = self._cache(MAX_VALUE_SIZE=512)
+        cache.set("results", "small")
+
+        with self.assertLogs("backend.shared_cache", "WARNING") as logs:
+            cache.set("results", "x" * 1000)
+            self.assertFalse(cache.add("other", "x" * 1000))
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("more than the 512 allowed", logs.output[0])
+        # Rather than keeping the old value
+        self.assertIsNone(cache.get("results"))
+
+    def test_payload_of_realistic_size(self):
+        # The elections payload of a large ElectionSession, with long statements
+        payload = [
+            {
+                "id": election,
+                "election_name": f"Election {election}",
+                "category": "officer",
+                "seats_available": 1,
+                "candidates": [
+                    {"id": candidate, "name": f"Candidate {candidate}"}
+                    | {"statement": f"Statement {candidate} " * 150}
+                    for candidate in range(6)
+                ],
+            }
+            for election in range(40)
+        ]
+        cache = self._cache(SETS=512, WAYS=8, SLOT_SIZE=16384)
+
+        cache.set("elections", payload)
+
+        self.assertEqual(cache.get("elections"), payload)
+
+    def test_clear_starts_a_new_generation(self):
+        other = self._cache()
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+
+        other.clear()
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.cache.set("a", 3)
+        self.assertEqual(other.get("a"), 3)
+
+    def test_versions(self):
+        self.cache.set("key", 1, version=1)
+        self.cache.set("key", 2, version=2)
+
+        self.assertEqual(self.cache.get("key", version=1), 1)
+        self.assertEqual(self.cache.get("key", version=2), 2)
+
+    def test_other_layouts_use_their_own_file(self):
+        self.cache.set("key", 1)
+
+        # As workers started with new settings during a rolling deploy
+        cache = self._cache(SETS=8)
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", 2)
+        self.assertEqual(cache.get("key"), 2)
+
+        # The old workers' file is left as it was
+        self.assertEqual(self.cache.get("key"), 1)
+        self.assertEqual(len(os.listdir(os.path.dirname(self.path))), 2)
+
+    def test_directory_is_created_private(self):
+        self.path = os.path.join(os.path.dirname(self.path), "private", "cache")
+        self._cache().set("key", 1)
+
+        mode = os.stat(os.path.dirname(self.path)).st_mode
+        self.assertEqual(mode & 0o777, 0o700)
+
+    def test_file_others_could_have_written_is_refused(self):
+        target = os.path.join(os.path.dirname(self.path), "planted")
+        with open(target, "wb"):
+            pass
+        os.chmod(target, 0o600)
+        os.symlink(target, self.cache._path)
+        with self.assertRaises(ImproperlyConfigured):
+            self.cache.get("key")
+
+        os.remove(self.cache._path)
+        self.cache.set("key", 1)
+        os.chmod(self.cache._path, 0o666)
+        with self.assertRaises(ImproperlyConfigured):
+            self._cache().get("key")
+
+        os.chmod(self.cache._path, 0o600)
+        with patch("os.getuid", return_value=os.getuid() + 1), self.assertRaises(
+            ImproperlyConfigured
+        ):
+            self._cache().get("key")
+        self.assertEqual(self._cache().get("key"), 1)
@@ -0,0 +1,170 @@
+from collections import Counter
+
+from django.test import TestCase
+
+from backend.ballot_sets import (
+    load_election_session_ballot_sets,
+    load_election_session_signature_sets,
+)
+from backend.models import Ballot, Voter
+from backend.synthetic import generate_ballot_set, insert_ballot_set
+from skule_vote.tests import SetupMixin
+
+
+def _first_choices(ballot_set):
+    first_choices = Counter()
+    for ranking, count in ballot_set.rankings.items():
+        first_choices[ranking[0]] += count
+    return first_choices
+
+
+class GenerateBallotSetTestCase(TestCase):
+    def test_impartial_culture(self):
+        ballot_set = generate_ballot_set(500, 4, seed=1)
+
+        self.assertEqual(len(ballot_set), 500)
+        self.assertEqual(
+            [c["name"] for c in ballot_set.choices()],
+            [
+                "Reopen Nominations",
+                "Candidate 1",
+                "Candidate 2",
+                "Candidate 3",
+                "Candidate 4",
+            ],
+        )
+        for ranking in ballot_set.rankings:
+            self.assertEqual(sorted(ranking), [1, 2, 3, 4])
+        # Every Candidate is ranked first on about a quarter of the ballots
+        for candidate, count in _first_choices(ballot_set).items():
+            self.assertGreater(count, 90)
+
+    def test_same_seed_generates_same_ballots(self):
+        self.assertEqual(
+            generate_ballot_set(100, 5, model="mallows", seed=3).rankings,
+            generate_ballot_set(100, 5, model="mallows", seed=3).rankings,
+        )
+        self.assertNotEqual(
+            generate_ballot_set(100, 5, model="mallows", seed=3).rankings,
+            generate_ballot_set(100, 5, model="mallows", seed=4).rankings,
+        )
+
+    def test_mallows_without_dispersion_is_the_reference(self):
+        ballot_set = generate_ballot_set(
+            50, 4, model="mallows", reference=[3, 1, 4, 2], dispersion=0, seed=1
+        )
+
+        self.assertEqual(ballot_set.rankings, Counter({(3, 1, 4, 2): 50}))
+
+    def test_mallows_is_centred_on_the_reference(self):
+        ballot_set = generate_ballot_set(
+            500, 4, model="mallows", reference=[2, 1, 3, 4], dispersion=0.3, seed=1
+        )
+
+        self.assertEqual(_first_choices(ballot_set).most_common(1)[0][0], 2)
+
+    def test_plackett_luce_follows_the_weights(self):
+        ballot_set = generate_ballot_set(
+            500, 3, model="plackett_luce", weights=[1, 20, 1], seed=1
+        )
+
+        self.assertGreater(_first_choices(ballot_set)[2], 400)
+
+    def test_truncation(self):
+        def lengths(ballot_set):
+            return {len(ranking) for ranking in ballot_set.rankings}
+
+        self.assertEqual(lengths(generate_ballot_set(200, 5, seed=1)), {5})
+        self.assertEqual(
+            lengths(generate_ballot_set(200, 5, truncation="uniform", seed=1)),
+            {1, 2, 3, 4, 5},
+        )
+        self.assertEqual(
+            lengths(
+                generate_ballot_set(
+                    200, 5, truncation="geometric", stop_probability=1, seed=1
+                )
+            ),
+            {1},
+        )
+
+    def test_spoil_rate(self):
+        ballot_set = generate_ballot_set(200, 3, spoil_rate=0.5, seed=1)
+
+        self.assertGreater(ballot_set.rankings[()], 70)
+        self.assertLess(ballot_set.rankings[()], 130)
+        self.assertEqual(
+            generate_ballot_set(20, 3, spoil_rate=1, seed=1).rankings,
+            Counter({(): 20}),
+        )
+
+    def test_ron_preference(self):
+        first = generate_ballot_set(100, 3, ron_first_rate=1, seed=1)
+        last = generate_ballot_set(100, 3, ron_last_rate=1, seed=1)
+        neither = generate_ballot_set(100, 3, seed=1)
+
+        self.assertTrue(all(ranking[0] == 0 for ranking in first.rankings))
+        self.assertTrue(all(ranking[-1] == 0 for ranking in last.rankings))
+        self.assertTrue(all(0 not in ranking for ranking in neither.rankings))
+
+    def test_invalid_parameters_raise_error(self):
+        for kwargs in [
+            {"model": "borda"},
+            {"truncation": "random"},
+            {"dispersion": 2},
+            {"spoil_rate": -0.1},
+            {"ron_first_rate": 0.6, "ron_last_rate": 0.6},
+            {"reference": [1, 1, 2]},
+            {"model": "plackett_luce", "weights": [1, 0, 1]},
+        ]:
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                generate_ballot_set(10, 3, **kwargs)
+
+
+class InsertBallotSetTestCase(SetupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self._set_election_session_data()
+        self.election_session = self._create_election_session()
+
+        self.ballot_set = generate_ballot_set(
+            120,
+            4,
+            seats_available=2,
+            truncation="geometric",
+            spoil_rate=0.1,
+            ron_last_rate=0.2,
+            seed=1,
+        )
+
+    def test_inserted_ballots_load_back_the_same(self):
+        election = insert_ballot_set(
+            self.election_session, self.ballot_set, batch_size=50
+        )
+
+        self.assertEqual(election.seats_available, 2)
+        self.assertEqual(Voter.objects.count(), 120)
+        self.assertEqual(
+            Ballot.objects.filter(election=election).values("voter").distinct().count(),
+            120,
+        )
+        for load_ballot_sets in [
+            load_election_session_ballot_sets,
+            load_election_session_signature_sets,
+        ]:
+            loaded = load_ballot_sets(self.election_session)[election.id]
+            self.assertEqual(
+                [c["name"] for c in loaded.candidates],
+                [c["name"] for c in self.ballot_set.candidates],
+            )
+            self.assertEqual(loaded.rankings, self.ballot_set.rankings)
+
+            # Surplus transfers are fractional, and summed in a different order
+            results, expected = loaded.calculate(), self.ballot_set.calculate()
+            self.assertEqual(results["winners"], expected["winners"])
+            self.assertEqual(len(results["rounds"]), len(expected["rounds"]))
+            for votes_by_name, expected_round in zip(
+                results["rounds"], expected["rounds"]
+            ):
+                for name, votes in expected_round.items():
+                    self.assertAlmostEqual(votes_by_name[name], votes)
@@ -1,16 +1,28 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Sum
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from skule_vote.tests import SetupMixin
+from backend.ballot_sets import (
+    BallotSignatureError,
+    load_election_session_ballot_sets,
+    load_election_session_signature_sets,
+)
 from backend.models import (
     Ballot,
+    BallotSignature,
     DISCIPLINE_CHOICES,
     STUDY_YEAR_CHOICES,
     Election,
     ElectionSession,
     Eligibility,
     Message,
+    TurnoutCounter,
     Voter,
 )
 
@@ -1020,6 +1032,59 @@ class BallotSubmitViewTestCase(SetupMixin, APITestCase):
         self.assertEqual(ballot[0].candidate, None)
         self.assertEqual(ballot[0].rank, None)
 
+    def test_ballot_signatures_are_maintained(self):
+        election = self._create_officer(self.election_session)
+        candidates = self.add_candidates(election)
+        rankings = [
+            {"1": candidates[1].id, "2": candidates[0].id},
+            {"2": candidates[0].id, "1": candidates[1].id},
+            {"1": candidates[0].id},
+            {},
+        ]
+
+        for ranking in rankings:
+            voter_dict = self._urlencode_cookie_request()
+            self.client.post(self.cookie_view, voter_dict, follow=True)
+            payload = {"electionId": election.id, "ranking": ranking}
+            response = self.client.post(self.ballot_submit_view, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        signatures = {
+            s.signature: s.count
+            for s in BallotSignature.objects.filter(election=election)
+        }
+        self.assertEqual(
+            signatures,
+            {
+                f"{candidates[1].id},{candidates[0].id}": 2,
+                f"{candidates[0].id}": 1,
+                "": 1,
+            },
+        )
+
+        # Both loaders must agree on the packed ballots
+        ballot_sets = load_election_session_ballot_sets(self.election_session)
+        signature_sets = load_election_session_signature_sets(self.election_session)
+        self.assertEqual(
+            dict(signature_sets[election.id].rankings),
+            dict(ballot_sets[election.id].rankings),
+        )
+
+        # The totals are advisory and still count the ballots of a deleted Candidate,
+        # which can then no longer be counted from them
+        deleted_id = candidates[0].id
+        candidates[0].delete()
+        self.assertEqual(
+            {
+                s.signature: s.count
+                for s in BallotSignature.objects.filter(election=election)
+            },
+            signatures,
+        )
+        self.assertFalse(Ballot.objects.filter(candidate_id=deleted_id).exists())
+        with self.assertRaises(BallotSignatureError):
+            load_election_session_signature_sets(self.election_session)
+
 
 class MessageViewTestCase(SetupMixin, APITestCase):
     def setUp(self):
@@ -1138,3 +1203,139 @@ class MessageViewTestCase(SetupMixin, APITestCase):
         self.assertContains(response, live_message.message)
         self.assertNotContains(response, past_message.message)
         self.assertNotContains(response, future_message.message)
+
+
+class TurnoutViewTestCase(SetupMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.turnout_view = reverse("api:backend:turnout")
+        self.ballot_submit_view = reverse("api:backend:ballot-submit")
+        self.cookie_view = reverse("api:backend:bypass-cookie")
+
+        self.election_session = self._create_election_session(
+            self._set_election_session_data()
+        )
+
+    def _vote(self, election, ranking):
+        voter_dict = self._urlencode_cookie_request()
+        self.client.post(self.cookie_view, voter_dict, follow=True)
+        payload = {"electionId": election.id, "ranking": ranking}
+        response = self.client.post(self.ballot_submit_view, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_voters_cannot_view_turnout(self):
+        voter_dict = self._urlencode_cookie_request()
+        self.client.post(self.cookie_view, voter_dict, follow=True)
+
+        response = self.client.get(self.turnout_view)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_turnout_counts_submitted_ballots(self):
+        officer = self._create_officer(self.election_session)
+        referendum = self._create_referendum(self.election_session)
+        candidates = self.add_candidates(officer)
+
+        for _ in range(3):
+            self._vote(officer, {"1": candidates[0].id})
+        self._vote(officer, {})
+
+        self._login_admin()
+        with self.assertNumQueries(3):
+            # User lookup, as the session is cached, then one query each for elections
+            # and turnout
+            response = self.client.get(self.turnout_view)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["elections"],
+            [
+                {
+                    "id": officer.id,
+                    "election_name": officer.election_name,
+                    "turnout": 4,
+                },
+                {
+                    "id": referendum.id,
+                    "election_name": referendum.election_name,
+                    "turnout": 0,
+                },
+            ],
+        )
+        self.assertEqual(
+            TurnoutCounter.objects.filter(election=officer).aggregate(
+                total=Sum("count")
+            )["total"],
+            4,
+        )
+
+    def test_ballot_is_not_kept_if_turnout_cannot_be_counted(self):
+        officer = self._create_officer(self.election_session)
+        candidates = self.add_candidates(officer)
+
+        with patch(
+            "backend.serializers.increment_turnout",
+            side_effect=DatabaseError("deadlock detected"),
+        ), self.assertRaises(DatabaseError):
+            self._vote(officer, {"1": candidates[0].id})
+
+        self.assertFalse(Ballot.objects.filter(election=officer).exists())
+        self.assertFalse(BallotSignature.objects.filter(election=officer).exists())
+
+
+class RecountViewTestCase(SetupMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.recount_view = reverse("api:backend:recount")
+
+        self.election_session = self._create_election_session(
+            self._set_election_session_data()
+        )
+        self.officer = self._create_officer(self.election_session)
+        self.candidates = self.add_candidates(self.officer)
+
+        self._generate_voters(count=3)
+        for voter, ranking in zip(Voter.objects.all(), [[0, 1], [1], [1, 0]]):
+            for rank, candidate in enumerate(ranking):
+                Ballot.objects.create(
+                    voter=voter,
+                    election=self.officer,
+                    candidate=self.candidates[candidate],
+                    rank=rank,
+                )
+
+    def test_non_staff_cannot_recount(self):
+        response = self.client.post(
+            self.recount_view,
+            {"electionId": self.officer.id, "excludedCandidates": []},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_recount_excludes_candidates(self):
+        self._login_admin()
+        response = self.client.post(
+            self.recount_view,
+            {
+                "electionId": self.officer.id,
+                "excludedCandidates": [self.candidates[1].id],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["winners"], ["test candidate 0"])
+        self.assertEqual(response.json()["totalVotes"], 2)
+
+    def test_candidates_must_belong_to_the_election(self):
+        referendum = self._create_referendum(self.election_session)
+        referendum_candidate = self.add_candidates(referendum, 1)[0]
+
+        self._login_admin()
+        response = self.client.post(
+            self.recount_view,
+            {
+                "electionId": self.officer.id,
+                "excludedCandidates": [referendum_candidate.id],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,40 @@
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from backend.models import TurnoutCounter
+
+
+def increment_turnout(election_id):
+    """
+    Records one more ballot for the Election on a randomly chosen shard. The shard
+    row is created the first time it is hit; if another request creates it first
+    we fall back to incrementing it.
+    """
+    shard = random.randrange(settings.TURNOUT_COUNTER_SHARDS)
+    counters = TurnoutCounter.objects.filter(election_id=election_id, shard=shard)
+    if counters.update(count=F("count") + 1):
+        return
+
+    try:
+        with transaction.atomic():
+            TurnoutCounter.objects.create(election_id=election_id, shard=shard, count=1)
+    except IntegrityError:
+        counters.update(count=F("count") + 1)
+
+
+def get_turnout(election_ids):
+    """
+    Returns a dict of Election id -> number of ballots cast, summed over the shards
+    in a single query. Elections without any ballots are reported as 0.
+    """
+    turnout = {election_id: 0 for election_id in election_ids}
+    for row in (
+        TurnoutCounter.objects.filter(election_id__in=turnout.keys())
+        .values("election_id")
+        .annotate(total=Sum("count"))
+    ):
+        turnout[row["election_id"]] = row["total"]
+    return turnout
@@ -8,7 +8,8 @@ from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views import View
-from rest_framework import exceptions, generics
+from rest_framework import exceptions, generics, permissions
+from rest_framework.response import Response
 
 from backend.models import (
     Ballot,
@@ -17,12 +18,17 @@ from backend.models import (
     Message,
     Voter,
 )
+from backend.api_cache import cached_api_payload
+from backend.metrics import load_metrics, process_metrics, render_metrics
+from backend.recount import recount
 from backend.serializers import (
     BallotSerializer,
     ElectionSerializer,
     ElectionSessionSerializer,
     MessageSerializer,
+    RecountSerializer,
 )
+from backend.turnout import get_turnout
 
 
 class IneligibleVoterError(Exception):
@@ -41,6 +47,30 @@ def _now():
     return datetime.now().astimezone(settings.TZ_INFO)
 
 
+def _live_election_session_id():
+    """
+    Returns the id of the currently happening ElectionSession, or None. It's cached
+    until that ElectionSession ends or, if there is none, the next one starts.
+    """
+
+    def payload():
+        now = _now()
+        # ElectionSessions don't overlap, so this is the live one or the next one
+        election_session = (
+            ElectionSession.objects.filter(end_time__gt=now)
+            .order_by("start_time")
+            .values("id", "start_time", "end_time")
+            .first()
+        )
+        if election_session is None:
+            return {"id": None}, None
+        if election_session["start_time"] > now:
+            return {"id": None}, election_session["start_time"]
+        return {"id": election_session["id"]}, election_session["end_time"]
+
+    return cached_api_payload("live-election-session", payload)["id"]
+
+
 def _create_verified_voter(query_dict, verify_hash=True):
     """
     This method decodes the voter information query string in the format returned by UofT. It then determines if the
@@ -197,6 +227,34 @@ class ElectionListView(generics.ListAPIView):
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        """
+        Only the ids of the Elections the voter can vote in are read; the Elections
+        themselves come from the cached payload of the live ElectionSession's.
+        """
+        election_ids = set(self.get_queryset().values_list("id", flat=True))
+        if not election_ids:
+            return Response([])
+
+        election_session_id = _live_election_session_id()
+        elections = cached_api_payload(
+            f"elections:{election_session_id}",
+            lambda: (self._elections_payload(election_session_id), None),
+        )
+        return Response(
+            [election for election in elections if election["id"] in election_ids]
+        )
+
+    def _elections_payload(self, election_session_id):
+        # Their Candidates are fetched in one query for all of them rather than one
+        # per Election
+        elections = (
+            Election.objects.filter(election_session_id=election_session_id)
+            .order_by("id")
+            .prefetch_related("candidates")
+        )
+        return list(self.get_serializer(elections, many=True).data)
+
     def get_queryset(self):
         try:
             student_number_hash = self.request.get_signed_cookie("student_number_hash")
@@ -208,15 +266,12 @@ class ElectionListView(generics.ListAPIView):
         except Voter.DoesNotExist:
             raise exceptions.NotAuthenticated
 
-        now = _now()
-        election_session = ElectionSession.objects.filter(
-            Q(start_time__lt=now) & Q(end_time__gt=now)
-        )
-        if not election_session.exists():
-            return election_session
+        election_session_id = _live_election_session_id()
+        if election_session_id is None:
+            return Election.objects.none()
 
         # Return only Elections in an active ElectionSession
-        q = Election.objects.filter(Q(election_session=election_session[0]))
+        q = Election.objects.filter(Q(election_session_id=election_session_id))
 
         # A voter isn't eligible to vote in an election where they have already voted
         q = q.exclude(ballots__voter=voter)
@@ -250,7 +305,20 @@ class ElectionSessionListView(generics.ListAPIView):
     serializer_class = ElectionSessionSerializer
 
     def get(self, request, *args, **kwargs):
-        return self.list(request, *args, **kwargs)
+        return Response(cached_api_payload("election-sessions", self._payload))
+
+    def _payload(self):
+        now = _now()
+        election_sessions = list(self.get_queryset())
+        # Until the live ElectionSession ends, or the upcoming one starts
+        valid_until = min(
+            (
+                e.start_time if e.start_time > now else e.end_time
+                for e in election_sessions
+            ),
+            default=None,
+        )
+        return list(self.get_serializer(election_sessions, many=True).data), valid_until
 
     def get_queryset(self):
         now = _now()
@@ -285,13 +353,10 @@ class BallotSubmitView(generics.CreateAPIView):
     def get_serializer_context(self):
         # Bypass for swagger schema generator
         if getattr(self, "swagger_fake_view", False):
-            return super().get_serializer_context() | {
-                "student_number_hash": "debug only"
-            }
+            return super().get_serializer_context() | {"voter": None}
 
-        return super().get_serializer_context() | {
-            "student_number_hash": self.request.get_signed_cookie("student_number_hash")
-        }
+        # Looked up by check_permissions
+        return super().get_serializer_context() | {"voter": self.voter}
 
     def check_permissions(self, request):
         """
@@ -305,10 +370,12 @@ class BallotSubmitView(generics.CreateAPIView):
                 request, message="You are not logged in as a valid student."
             )
 
-        voter = Voter.objects.get(student_number_hash=student_number_hash)
+        voter = self.voter = Voter.objects.get(student_number_hash=student_number_hash)
         try:
             election_id = request.data["electionId"]
-            election = Election.objects.get(id=election_id)
+            election = Election.objects.select_related("eligibilities").get(
+                id=election_id
+            )
         except (KeyError, ValueError, Election.DoesNotExist):
             self.permission_denied(
                 request,
@@ -339,7 +406,7 @@ class BallotSubmitView(generics.CreateAPIView):
                 request, message="You are not eligible to vote in this election."
             )
 
-        if Ballot.objects.filter(voter=voter, election=election).count() > 0:
+        if Ballot.objects.filter(voter=voter, election=election).exists():
             self.permission_denied(
                 request, message="You have already voted in this election."
             )
@@ -354,21 +421,92 @@ class MessageView(generics.ListAPIView):
     serializer_class = MessageSerializer
 
     def get(self, request, *args, **kwargs):
-        return self.list(request, *args, **kwargs)
+        election_session_id = _live_election_session_id()
+        return Response(
+            cached_api_payload(
+                f"messages:{election_session_id}",
+                lambda: (
+                    list(self.get_serializer(self.get_queryset(), many=True).data),
+                    None,
+                ),
+            )
+        )
 
     def get_queryset(self):
-        now = _now()
-
-        # This is guaranteed to return <=1 ElectionSessions due to the constraints implemented
-        # in the ElectionSession save() method.
-        current_election_session = ElectionSession.objects.filter(
-            Q(start_time__lt=now) & Q(end_time__gt=now)
-        )
+        election_session_id = _live_election_session_id()
 
-        if len(current_election_session) > 0:
+        if election_session_id is not None:
             messages = Message.objects.filter(
-                Q(election_session=current_election_session[0]) & Q(active=True)
+                Q(election_session_id=election_session_id) & Q(active=True)
             )
             return messages
 
         return []
+
+
+class TurnoutView(generics.GenericAPIView):
+    """
+    Staff only. Returns the number of ballots cast so far in each Election of the
+    currently happening ElectionSession, read from the sharded turnout counters
+    rather than the Ballot table.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        now = _now()
+        elections = list(
+            Election.objects.filter(
+                Q(election_session__start_time__lt=now)
+                & Q(election_session__end_time__gt=now)
+            )
+            .order_by("id")
+            .values("id", "election_name")
+        )
+        turnout = get_turnout([election["id"] for election in elections])
+
+        return JsonResponse(
+            {
+                "elections": [
+                    election | {"turnout": turnout[election["id"]]}
+                    for election in elections
+                ]
+            }
+        )
+
+
+class RecountView(generics.GenericAPIView):
+    """
+    Staff only. Recounts an Election as if the given Candidates had been removed from
+    it, for appeals. Results are cached per set of excluded Candidates.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = RecountSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = recount(
+            serializer.validated_data["election"],
+            serializer.validated_data["excludedCandidates"],
+        )
+        return JsonResponse(results)
+
+
+class MetricsView(generics.GenericAPIView):
+    """
+    Staff only. Returns the request, latency and database metrics of every worker in
+    the Prometheus text format, see backend/metrics.py.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        # Don't leave out this worker's requests since its last flush
+        process_metrics.flush()
+        return HttpResponse(
+            render_metrics(load_metrics()),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -63,12 +63,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "backend.profiler.ProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -138,6 +140,54 @@ USE_L10N = True
 
 USE_TZ = True
 
+# Shared by every worker process on the host through a memory-mapped file, see
+# backend/shared_cache.py. Its directory must only be writable by the workers' user.
+CACHES = {
+    "default": {
+        "BACKEND": "backend.shared_cache.SharedMemoryCache",
+        "LOCATION": os.environ.get(
+            "CACHE_FILE", os.path.join(BASE_DIR, "cache", "skule_vote_cache")
+        ),
+        "OPTIONS": {
+            "SETS": int(os.environ.get("CACHE_SETS", 512)),
+            "WAYS": int(os.environ.get("CACHE_WAYS", 8)),
+            "SLOT_SIZE": int(os.environ.get("CACHE_SLOT_SIZE", 16384)),
+            "MAX_VALUE_SIZE": int(
+                os.environ.get("CACHE_MAX_VALUE_SIZE", 4 * 1024 * 1024)
+            ),
+        },
+    }
+}
+
+# Sessions are read from the cache, and written through to the database
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Seconds that API payloads every voter gets the same are cached at most, see
+# backend/api_cache.py
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 5 * 60))
+# Whether each worker listens for changes made through other app servers, on Postgres
+API_CACHE_LISTEN = bool(int(os.environ.get("API_CACHE_LISTEN", 1)))
+
+# Number of rows each Election's ballot count is spread over, see backend/turnout.py
+TURNOUT_COUNTER_SHARDS = int(os.environ.get("TURNOUT_COUNTER_SHARDS", 8))
+
+# Seconds that ballot sets and results of "what if" recounts are cached, see backend/recount.py
+RECOUNT_CACHE_TIMEOUT = int(os.environ.get("RECOUNT_CACHE_TIMEOUT", 60 * 60))
+
+# Where each worker process writes its request metrics, and at most how often in seconds,
+# see backend/metrics.py
+METRICS_DIR = os.environ.get("METRICS_DIR", "/tmp/skule_vote_metrics")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+
+# Progress of long-running work in the backend app goes to the worker's log
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {"backend": {"handlers": ["console"], "level": "INFO"}},
+}
+
 # Swagger
 # https://drf-yasg.readthedocs.io/en/stable/settings.html
 SWAGGER_SETTINGS = {"DEFAULT_MODEL_RENDERING": "example", "DEEP_LINKING": True}
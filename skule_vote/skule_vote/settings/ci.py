@@ -18,6 +18,16 @@ postgres, that would pose an issue in production but will not be
 caught during testing. These should be caught by a staging environment,
 and by running your code before you merge it.
 """
+import tempfile
+
 from skule_vote.settings import *
 
 DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+
+# Each test run gets its own cache rather than sharing a file with other runs
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Every test run writes its metrics to its own directory, removed when it exits, so
+# they never add to the totals of a local server
+_metrics_dir = tempfile.TemporaryDirectory(prefix="skule_vote_metrics_")
+METRICS_DIR = _metrics_dir.name
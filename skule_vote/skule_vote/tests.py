@@ -5,8 +5,11 @@ import random
 import string
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from backend.forms import ElectionSessionAdminForm
@@ -36,6 +39,9 @@ class SetupMixin:
     """
 
     def setUp(self):
+        # Tests don't share cached API payloads, see backend/api_cache.py
+        cache.clear()
+
         self.password = "foobar123"
         self.user = User.objects.create_user(
             username="foo@bar.com",
@@ -483,3 +489,33 @@ class SetupMixin:
             "isregistered": isregistered,
             "campus": campus,
         }
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for asserting that a request runs at most a fixed number of database queries
+    however much data there is, so that N+1 queries fail the tests.
+    """
+
+    def assertQueryBudget(self, max_queries, request, grow, steps=3):
+        """
+        Calls request() once, then again after each of steps calls to grow(), and
+        fails if any call runs more than max_queries queries. Returns the responses.
+        """
+        responses = []
+        for step in range(steps + 1):
+            if step > 0:
+                grow()
+            with CaptureQueriesContext(connection) as queries:
+                responses.append(request())
+
+            if len(queries) > max_queries:
+                sql = "\n".join(
+                    f"{i}. {query['sql']}"
+                    for i, query in enumerate(queries.captured_queries, start=1)
+                )
+                self.fail(
+                    f"{len(queries)} queries run after growing the data {step} times, "
+                    f"the budget is {max_queries}:\n{sql}"
+                )
+        return responses